@@ -2,6 +2,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model, authenticate
 from django.contrib.auth.password_validation import validate_password
+from apps.core.serializers import ResizedImageField
 
 User = get_user_model()
 
@@ -24,8 +25,10 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 class UserSerializer(serializers.ModelSerializer):
+    profile_picture_thumbnail = ResizedImageField(160, 160, source='profile_picture')
+
     class Meta:
         model = User
         fields = ('id', 'email', 'username', 'first_name', 'last_name', 'bio', 
-                 'profile_picture', 'website', 'linkedin', 'github', 'twitter')
+                 'profile_picture', 'profile_picture_thumbnail', 'website', 'linkedin', 'github', 'twitter')
         read_only_fields = ('id',)
\ No newline at end of file
@@ -1,11 +1,22 @@
 # ========== backend/apps/blog/admin.py (Amélioré) ==========
 from django.contrib import admin
+from django.db.models import Count
 from django.utils.html import format_html
-from .models import BlogPost, BlogCategory, Tag, Comment
+from apps.core import denorm
+from apps.core.cache import bump_version
+from .models import BlogPost, BlogCategory, Tag, Comment, BlogStats
+from . import ingestion, stats
+
+def invalidate_posts(slugs):
+    """Réponses en cache des listes et des articles dont les commentaires ont changé"""
+    bump_version('blog.posts', *[f'blog.post:{slug}' for slug in slugs])
+
+def comments_per_post(queryset):
+    return dict(queryset.order_by().values_list('post_id').annotate(total=Count('pk')))
 
 @admin.register(BlogCategory)
 class BlogCategoryAdmin(admin.ModelAdmin):
-    list_display = ['name', 'slug', 'color_display', 'post_count_display']
+    list_display = ['name', 'slug', 'color_display', 'post_count']
     search_fields = ['name']
     prepopulated_fields = {'slug': ('name',)}
     list_per_page = 20
@@ -17,21 +28,13 @@ class BlogCategoryAdmin(admin.ModelAdmin):
             obj.color
         )
     color_display.short_description = 'Couleur'
-    
-    def post_count_display(self, obj):
-        return obj.post_count
-    post_count_display.short_description = 'Nombre d\'articles'
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
-    list_display = ['name', 'slug', 'post_count_display']
+    list_display = ['name', 'slug', 'post_count']
     search_fields = ['name']
     prepopulated_fields = {'slug': ('name',)}
     list_per_page = 20
-    
-    def post_count_display(self, obj):
-        return obj.post_count
-    post_count_display.short_description = 'Nombre d\'articles'
 
 class CommentInline(admin.TabularInline):
     model = Comment
@@ -44,7 +47,7 @@ class CommentInline(admin.TabularInline):
 class BlogPostAdmin(admin.ModelAdmin):
     list_display = [
         'title', 'author', 'category', 'status', 'featured', 
-        'view_count', 'comment_count_display', 'reading_time', 
+        'view_count', 'comment_count', 'reading_time', 
         'published_at', 'is_recent_display'
     ]
     list_filter = [
@@ -58,7 +61,7 @@ class BlogPostAdmin(admin.ModelAdmin):
     list_per_page = 20
     date_hierarchy = 'published_at'
     
-    readonly_fields = ['view_count', 'reading_time', 'created_at', 'updated_at']
+    readonly_fields = ['view_count', 'comment_count', 'reading_time', 'word_count', 'created_at', 'updated_at']
     
     fieldsets = (
         ('Contenu Principal', {
@@ -75,7 +78,7 @@ class BlogPostAdmin(admin.ModelAdmin):
             'classes': ('wide',)
         }),
         ('Statistiques', {
-            'fields': ('view_count', 'reading_time'),
+            'fields': ('view_count', 'comment_count', 'reading_time', 'word_count'),
             'classes': ('collapse',)
         }),
         ('Dates', {
@@ -89,17 +92,6 @@ class BlogPostAdmin(admin.ModelAdmin):
             obj.author = request.user
         super().save_model(request, obj, form, change)
     
-    def comment_count_display(self, obj):
-        approved = obj.comments.filter(approved=True).count()
-        total = obj.comments.count()
-        if total == 0:
-            return "0"
-        return format_html(
-            '<span style="color: green;">{}</span> / {}',
-            approved, total
-        )
-    comment_count_display.short_description = 'Commentaires (approuvés/total)'
-    
     def is_recent_display(self, obj):
         if obj.is_recent:
             return format_html(
@@ -110,8 +102,8 @@ class BlogPostAdmin(admin.ModelAdmin):
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
-    list_display = ['name', 'post', 'approved', 'is_recent_display', 'created_at']
-    list_filter = ['approved', 'created_at', 'post__category']
+    list_display = ['name', 'post', 'approved', 'flagged', 'is_recent_display', 'created_at']
+    list_filter = ['approved', 'flagged', 'created_at', 'post__category']
     search_fields = ['name', 'email', 'content', 'post__title']
     actions = ['approve_comments', 'disapprove_comments']
     list_per_page = 50
@@ -120,7 +112,16 @@ class CommentAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at']
     
     def approve_comments(self, request, queryset):
-        updated = queryset.update(approved=True)
+        # update() ne déclenche pas de signaux : ajuster l'instantané des
+        # stats, les compteurs des articles et invalider leurs réponses
+        pending = queryset.filter(approved=False)
+        slugs = set(pending.values_list('post__slug', flat=True))
+        per_post = comments_per_post(pending)
+        updated = pending.update(approved=True)
+        stats.apply_delta(total_comments=updated)
+        denorm.apply_deltas(BlogPost, 'comment_count', per_post)
+        invalidate_posts(slugs)
+        ingestion.record_moderation(approved=updated)
         self.message_user(
             request,
             f'{updated} commentaire(s) approuvé(s) avec succès.'
@@ -128,7 +129,14 @@ class CommentAdmin(admin.ModelAdmin):
     approve_comments.short_description = "Approuver les commentaires sélectionnés"
     
     def disapprove_comments(self, request, queryset):
-        updated = queryset.update(approved=False)
+        approved = queryset.filter(approved=True)
+        slugs = set(approved.values_list('post__slug', flat=True))
+        per_post = comments_per_post(approved)
+        updated = approved.update(approved=False)
+        stats.apply_delta(total_comments=-updated)
+        denorm.apply_deltas(BlogPost, 'comment_count', {pk: -total for pk, total in per_post.items()})
+        invalidate_posts(slugs)
+        ingestion.record_moderation(disapproved=updated)
         self.message_user(
             request,
             f'{updated} commentaire(s) désapprouvé(s) avec succès.'
@@ -139,4 +147,12 @@ class CommentAdmin(admin.ModelAdmin):
         if obj.is_recent:
             return format_html('<span style="color: green;">✓</span>')
         return ""
-    is_recent_display.short_description = 'Récent'
\ No newline at end of file
+    is_recent_display.short_description = 'Récent'
+
+@admin.register(BlogStats)
+class BlogStatsAdmin(admin.ModelAdmin):
+    list_display = ['total_posts', 'total_categories', 'total_tags', 'total_comments', 'updated_at']
+    readonly_fields = ['total_posts', 'total_categories', 'total_tags', 'total_comments', 'updated_at']
+    
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,255 @@
+# ========== backend/apps/blog/ingestion.py ==========
+"""
+File d'ingestion des commentaires.
+
+add_comment valide la requête, dépose le commentaire dans une table de
+transit (QueuedComment : un INSERT d'une ligne, sans signaux ni
+invalidation de cache) et répond 202. La file est en base, donc partagée
+par tous les workers et conservée au redémarrage ; le cache ne porte que
+les métriques. Le traitement lit la file par lots : doublons écartés,
+suspects marqués (`flagged`) par des heuristiques simples, puis un seul
+bulk_create par lot. Chaque lot est revendiqué par la suppression de ses
+lignes dans la même transaction : deux traitements concurrents (workers,
+commande) n'insèrent jamais deux fois le même commentaire, sans verrou
+partagé entre processus.
+
+Le traitement est lancé par la commande process_comment_queue, et dans le
+processus web (COMMENT_QUEUE_DRAIN) : 'thread' traite la file en arrière-plan
+dès qu'elle atteint le seuil, et au plus tard COMMENT_QUEUE_FLUSH_INTERVAL
+secondes après un enfilage (minuterie, même sans trafic ultérieur) ;
+'inline' traite la file pendant la requête ; 'worker' s'en remet uniquement
+à la commande.
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .models import BlogPost, Comment, QueuedComment
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'comment-queue'
+STATS_KEYS = (
+    'enqueued', 'inserted', 'duplicates', 'dropped', 'flagged', 'batches',
+    'processing_ms', 'approved', 'disapproved',
+)
+DUPLICATE_WINDOW = timedelta(days=1)
+
+LINK_RE = re.compile(r'https?://|www\.', re.IGNORECASE)
+WHITESPACE_RE = re.compile(r'\s+')
+MAX_LINKS = 2
+MAX_PER_AUTHOR = 3
+SPAM_WORDS = ('casino', 'viagra', 'bitcoin', 'crypto', 'forex', 'porn', 'loan', 'prêt rapide')
+
+
+def _setting(name, default):
+    return getattr(settings, f'COMMENT_QUEUE_{name}', default)
+
+
+def _incr(name, delta=1):
+    key = f'{PREFIX}:stats:{name}'
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key, delta)
+
+
+def depth():
+    """Nombre de commentaires en attente de traitement"""
+    return QueuedComment.objects.count()
+
+
+def stats():
+    """Compteurs cumulés, profondeur de la file et débit de traitement"""
+    values = cache.get_many([f'{PREFIX}:stats:{name}' for name in STATS_KEYS])
+    data = {name: values.get(f'{PREFIX}:stats:{name}', 0) for name in STATS_KEYS}
+    data['depth'] = depth()
+    seconds = data['processing_ms'] / 1000
+    data['inserted_per_second'] = round(data['inserted'] / seconds, 1) if seconds else None
+    return data
+
+
+def reset_stats():
+    cache.delete_many([f'{PREFIX}:stats:{name}' for name in STATS_KEYS])
+
+
+def record_moderation(approved=0, disapproved=0):
+    """Débit de modération (actions groupées de l'admin)"""
+    if approved:
+        _incr('approved', approved)
+    if disapproved:
+        _incr('disapproved', disapproved)
+
+
+def enqueue(post, data):
+    """Dépose un commentaire validé ; retourne son identifiant dans la file"""
+    queued = QueuedComment.objects.create(
+        post=post, name=data['name'], email=data['email'], content=data['content'],
+    )
+    _incr('enqueued')
+    maybe_drain()
+    return queued.pk
+
+
+# Minuterie du processus courant : traitement au plus tard FLUSH_INTERVAL
+# secondes après le premier enfilage en attente
+_timer = None
+_timer_lock = threading.Lock()
+
+
+def maybe_drain():
+    mode = _setting('DRAIN', 'thread')
+    if mode == 'worker':
+        return
+    if mode == 'inline':
+        drain()
+    elif depth() >= _setting('FLUSH_THRESHOLD', 50):
+        threading.Thread(target=_drain_in_thread, daemon=True).start()
+    else:
+        _arm_timer()
+
+
+def _arm_timer():
+    global _timer
+    with _timer_lock:
+        if _timer is None:
+            _timer = threading.Timer(_setting('FLUSH_INTERVAL', 5), _drain_from_timer)
+            _timer.daemon = True
+            _timer.start()
+
+
+def _drain_from_timer():
+    global _timer
+    with _timer_lock:
+        _timer = None
+    _drain_in_thread()
+
+
+def _drain_in_thread():
+    try:
+        drain()
+    except Exception:
+        logger.exception("Échec du traitement de la file des commentaires")
+    try:
+        if depth():
+            # Échec : nouvel essai à la prochaine échéance
+            _arm_timer()
+    finally:
+        close_old_connections()
+
+
+def fingerprint(post_id, email, content):
+    normalized = WHITESPACE_RE.sub(' ', content).strip().lower()
+    return hashlib.sha1(f'{post_id}|{email.lower()}|{normalized}'.encode()).hexdigest()
+
+
+def is_suspicious(content):
+    lowered = content.lower()
+    letters = [char for char in content if char.isalpha()]
+    return (
+        len(LINK_RE.findall(content)) > MAX_LINKS
+        or any(word in lowered for word in SPAM_WORDS)
+        # Commentaire (assez long) presque entièrement en majuscules
+        or (len(letters) >= 20 and sum(char.isupper() for char in letters) / len(letters) > 0.7)
+    )
+
+
+def screen(batch):
+    """
+    Heuristiques sur un lot : retourne (commentaires à insérer, compteurs).
+    Une requête pour les articles valides, une pour les doublons récents.
+    """
+    post_ids = {item['post_id'] for item in batch}
+    live = set(BlogPost.objects.published().filter(pk__in=post_ids).values_list('pk', flat=True))
+    recent = Comment.objects.filter(
+        post_id__in=live,
+        email__in={item['email'] for item in batch},
+        created_at__gte=timezone.now() - DUPLICATE_WINDOW,
+    ).values_list('post_id', 'email', 'content')
+    seen = {fingerprint(*row) for row in recent}
+
+    comments, per_author = [], Counter()
+    counts = {'duplicates': 0, 'dropped': 0, 'flagged': 0}
+    for item in batch:
+        if item['post_id'] not in live:
+            counts['dropped'] += 1
+            continue
+        key = fingerprint(item['post_id'], item['email'], item['content'])
+        if key in seen:
+            counts['duplicates'] += 1
+            continue
+        seen.add(key)
+        per_author[item['email'].lower()] += 1
+        flagged = per_author[item['email'].lower()] > MAX_PER_AUTHOR or is_suspicious(item['content'])
+        counts['flagged'] += flagged
+        comments.append(Comment(
+            post_id=item['post_id'], name=item['name'], email=item['email'],
+            content=item['content'], flagged=flagged,
+        ))
+    return comments, counts
+
+
+def _claim(batch_size):
+    """
+    Lignes les plus anciennes de la file, verrouillées jusqu'à la fin de la
+    transaction ; SKIP LOCKED (PostgreSQL) laisse les autres workers traiter
+    les lignes suivantes
+    """
+    queued = QueuedComment.objects.order_by('pk')
+    if connection.features.has_select_for_update_skip_locked:
+        queued = queued.select_for_update(skip_locked=True)
+    return list(queued[:batch_size].values('pk', 'post_id', 'name', 'email', 'content'))
+
+
+def _process_batch(batch_size):
+    """Traite un lot ; retourne (lignes consommées, commentaires insérés)"""
+    started = time.perf_counter()
+    while True:
+        with transaction.atomic():
+            batch = _claim(batch_size or _setting('BATCH_SIZE', 200))
+            if not batch:
+                return 0, 0
+            # La suppression revendique le lot : si un autre traitement en a
+            # déjà supprimé une partie, on annule et on relit
+            deleted, _ = QueuedComment.objects.filter(pk__in=[item['pk'] for item in batch]).delete()
+            if deleted != len(batch):
+                transaction.set_rollback(True)
+                continue
+            comments, counts = screen(batch)
+            # Pas de signaux : les commentaires non approuvés ne changent
+            # ni les réponses publiques ni l'instantané des statistiques
+            Comment.objects.bulk_create(comments)
+        break
+
+    _incr('batches')
+    _incr('inserted', len(comments))
+    for name, value in counts.items():
+        if value:
+            _incr(name, value)
+    _incr('processing_ms', round((time.perf_counter() - started) * 1000))
+    return len(batch), len(comments)
+
+
+def process(batch_size=None):
+    """Traite un lot de la file ; retourne le nombre de commentaires insérés"""
+    return _process_batch(batch_size)[1]
+
+
+def drain(batch_size=None):
+    """Vide la file lot par lot ; retourne le nombre total inséré"""
+    total = 0
+    while True:
+        consumed, inserted = _process_batch(batch_size)
+        total += inserted
+        if not consumed:
+            return total
@@ -0,0 +1,105 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.blog.models import BlogPost
+from apps.blog.search import document_for, get_search_backend, search_posts
+
+VOCABULARY = (
+    'django python react api déploiement performance base données index requête '
+    'cache serveur client développement développeur application sécurité test '
+    'architecture microservice conteneur docker intelligence artificielle modèle '
+    'apprentissage données vocal assistant recherche article portfolio projet '
+    'optimisation latence réseau mémoire stockage image vidéo interface mobile'
+).split()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare la recherche icontains historique et l'index plein texte sur "
+        "un corpus synthétique (annulé en fin de commande)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--words', type=int, default=300, help='Mots par article')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('queries', nargs='*', default=['django', 'développement', 'cache requête'])
+
+    def handle(self, *args, **options):
+        if get_search_backend() is None:
+            self.stderr.write(f'Aucun backend de recherche pour {connection.vendor}')
+            return
+        try:
+            with transaction.atomic():
+                self.populate(options)
+                self.compare(options)
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Corpus synthétique supprimé (transaction annulée)')
+
+    def populate(self, options):
+        rng = random.Random(42)
+        author = get_user_model().objects.create(
+            username='benchmark-search', email='benchmark-search@example.com'
+        )
+        backend = get_search_backend()
+        started = time.perf_counter()
+        remaining = options['posts']
+        while remaining > 0:
+            size = min(options['chunk_size'], remaining)
+            posts = BlogPost.objects.bulk_create([
+                BlogPost(
+                    title=' '.join(rng.choices(VOCABULARY, k=6)),
+                    slug=f'benchmark-{remaining - i}',
+                    excerpt=' '.join(rng.choices(VOCABULARY, k=25)),
+                    content=' '.join(rng.choices(VOCABULARY, k=options['words'])),
+                    author=author,
+                    status='published',
+                )
+                for i in range(size)
+            ])
+            with connection.cursor() as cursor:
+                backend.index_documents(cursor, [(post.pk, document_for(post, [])) for post in posts])
+            remaining -= size
+        self.stdout.write(
+            f"{options['posts']} articles créés et indexés en {time.perf_counter() - started:.1f}s"
+        )
+
+    def timed(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), result
+
+    def compare(self, options):
+        published = BlogPost.objects.filter(status='published')
+        for query in options['queries']:
+            def legacy():
+                queryset = (
+                    published.filter(title__icontains=query) | published.filter(excerpt__icontains=query)
+                ).distinct()
+                return queryset.count(), list(queryset.order_by('-featured', '-published_at')[:12])
+
+            def indexed():
+                hits = search_posts(query, limit=200)
+                ids = [hit.post_id for hit in hits[:12]]
+                return len(hits), list(published.filter(pk__in=ids))
+
+            legacy_ms, (legacy_count, _) = self.timed(legacy, options['repeat'])
+            indexed_ms, (indexed_count, _) = self.timed(indexed, options['repeat'])
+            self.stdout.write(
+                f'"{query}": icontains {legacy_ms:.1f} ms ({legacy_count} résultats) | '
+                f'plein texte {indexed_ms:.1f} ms ({indexed_count} résultats classés, max 200)'
+            )
@@ -0,0 +1,106 @@
+import json
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apps.blog.models import BlogPost, Tag
+from apps.blog.serializers import TagSerializer
+from apps.blog.views import blog_tags
+from apps.core import denorm
+from apps.core.cache import bump_version
+
+
+# Cache propre à la commande : le cache partagé (Redis en production) ne
+# reçoit ni les données synthétiques ni les invalidations du benchmark
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark-taxonomy',
+    },
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+def legacy_blog_tags():
+    """Ancienne implémentation : un COUNT(*) par tag"""
+    data = []
+    for tag in Tag.objects.all():
+        tag_data = TagSerializer(tag).data
+        tag_data['post_count'] = BlogPost.objects.filter(tags=tag, status='published').count()
+        data.append(tag_data)
+    return data
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare nombre de requêtes et latence de l'endpoint des tags, avant et "
+        "après agrégation groupée (données synthétiques annulées en fin de commande)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tags', type=int, default=5000)
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument('--tags-per-post', type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with override_settings(CACHES=BENCHMARK_CACHES), transaction.atomic():
+                self.populate(options)
+                self.compare()
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Données synthétiques supprimées (transaction annulée)')
+        finally:
+            # Par prudence : aucune réponse construite sur les données annulées
+            bump_version('blog.taxonomy')
+
+    def populate(self, options):
+        rng = random.Random(42)
+        author = get_user_model().objects.create(
+            username='benchmark-taxonomy', email='benchmark-taxonomy@example.com'
+        )
+        tags = Tag.objects.bulk_create([
+            Tag(name=f'bench-tag-{i}', slug=f'bench-tag-{i}') for i in range(options['tags'])
+        ])
+        posts = BlogPost.objects.bulk_create([
+            BlogPost(
+                title=f'Article {i}', slug=f'bench-article-{i}', excerpt='Extrait',
+                content='Contenu', author=author,
+                status='published' if i % 4 else 'draft',
+            )
+            for i in range(options['posts'])
+        ])
+        Through = BlogPost.tags.through
+        Through.objects.bulk_create([
+            Through(blogpost_id=post.pk, tag_id=tag.pk)
+            for post in posts
+            for tag in rng.sample(tags, options['tags_per_post'])
+        ], batch_size=5000)
+        # bulk_create ne déclenche pas les signaux : recalculer les compteurs
+        denorm.reconcile()
+
+    def measure(self, label, func):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            func()
+            elapsed = (time.perf_counter() - started) * 1000
+        self.stdout.write(f'{label:<28} {len(queries):>6} requête(s) {elapsed:>10.1f} ms')
+
+    def compare(self):
+        request = RequestFactory().get('/api/blog/tags/')
+        legacy = {tag['id']: tag['post_count'] for tag in legacy_blog_tags()}
+        current = {tag['id']: tag['post_count'] for tag in json.loads(blog_tags(request).content)}
+        if legacy != current:
+            raise CommandError('Les comptages des deux implémentations divergent')
+        self.measure('avant (COUNT par tag)', legacy_blog_tags)
+        bump_version('blog.taxonomy')
+        self.measure('après, cache froid', lambda: blog_tags(request))
+        self.measure('après, cache chaud', lambda: blog_tags(request))
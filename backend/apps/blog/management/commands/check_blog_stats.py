@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.blog import stats
+
+
+class Command(BaseCommand):
+    help = "Compare l'instantané des statistiques du blog aux comptages réels"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help="Reconstruit l'instantané en cas d'écart")
+
+    def handle(self, *args, **options):
+        drift = stats.check()
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('Instantané cohérent'))
+            return
+        for name, (snapshot, live) in drift.items():
+            self.stdout.write(f'{name}: instantané={snapshot} réel={live}')
+        if options['fix']:
+            stats.rebuild()
+            self.stdout.write(self.style.SUCCESS('Instantané reconstruit'))
+            return
+        raise CommandError(f'{len(drift)} compteur(s) incohérent(s)')
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.blog import ingestion
+
+
+class Command(BaseCommand):
+    help = (
+        "Insère par lots les commentaires en attente dans la file d'ingestion "
+        "(une passe, ou en continu avec --loop)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--loop', action='store_true', help='Traite la file en continu')
+        parser.add_argument('--interval', type=float, default=2.0, help='Pause entre deux passes (secondes)')
+        parser.add_argument('--stats', action='store_true', help='Affiche les métriques de la file et quitte')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for name, value in ingestion.stats().items():
+                self.stdout.write(f'{name}: {value}')
+            return
+
+        while True:
+            inserted = ingestion.drain(options['batch_size'])
+            if inserted or not options['loop']:
+                self.stdout.write(
+                    f'{inserted} commentaire(s) inséré(s), {ingestion.depth()} en attente'
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from apps.blog import stats
+
+
+class Command(BaseCommand):
+    help = "Recalcule entièrement l'instantané des statistiques du blog"
+
+    def handle(self, *args, **options):
+        snapshot = stats.rebuild()
+        for name in stats.COUNTERS:
+            self.stdout.write(f'{name}: {getattr(snapshot, name)}')
+        self.stdout.write(self.style.SUCCESS('Instantané reconstruit'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.blog.similarity import rebuild_related_posts
+
+
+class Command(BaseCommand):
+    help = "Recalcule l'index des articles similaires (top-K par article publié)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = rebuild_related_posts(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Voisins recalculés pour {total} article(s)'))
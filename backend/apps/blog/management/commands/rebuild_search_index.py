@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.blog.models import BlogPost
+from apps.blog.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de recherche plein texte des articles"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = rebuild_index(BlogPost.objects.all(), chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'{total} article(s) indexé(s)'))
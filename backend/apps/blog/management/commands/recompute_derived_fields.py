@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.blog.models import BlogPost
+from apps.blog.rendering import reading_time_for
+from apps.core.cache import bump_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les champs dérivés des articles (contenu rendu, table des "
+        "matières, temps de lecture, meta tags, termes de similarité) par lots, sans passer par save()"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='Compte sans écrire')
+        parser.add_argument(
+            '--force-render', action='store_true',
+            help="Rend à nouveau le contenu même si son empreinte n'a pas changé"
+        )
+
+    def handle(self, *args, **options):
+        self.force_render = options['force_render']
+        fields = (
+            'reading_time', 'meta_title', 'meta_description',
+            'content_html', 'content_toc', 'word_count', 'content_hash', 'similarity_terms',
+        )
+        posts = BlogPost.objects.only('id', 'title', 'excerpt', 'content', *fields).order_by('pk')
+        batch, scanned, updated = [], 0, 0
+        for post in posts.iterator(chunk_size=options['batch_size']):
+            scanned += 1
+            if self.refresh(post):
+                batch.append(post)
+            if len(batch) >= options['batch_size']:
+                updated += self.write(batch, fields, options['dry_run'])
+                batch = []
+        updated += self.write(batch, fields, options['dry_run'])
+        if updated and not options['dry_run']:
+            # bulk_update n'émet pas de signaux : invalider les réponses en cache
+            # Termes de similarité réécrits : les corpus en mémoire sont à relire
+            bump_version('blog.posts', 'blog.details', 'blog.similarity')
+
+        verb = 'à mettre à jour' if options['dry_run'] else 'mis à jour'
+        self.stdout.write(self.style.SUCCESS(f'{scanned} article(s) parcouru(s), {updated} {verb}'))
+
+    def refresh(self, post):
+        before = (post.reading_time, post.meta_title, post.meta_description)
+        rendered = post.refresh_rendered_content(force=self.force_render)
+        terms = post.refresh_similarity_terms()
+        if post.content:
+            post.reading_time = reading_time_for(post.word_count)
+        post.meta_title = post.meta_title or post.title[:60]
+        post.meta_description = post.meta_description or post.excerpt[:160]
+        return bool(rendered or terms) or before != (post.reading_time, post.meta_title, post.meta_description)
+
+    def write(self, batch, fields, dry_run):
+        if batch and not dry_run:
+            with transaction.atomic():
+                BlogPost.objects.bulk_update(batch, fields)
+        return len(batch)
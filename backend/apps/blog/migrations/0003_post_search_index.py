@@ -0,0 +1,40 @@
+# Index de recherche plein texte (voir apps/blog/search.py)
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from apps.blog.search import get_search_backend, document_for
+
+    backend = get_search_backend(schema_editor.connection)
+    if backend is None:
+        return
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    with schema_editor.connection.cursor() as cursor:
+        backend.create_index(cursor)
+        documents = [
+            (post.pk, document_for(post, [tag.name for tag in post.tags.all()]))
+            for post in BlogPost.objects.prefetch_related('tags')
+        ]
+        backend.index_documents(cursor, documents)
+
+
+def drop_search_index(apps, schema_editor):
+    from apps.blog.search import get_search_backend
+
+    backend = get_search_backend(schema_editor.connection)
+    if backend is None:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        backend.drop_index(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_alter_comment_options_alter_tag_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
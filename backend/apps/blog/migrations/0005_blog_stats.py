@@ -0,0 +1,28 @@
+# Generated by Django 5.0.2 on 2026-10-18 11:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_related_post'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_posts', models.IntegerField(default=0, verbose_name='Articles publiés')),
+                ('total_categories', models.IntegerField(default=0, verbose_name='Catégories')),
+                ('total_tags', models.IntegerField(default=0, verbose_name='Tags')),
+                ('total_comments', models.IntegerField(default=0, verbose_name='Commentaires approuvés')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Modifié le')),
+            ],
+            options={
+                'verbose_name': 'Statistiques du blog',
+                'verbose_name_plural': 'Statistiques du blog',
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:01
+
+from django.db import migrations, models
+
+
+def render_existing_posts(apps, schema_editor):
+    from apps.blog.rendering import content_hash, render_content
+
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    batch = []
+    for post in BlogPost.objects.only('id', 'content').iterator(chunk_size=500):
+        rendered = render_content(post.content)
+        post.content_html = rendered.html
+        post.content_toc = rendered.toc
+        post.word_count = rendered.word_count
+        post.content_hash = content_hash(post.content)
+        batch.append(post)
+        if len(batch) >= 500:
+            BlogPost.objects.bulk_update(batch, ['content_html', 'content_toc', 'word_count', 'content_hash'])
+            batch = []
+    BlogPost.objects.bulk_update(batch, ['content_html', 'content_toc', 'word_count', 'content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_blog_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='Empreinte du contenu'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Contenu rendu'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_toc',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Table des matières'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Nombre de mots'),
+        ),
+        migrations.RunPython(render_existing_posts, migrations.RunPython.noop),
+    ]
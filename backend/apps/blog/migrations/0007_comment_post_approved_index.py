@@ -0,0 +1,17 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_rendered_content'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'approved', 'created_at'], name='blog_comment_post_approved_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_comment_post_approved_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='flagged',
+            field=models.BooleanField(default=False, help_text="Marqué par les heuristiques anti-spam de la file d'ingestion", verbose_name='Suspect'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_comment_flagged'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='blogpost',
+            name='published_at',
+            field=models.DateTimeField(blank=True, help_text='Une date future programme la publication', null=True, verbose_name='Publié le'),
+        ),
+        migrations.AlterField(
+            model_name='blogpost',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Brouillon'), ('scheduled', 'Programmé'), ('published', 'Publié'), ('archived', 'Archivé')], default='draft', max_length=20, verbose_name='Statut'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['status', 'published_at'], name='blog_post_status_pub_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:20
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def fill_counters(apps, schema_editor):
+    BlogCategory = apps.get_model('blog', 'BlogCategory')
+    Tag = apps.get_model('blog', 'Tag')
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    for model in (BlogCategory, Tag):
+        rows = model.objects.annotate(total=Count('blogpost', filter=Q(blogpost__status='published')))
+        for row in rows:
+            row.post_count = row.total
+        model.objects.bulk_update(rows, ['post_count'], batch_size=500)
+    posts = BlogPost.objects.only('id').annotate(total=Count('comments', filter=Q(comments__approved=True)))
+    for post in posts:
+        post.comment_count = post.total
+    BlogPost.objects.bulk_update(posts, ['comment_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_scheduled_publishing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogcategory',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Articles publiés'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Commentaires approuvés'),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Articles publiés'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.2 on 2026-10-18 18:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedComment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Nom')),
+                ('email', models.EmailField(max_length=254, verbose_name='Email')),
+                ('content', models.TextField(verbose_name='Commentaire')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Reçu le')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='queued_comments', to='blog.blogpost', verbose_name='Article')),
+            ],
+            options={
+                'verbose_name': 'Commentaire en file',
+                'verbose_name_plural': 'Commentaires en file',
+                'ordering': ['pk'],
+            },
+        ),
+    ]
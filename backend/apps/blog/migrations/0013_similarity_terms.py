@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_queued_comment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='similarity_terms',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Termes (similarité)'),
+        ),
+    ]
@@ -1,15 +1,20 @@
 # ========== backend/apps/blog/models.py (Corrigé et Complet) ==========
 from django.db import models
 from django.contrib.auth import get_user_model
-from django.utils.text import slugify
 from django.urls import reverse
 from django.utils import timezone
-import readtime
-import re
+
+from apps.core.models import CounterFieldsMixin, ScheduledPublicationMixin, TrackedFieldsMixin, UniqueSlugMixin
+
+from .rendering import content_hash, render_content
+from .search import index_post
 
 User = get_user_model()
 
-class BlogCategory(models.Model):
+# Champs indexés par la recherche plein texte (les tags sont gérés par signal)
+SEARCH_FIELDS = ('title', 'excerpt', 'content')
+
+class BlogCategory(UniqueSlugMixin, CounterFieldsMixin, models.Model):
     """Catégories d'articles de blog"""
     name = models.CharField(max_length=50, unique=True, verbose_name="Nom")
     slug = models.SlugField(unique=True, blank=True, verbose_name="Slug")
@@ -20,52 +25,65 @@ class BlogCategory(models.Model):
         verbose_name="Couleur",
         help_text="Code couleur hexadécimal (ex: #3B82F6)"
     )
+    # Maintenu par signaux (apps/blog/signals.py)
+    post_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Articles publiés")
+    
+    counter_fields = ('post_count',)
     
     class Meta:
         verbose_name = 'Catégorie Blog'
         verbose_name_plural = 'Catégories Blog'
         ordering = ['name']
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
-    
     def __str__(self):
         return self.name
-    
-    @property
-    def post_count(self):
-        """Nombre d'articles publiés dans cette catégorie"""
-        return self.blogpost_set.filter(status='published').count()
 
-class Tag(models.Model):
+class Tag(UniqueSlugMixin, CounterFieldsMixin, models.Model):
     """Tags pour les articles"""
     name = models.CharField(max_length=30, unique=True, verbose_name="Nom")
     slug = models.SlugField(unique=True, blank=True, verbose_name="Slug")
+    # Maintenu par signaux (apps/blog/signals.py)
+    post_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Articles publiés")
+    
+    counter_fields = ('post_count',)
     
     class Meta:
         ordering = ['name']
         verbose_name = "Tag"
         verbose_name_plural = "Tags"
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
-    
     def __str__(self):
         return self.name
+
+class BlogPostQuerySet(models.QuerySet):
+    """Requêtes réutilisables sur les articles"""
     
-    @property
-    def post_count(self):
-        """Nombre d'articles publiés avec ce tag"""
-        return self.blogpost_set.filter(status='published').count()
+    def published(self):
+        return self.filter(status='published')
+    
+    def for_listing(self, fields=None):
+        """
+        Chemin de lecture des listes : auteur et catégorie joints et tags
+        préchargés, pour un nombre de requêtes constant quelle que soit la
+        taille de la page (le nombre de commentaires est une colonne).
+        
+        `fields` (voir apps.core.serializers.selected_fields) limite les
+        jointures, prefetch et annotations aux champs réellement rendus.
+        """
+        wanted = lambda name: fields is None or name in fields
+        queryset = self
+        related = [name for name in ('author', 'category') if wanted(name)]
+        if related:
+            queryset = queryset.select_related(*related)
+        if wanted('tags'):
+            queryset = queryset.prefetch_related('tags')
+        return queryset
 
-class BlogPost(models.Model):
+class BlogPost(UniqueSlugMixin, TrackedFieldsMixin, ScheduledPublicationMixin, CounterFieldsMixin, models.Model):
     """Articles de blog"""
     STATUS_CHOICES = [
         ('draft', 'Brouillon'),
+        ('scheduled', 'Programmé'),
         ('published', 'Publié'),
         ('archived', 'Archivé'),
     ]
@@ -85,6 +103,9 @@ class BlogPost(models.Model):
         null=True,
         verbose_name="Image mise en avant"
     )
+    # Placeholder (dimensions, couleur dominante, LQIP) produit hors requête (apps.core.images)
+    featured_image_placeholder = models.JSONField(default=dict, blank=True, editable=False)
+    featured_image_source = models.CharField(max_length=255, blank=True, editable=False)
     
     # SEO
     meta_title = models.CharField(
@@ -135,6 +156,16 @@ class BlogPost(models.Model):
         verbose_name="Temps de lecture",
         help_text='Temps de lecture en minutes (calculé automatiquement)'
     )
+    # Commentaires approuvés, maintenu par signaux (apps/blog/signals.py)
+    comment_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Commentaires approuvés")
+    
+    # Contenu rendu (assaini, ancres des titres), recalculé quand le contenu change
+    content_html = models.TextField(blank=True, editable=False, verbose_name="Contenu rendu")
+    content_toc = models.JSONField(default=list, blank=True, editable=False, verbose_name="Table des matières")
+    word_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Nombre de mots")
+    content_hash = models.CharField(max_length=64, blank=True, editable=False, verbose_name="Empreinte du contenu")
+    # Termes hachés du texte pour l'index des articles similaires (voir similarity.py)
+    similarity_terms = models.JSONField(default=list, blank=True, editable=False, verbose_name="Termes (similarité)")
     
     # Dates
     created_at = models.DateTimeField(
@@ -148,46 +179,101 @@ class BlogPost(models.Model):
     published_at = models.DateTimeField(
         null=True, 
         blank=True,
-        verbose_name="Publié le"
+        verbose_name="Publié le",
+        help_text="Une date future programme la publication"
     )
     
+    objects = BlogPostQuerySet.as_manager()
+    tracked_fields = ('status', 'category_id') + SEARCH_FIELDS
+    counter_fields = ('comment_count', 'view_count')
+    slug_source = 'title'
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Article'
         verbose_name_plural = 'Articles'
+        indexes = [
+            # Échéances des publications programmées (apps.core.publishing)
+            models.Index(fields=['status', 'published_at'], name='blog_post_status_pub_idx'),
+        ]
     
-    def save(self, *args, **kwargs):
-        # Générer le slug automatiquement
-        if not self.slug:
-            base_slug = slugify(self.title)
-            slug = base_slug
-            counter = 1
-            while BlogPost.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
+    def source_changed(self, field, update_fields=None):
+        """Le champ source sera écrit par ce save et diffère de la base"""
+        if update_fields is not None and field not in update_fields:
+            return False
+        if field in self.get_deferred_fields():
+            return False
+        return self.has_changed(field)
+    
+    def refresh_derived_fields(self, update_fields=None):
+        """
+        Recalcule les champs dérivés dont la source a changé (ou qui sont
+        vides) et renvoie l'ensemble des champs effectivement modifiés.
+        """
+        written = lambda field: update_fields is None or field in update_fields
+        derived = set()
+        
+        # Rendu, nombre de mots et temps de lecture : seulement si le
+        # contenu a changé (l'empreinte écarte les réécritures à l'identique)
+        if self.source_changed('content', update_fields):
+            derived |= self.refresh_rendered_content()
         
-        # Calcul automatique du temps de lecture
-        if self.content:
-            # Nettoyer le contenu des balises HTML pour le comptage
-            clean_content = re.sub(r'<[^>]+>', '', self.content)
-            word_count = len(clean_content.split())
-            # Moyenne de 200 mots par minute
-            self.reading_time = max(1, round(word_count / 200))
+        # Termes de l'index des articles similaires : seulement si le texte a changé
+        if any(self.source_changed(field, update_fields) for field in SEARCH_FIELDS):
+            derived |= self.refresh_similarity_terms()
         
         # Auto-remplissage des meta tags si vides
-        if not self.meta_title:
+        if not self.meta_title and (written('title') or written('meta_title')):
             self.meta_title = self.title[:60]
-        if not self.meta_description:
+            derived.add('meta_title')
+        if not self.meta_description and (written('excerpt') or written('meta_description')):
             self.meta_description = self.excerpt[:160]
+            derived.add('meta_description')
+        
+        # Date de publication, ou programmation si elle est future
+        if self.publication_written(update_fields):
+            derived |= self.refresh_publication_state()
+        return derived
+    
+    def refresh_rendered_content(self, force=False):
+        """Rend le contenu si son empreinte a changé ; renvoie les champs modifiés"""
+        digest = content_hash(self.content)
+        if digest == self.content_hash and not force:
+            return set()
+        rendered = render_content(self.content)
+        self.content_html = rendered.html
+        self.content_toc = rendered.toc
+        self.word_count = rendered.word_count
+        self.content_hash = digest
+        changed = {'content_html', 'content_toc', 'word_count', 'content_hash'}
+        if self.content and rendered.reading_time != self.reading_time:
+            self.reading_time = rendered.reading_time
+            changed.add('reading_time')
+        return changed
+    
+    def refresh_similarity_terms(self):
+        """Recalcule les termes hachés du texte ; renvoie les champs modifiés"""
+        from .similarity import term_counts
+        terms = term_counts(self.title, self.excerpt, self.content)
+        if terms == self.similarity_terms:
+            return set()
+        self.similarity_terms = terms
+        return {'similarity_terms'}
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+        derived = self.refresh_derived_fields(update_fields)
+        if update_fields is not None and derived:
+            kwargs['update_fields'] = update_fields | derived
+        reindex = any(self.source_changed(field, update_fields) for field in SEARCH_FIELDS)
         
-        # Définir la date de publication si l'article devient publié
-        if self.status == 'published' and not self.published_at:
-            self.published_at = timezone.now()
-        elif self.status != 'published':
-            self.published_at = None
-            
         super().save(*args, **kwargs)
+        
+        # Maintenir l'index plein texte à jour (les tags sont gérés par signal)
+        if reindex:
+            index_post(self)
     
     def get_absolute_url(self):
         return reverse('blog:post-detail', kwargs={'slug': self.slug})
@@ -195,11 +281,6 @@ class BlogPost(models.Model):
     def __str__(self):
         return self.title
     
-    @property
-    def comment_count(self):
-        """Nombre de commentaires approuvés"""
-        return self.comments.filter(approved=True).count()
-    
     @property
     def is_recent(self):
         """Vérifie si l'article est récent (moins de 30 jours)"""
@@ -214,20 +295,40 @@ class BlogPost(models.Model):
         return f"{self.reading_time} min de lecture"
     
     def get_related_posts(self, limit=3):
-        """Articles similaires basés sur la catégorie et les tags"""
-        related = BlogPost.objects.filter(
-            status='published'
-        ).exclude(pk=self.pk)
-        
-        if self.category:
-            related = related.filter(category=self.category)
-        
-        if self.tags.exists():
-            related = related.filter(tags__in=self.tags.all()).distinct()
-        
-        return related.order_by('-view_count', '-published_at')[:limit]
+        """Articles similaires lus depuis l'index précalculé (voir similarity.py)"""
+        return BlogPost.objects.published().filter(
+            neighbour_of__post=self
+        ).order_by('neighbour_of__rank')[:limit]
 
-class Comment(models.Model):
+class RelatedPost(models.Model):
+    """Voisins précalculés d'un article (tags + similarité du texte)"""
+    post = models.ForeignKey(
+        BlogPost,
+        related_name='neighbours',
+        on_delete=models.CASCADE,
+        verbose_name="Article"
+    )
+    related = models.ForeignKey(
+        BlogPost,
+        related_name='neighbour_of',
+        on_delete=models.CASCADE,
+        verbose_name="Article similaire"
+    )
+    score = models.FloatField(verbose_name="Score")
+    rank = models.PositiveSmallIntegerField(verbose_name="Rang")
+    
+    class Meta:
+        ordering = ['post', 'rank']
+        verbose_name = "Article similaire"
+        verbose_name_plural = "Articles similaires"
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'rank'], name='blog_relatedpost_post_rank'),
+        ]
+    
+    def __str__(self):
+        return f'{self.post_id} → {self.related_id} ({self.score:.3f})'
+
+class Comment(TrackedFieldsMixin, models.Model):
     """Commentaires des articles"""
     post = models.ForeignKey(
         BlogPost, 
@@ -243,15 +344,26 @@ class Comment(models.Model):
         verbose_name="Approuvé",
         help_text="Les commentaires doivent être approuvés avant d'être visibles"
     )
+    flagged = models.BooleanField(
+        default=False,
+        verbose_name="Suspect",
+        help_text="Marqué par les heuristiques anti-spam de la file d'ingestion"
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name="Créé le"
     )
     
+    tracked_fields = ('approved',)
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Commentaire"
         verbose_name_plural = "Commentaires"
+        indexes = [
+            # Commentaires approuvés d'un article, par date (pagination par curseur)
+            models.Index(fields=['post', 'approved', 'created_at'], name='blog_comment_post_approved_idx'),
+        ]
     
     def __str__(self):
         return f'Commentaire de {self.name} sur {self.post.title}'
@@ -261,3 +373,48 @@ class Comment(models.Model):
         """Vérifie si le commentaire est récent (moins de 7 jours)"""
         from datetime import timedelta
         return self.created_at > timezone.now() - timedelta(days=7)
+
+class QueuedComment(models.Model):
+    """
+    Commentaire validé en attente de traitement par la file d'ingestion
+    (voir apps/blog/ingestion.py) : table de transit, vidée par lots
+    """
+    post = models.ForeignKey(
+        BlogPost,
+        related_name='queued_comments',
+        on_delete=models.CASCADE,
+        verbose_name="Article"
+    )
+    name = models.CharField(max_length=100, verbose_name="Nom")
+    email = models.EmailField(verbose_name="Email")
+    content = models.TextField(verbose_name="Commentaire")
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Reçu le"
+    )
+    
+    class Meta:
+        ordering = ['pk']
+        verbose_name = "Commentaire en file"
+        verbose_name_plural = "Commentaires en file"
+    
+    def __str__(self):
+        return f'Commentaire en file de {self.name} (article {self.post_id})'
+
+class BlogStats(models.Model):
+    """
+    Instantané des statistiques publiques du blog (ligne unique), maintenu
+    de façon incrémentale par signaux (voir apps/blog/stats.py)
+    """
+    total_posts = models.IntegerField(default=0, verbose_name="Articles publiés")
+    total_categories = models.IntegerField(default=0, verbose_name="Catégories")
+    total_tags = models.IntegerField(default=0, verbose_name="Tags")
+    total_comments = models.IntegerField(default=0, verbose_name="Commentaires approuvés")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Modifié le")
+    
+    class Meta:
+        verbose_name = "Statistiques du blog"
+        verbose_name_plural = "Statistiques du blog"
+    
+    def __str__(self):
+        return f'Statistiques du blog ({self.updated_at:%Y-%m-%d %H:%M})'
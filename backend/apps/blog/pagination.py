@@ -0,0 +1,11 @@
+# ========== backend/apps/blog/pagination.py ==========
+from apps.core.pagination import KeysetPagination
+
+
+class CommentPagination(KeysetPagination):
+    """Commentaires du plus récent au plus ancien, par curseur sur (created_at, id)"""
+    page_size = 10
+    max_page_size = 50
+
+    def __init__(self):
+        super().__init__(('-created_at', '-id'))
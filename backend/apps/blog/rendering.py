@@ -0,0 +1,194 @@
+# ========== backend/apps/blog/rendering.py ==========
+"""
+Rendu du contenu des articles, calculé une fois par modification.
+
+Le contenu saisi (HTML de l'éditeur, ou texte brut) est réécrit à partir
+d'une liste blanche de balises et d'attributs : tout le reste est échappé
+ou supprimé (script, style, gestionnaires on*, URLs javascript:). Les
+titres h2-h4 reçoivent une ancre et alimentent la table des matières.
+
+Le résultat est stocké sur l'article avec l'empreinte du contenu source :
+tant que l'empreinte correspond, rien n'est recalculé.
+"""
+import hashlib
+from dataclasses import dataclass, field
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from django.utils.html import linebreaks
+from django.utils.text import slugify
+
+# À incrémenter quand le rendu change : invalide les empreintes stockées
+RENDERER_VERSION = 1
+
+ALLOWED_TAGS = {
+    'p', 'br', 'hr', 'h2', 'h3', 'h4', 'h5', 'h6', 'strong', 'b', 'em', 'i',
+    'u', 's', 'del', 'mark', 'sub', 'sup', 'small', 'blockquote', 'q', 'cite',
+    'code', 'pre', 'kbd', 'ul', 'ol', 'li', 'dl', 'dt', 'dd', 'a', 'img',
+    'figure', 'figcaption', 'table', 'thead', 'tbody', 'tfoot', 'tr', 'th',
+    'td', 'caption', 'span', 'div',
+}
+VOID_TAGS = {'br', 'hr', 'img'}
+# Balises en ligne : ne séparent pas les mots pour le comptage
+INLINE_TAGS = {'strong', 'b', 'em', 'i', 'u', 's', 'del', 'mark', 'sub', 'sup', 'small', 'q', 'cite', 'code', 'kbd', 'a', 'span'}
+# Balises retirées avec leur contenu
+DROPPED_TAGS = {'script', 'style', 'iframe', 'object', 'embed', 'template', 'noscript'}
+# Un seul h1 par page (le titre de l'article) : ceux du contenu deviennent des h2
+RENAMED_TAGS = {'h1': 'h2'}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title'},
+    'img': {'src', 'alt', 'title', 'width', 'height'},
+    'th': {'colspan', 'rowspan', 'scope'},
+    'td': {'colspan', 'rowspan'},
+    'ol': {'start'},
+    'code': {'class'},
+    'pre': {'class'},
+    'span': {'class'},
+}
+URL_ATTRIBUTES = {'href', 'src'}
+ALLOWED_SCHEMES = {'', 'http', 'https', 'mailto'}
+TOC_LEVELS = {'h2': 2, 'h3': 3, 'h4': 4}
+WORDS_PER_MINUTE = 200
+
+
+@dataclass
+class RenderedContent:
+    html: str
+    toc: list = field(default_factory=list)
+    word_count: int = 0
+
+    @property
+    def reading_time(self):
+        return reading_time_for(self.word_count)
+
+
+def reading_time_for(word_count):
+    """Temps de lecture en minutes"""
+    return max(1, round(word_count / WORDS_PER_MINUTE))
+
+
+def content_hash(content):
+    return hashlib.sha256(f'{RENDERER_VERSION}:{content or ""}'.encode()).hexdigest()
+
+
+def safe_url(value):
+    value = (value or '').strip()
+    try:
+        scheme = urlsplit(value).scheme.lower()
+    except ValueError:
+        return None
+    return value if scheme in ALLOWED_SCHEMES else None
+
+
+class ContentSanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.open_tags = []
+        self.dropping = 0
+        self.text = []
+        self.toc = []
+        self.anchors = set()
+        # Titre en cours : (balise, index de sortie du <hN>, fragments de texte)
+        self.heading = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_TAGS:
+            self.dropping += 1
+            return
+        tag = RENAMED_TAGS.get(tag, tag)
+        if self.dropping:
+            return
+        if tag not in INLINE_TAGS:
+            self.text.append(' ')
+        if tag not in ALLOWED_TAGS:
+            return
+        allowed = ALLOWED_ATTRIBUTES.get(tag, set())
+        kept = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRIBUTES:
+                value = safe_url(value)
+                if value is None:
+                    continue
+            kept.append((name, value))
+        if tag == 'a' and any(name == 'href' and value.startswith(('http://', 'https://')) for name, value in kept):
+            kept.append(('rel', 'noopener noreferrer'))
+        if tag == 'img':
+            kept.append(('loading', 'lazy'))
+        rendered = ''.join(f' {name}="{escape(value)}"' for name, value in kept)
+        self.out.append(f'<{tag}{rendered}>')
+        if tag in VOID_TAGS:
+            return
+        self.open_tags.append(tag)
+        if tag in TOC_LEVELS and self.heading is None:
+            self.heading = (tag, len(self.out) - 1, [])
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        tag = RENAMED_TAGS.get(tag, tag)
+        if tag not in VOID_TAGS and self.open_tags and self.open_tags[-1] == tag:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_TAGS:
+            self.dropping = max(0, self.dropping - 1)
+            return
+        tag = RENAMED_TAGS.get(tag, tag)
+        if self.dropping:
+            return
+        if tag not in INLINE_TAGS:
+            self.text.append(' ')
+        if tag not in self.open_tags:
+            return
+        # Referme les balises laissées ouvertes à l'intérieur
+        while self.open_tags:
+            current = self.open_tags.pop()
+            self.out.append(f'</{current}>')
+            if self.heading and self.heading[0] == current:
+                self.close_heading()
+            if current == tag:
+                break
+
+    def handle_data(self, data):
+        if self.dropping:
+            return
+        self.text.append(data)
+        if self.heading:
+            self.heading[2].append(data)
+        self.out.append(escape(data, quote=False))
+
+    def close_heading(self):
+        tag, position, parts = self.heading
+        self.heading = None
+        title = ' '.join(''.join(parts).split())
+        if not title:
+            return
+        anchor = base = slugify(title) or 'section'
+        counter = 1
+        while anchor in self.anchors:
+            anchor = f'{base}-{counter}'
+            counter += 1
+        self.anchors.add(anchor)
+        self.out[position] = self.out[position][:-1] + f' id="{anchor}">'
+        self.toc.append({'level': TOC_LEVELS[tag], 'id': anchor, 'title': title})
+
+    def result(self):
+        while self.open_tags:
+            self.handle_endtag(self.open_tags[-1])
+        word_count = len(''.join(self.text).split())
+        return RenderedContent(html=''.join(self.out), toc=self.toc, word_count=word_count)
+
+
+def render_content(content):
+    """HTML assaini, table des matières et nombre de mots du contenu"""
+    content = content or ''
+    if '<' not in content:
+        # Texte brut : paragraphes et retours à la ligne
+        content = linebreaks(content, autoescape=True)
+    parser = ContentSanitizer()
+    parser.feed(content)
+    parser.close()
+    return parser.result()
@@ -0,0 +1,262 @@
+# ========== backend/apps/blog/search.py ==========
+"""
+Recherche plein texte des articles.
+
+L'index couvre le titre, l'extrait, le contenu et les noms de tags. Il est
+stocké dans la table `blog_post_search`, créée par la migration 0003 :
+  - PostgreSQL : document `tsvector` pondéré (configuration `french`) + index GIN
+  - SQLite     : table virtuelle FTS5 (tokenizer unicode61 sans accents)
+"""
+import re
+from dataclasses import dataclass
+
+from django.db import connection
+
+SEARCH_TABLE = 'blog_post_search'
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_STOP = '</mark>'
+
+TAG_RE = re.compile(r'<[^>]+>')
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+# Suffixes flexionnels/dérivationnels français, du plus long au plus court
+FRENCH_SUFFIXES = (
+    'issements', 'issement', 'atrices', 'ateurs', 'ations', 'atrice',
+    'ateur', 'ation', 'ements', 'ement', 'ments', 'ment', 'euses', 'euse',
+    'ités', 'ité', 'ives', 'ive', 'ifs', 'if', 'eaux', 'aux', 'es', 's', 'x', 'e',
+)
+
+
+@dataclass
+class SearchHit:
+    post_id: int
+    rank: float
+    snippet: str
+
+
+def strip_html(value):
+    return TAG_RE.sub(' ', value or '')
+
+
+def french_stem(word):
+    """Racinisation légère, utilisée pour les requêtes préfixées FTS5"""
+    word = word.lower()
+    for suffix in FRENCH_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+def document_for(post, tag_names=None):
+    """Champs indexés d'un article"""
+    if tag_names is None:
+        tag_names = post.tags.values_list('name', flat=True) if post.pk else []
+    return {
+        'title': post.title or '',
+        'excerpt': post.excerpt or '',
+        'content': strip_html(post.content),
+        'tags': ' '.join(tag_names),
+    }
+
+
+def restriction(column, within):
+    """
+    Clause `AND column IN (sous-requête)` limitant la recherche aux articles
+    d'un queryset (publiés, catégorie, tag...), appliquée avant le LIMIT
+    """
+    if within is None:
+        return '', ()
+    sql, params = within.order_by().values('pk').query.sql_with_params()
+    return f' AND {column} IN ({sql})', params
+
+
+class SQLiteSearchBackend:
+    """Index FTS5 : rowid = id de l'article, classement BM25"""
+
+    # Poids BM25 : title, excerpt, content, tags
+    WEIGHTS = (10.0, 4.0, 1.0, 6.0)
+
+    def create_index(self, cursor):
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5('
+            'title, excerpt, content, tags, '
+            'tokenize = "unicode61 remove_diacritics 2")'
+        )
+
+    def drop_index(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+    def index_documents(self, cursor, documents):
+        """documents : itérable de (post_id, document)"""
+        rows = [
+            (post_id, doc['title'], doc['excerpt'], doc['content'], doc['tags'])
+            for post_id, doc in documents
+        ]
+        if not rows:
+            return
+        cursor.executemany(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [(r[0],) for r in rows])
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, title, excerpt, content, tags) '
+            'VALUES (%s, %s, %s, %s, %s)',
+            rows
+        )
+
+    def remove(self, cursor, post_id):
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [post_id])
+
+    def build_query(self, query):
+        terms = [french_stem(word) for word in WORD_RE.findall(query)]
+        # Chaque terme est cité (pas de syntaxe FTS5 injectable) et préfixé
+        return ' '.join(f'"{term}"*' for term in terms if term)
+
+    def search(self, cursor, query, limit, within=None):
+        match = self.build_query(query)
+        if not match:
+            return []
+        weights = ', '.join(str(w) for w in self.WEIGHTS)
+        scope, scope_params = restriction('rowid', within)
+        cursor.execute(
+            f'SELECT rowid, bm25({SEARCH_TABLE}, {weights}) AS rank, '
+            f"snippet({SEARCH_TABLE}, -1, %s, %s, '…', 24) "
+            f'FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s{scope} '
+            'ORDER BY rank LIMIT %s',
+            [HIGHLIGHT_START, HIGHLIGHT_STOP, match, *scope_params, limit]
+        )
+        # bm25() est négatif : plus petit = plus pertinent
+        return [SearchHit(row[0], -row[1], row[2]) for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend:
+    """Document tsvector pondéré (français) avec index GIN, classement ts_rank_cd"""
+
+    CONFIG = 'french'
+
+    def create_index(self, cursor):
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+            'post_id bigint PRIMARY KEY REFERENCES blog_blogpost (id) '
+            'ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+            'content text NOT NULL, '
+            'document tsvector NOT NULL)'
+        )
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_gin '
+            f'ON {SEARCH_TABLE} USING GIN (document)'
+        )
+
+    def drop_index(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+    def index_documents(self, cursor, documents):
+        rows = [
+            (post_id, doc['content'], doc['title'], doc['excerpt'], doc['tags'], doc['content'])
+            for post_id, doc in documents
+        ]
+        if not rows:
+            return
+        config = self.CONFIG
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (post_id, content, document) VALUES (%s, %s, '
+            f"setweight(to_tsvector('{config}', %s), 'A') || "
+            f"setweight(to_tsvector('{config}', %s), 'B') || "
+            f"setweight(to_tsvector('{config}', %s), 'B') || "
+            f"setweight(to_tsvector('{config}', %s), 'C')) "
+            'ON CONFLICT (post_id) DO UPDATE SET '
+            'content = EXCLUDED.content, document = EXCLUDED.document',
+            rows
+        )
+
+    def remove(self, cursor, post_id):
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE post_id = %s', [post_id])
+
+    def search(self, cursor, query, limit, within=None):
+        if not WORD_RE.search(query):
+            return []
+        config = self.CONFIG
+        scope, scope_params = restriction('s.post_id', within)
+        cursor.execute(
+            'SELECT s.post_id, ts_rank_cd(s.document, q) AS rank, '
+            f"ts_headline('{config}', s.content, q, %s) "
+            f"FROM {SEARCH_TABLE} s, websearch_to_tsquery('{config}', %s) q "
+            f'WHERE s.document @@ q{scope} ORDER BY rank DESC LIMIT %s',
+            [
+                f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, '
+                'MaxWords=35, MinWords=15, MaxFragments=2',
+                query, *scope_params, limit
+            ]
+        )
+        return [SearchHit(row[0], row[1], row[2]) for row in cursor.fetchall()]
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend(conn=None):
+    """Backend adapté à la base courante, ou None si non supportée"""
+    conn = conn or connection
+    backend_class = BACKENDS.get(conn.vendor)
+    return backend_class() if backend_class else None
+
+
+def index_posts(posts):
+    """Indexe (ou réindexe) une liste d'articles, tags préchargés si possible"""
+    backend = get_search_backend()
+    if backend is None:
+        return
+    documents = [
+        (post.pk, document_for(post, [tag.name for tag in post.tags.all()]))
+        for post in posts
+    ]
+    with connection.cursor() as cursor:
+        backend.index_documents(cursor, documents)
+
+
+def index_post(post):
+    backend = get_search_backend()
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        backend.index_documents(cursor, [(post.pk, document_for(post))])
+
+
+def remove_post(post_id):
+    backend = get_search_backend()
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        backend.remove(cursor, post_id)
+
+
+def search_posts(query, limit=200, within=None):
+    """
+    Résultats classés par pertinence décroissante, restreints aux articles
+    du queryset `within` s'il est fourni
+    """
+    backend = get_search_backend()
+    if backend is None:
+        return None
+    with connection.cursor() as cursor:
+        return backend.search(cursor, query, limit, within)
+
+
+def rebuild_index(queryset, chunk_size=500):
+    """Reconstruit l'index complet par lots ; retourne le nombre d'articles indexés"""
+    backend = get_search_backend()
+    if backend is None:
+        return 0
+    total = 0
+    batch = []
+    with connection.cursor() as cursor:
+        backend.drop_index(cursor)
+        backend.create_index(cursor)
+    for post in queryset.prefetch_related('tags').iterator(chunk_size=chunk_size):
+        batch.append(post)
+        if len(batch) >= chunk_size:
+            index_posts(batch)
+            total += len(batch)
+            batch = []
+    index_posts(batch)
+    return total + len(batch)
@@ -1,7 +1,11 @@
 
 # ========== backend/apps/blog/serializers.py (Amélioré) ==========
 from rest_framework import serializers
+from apps.core.serializers import ResizedImageField, SparseFieldsetMixin
 from .models import BlogPost, BlogCategory, Tag, Comment
+from .pagination import CommentPagination
+from .rendering import reading_time_for, render_content
+from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
 
@@ -15,6 +19,18 @@ class BlogCategorySerializer(serializers.ModelSerializer):
         model = BlogCategory
         fields = ('id', 'name', 'slug', 'description', 'color')
 
+class BlogCategoryCountSerializer(BlogCategorySerializer):
+    """Catégorie avec nombre d'articles publiés (colonne maintenue par signaux)"""
+    
+    class Meta(BlogCategorySerializer.Meta):
+        fields = BlogCategorySerializer.Meta.fields + ('post_count',)
+
+class TagCountSerializer(TagSerializer):
+    """Tag avec nombre d'articles publiés (colonne maintenue par signaux)"""
+    
+    class Meta(TagSerializer.Meta):
+        fields = TagSerializer.Meta.fields + ('post_count',)
+
 class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
@@ -36,55 +52,90 @@ class CommentSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Le commentaire ne peut pas dépasser 1000 caractères.")
         return content
 
-class BlogPostListSerializer(serializers.ModelSerializer):
+class BlogPostListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer optimisé pour la liste des articles"""
     author = serializers.StringRelatedField()
     category = BlogCategorySerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
-    comments_count = serializers.SerializerMethodField()
+    comments_count = serializers.IntegerField(source='comment_count', read_only=True)
+    search_snippet = serializers.SerializerMethodField()
+    featured_image_thumbnail = ResizedImageField(800, source='featured_image')
     
     class Meta:
         model = BlogPost
         fields = (
-            'id', 'title', 'slug', 'excerpt', 'featured_image',
+            'id', 'title', 'slug', 'excerpt', 'featured_image', 'featured_image_thumbnail',
+            'featured_image_placeholder',
             'author', 'category', 'tags', 'featured', 'view_count',
-            'reading_time', 'created_at', 'published_at', 'comments_count'
+            'reading_time', 'created_at', 'published_at', 'comments_count',
+            'search_snippet'
         )
+        expandable = ('author', 'category', 'tags')
+    
+    def get_search_snippet(self, obj):
+        """Extrait surligné (<mark>) quand la liste provient d'une recherche"""
+        return self.context.get('search_snippets', {}).get(obj.pk)
+
+class RelatedPostSerializer(serializers.ModelSerializer):
+    """Carte légère d'un article similaire"""
     
-    def get_comments_count(self, obj):
-        """Nombre de commentaires approuvés"""
-        return obj.comments.filter(approved=True).count()
+    class Meta:
+        model = BlogPost
+        fields = ('id', 'title', 'slug', 'excerpt', 'featured_image', 'featured_image_placeholder', 'published_at')
 
-class BlogPostDetailSerializer(serializers.ModelSerializer):
+class BlogPostDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer complet pour le détail d'un article"""
     author = serializers.StringRelatedField()
     category = BlogCategorySerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
     comments = serializers.SerializerMethodField()
+    related_posts = serializers.SerializerMethodField()
+    
+    # Contenu rendu à l'enregistrement (voir apps/blog/rendering.py)
+    content_html = serializers.SerializerMethodField()
+    toc = serializers.JSONField(source='content_toc', read_only=True)
     
     # Champs calculés
-    comments_count = serializers.SerializerMethodField()
+    comments_count = serializers.IntegerField(source='comment_count', read_only=True)
     is_recent = serializers.SerializerMethodField()
     estimated_read_time = serializers.SerializerMethodField()
     
     class Meta:
         model = BlogPost
         fields = (
-            'id', 'title', 'slug', 'excerpt', 'content', 'featured_image',
-            'meta_title', 'meta_description', 'author', 'category', 'tags',
-            'comments', 'featured', 'view_count', 'reading_time',
+            'id', 'title', 'slug', 'excerpt', 'content', 'content_html', 'toc',
+            'word_count', 'featured_image', 'featured_image_placeholder', 'meta_title', 'meta_description',
+            'author', 'category', 'tags', 'comments', 'featured', 'view_count', 'reading_time',
             'created_at', 'updated_at', 'published_at', 'comments_count',
-            'is_recent', 'estimated_read_time'
+            'is_recent', 'estimated_read_time', 'related_posts'
         )
+        expandable = ('author', 'category', 'tags', 'comments', 'related_posts')
+    
+    def get_content_html(self, obj):
+        """HTML assaini stocké ; rendu à la volée si l'article n'a pas encore été rendu"""
+        if obj.content_hash:
+            return obj.content_html
+        return render_content(obj.content).html
     
     def get_comments(self, obj):
-        """Commentaires approuvés uniquement"""
-        approved_comments = obj.comments.filter(approved=True).order_by('-created_at')
-        return CommentSerializer(approved_comments, many=True).data
+        """
+        Nombre et première page des commentaires approuvés ; la suite se lit
+        sur posts/<slug>/comments/ (lien `next`).
+        """
+        url = reverse('blog:post-comments', kwargs={'slug': obj.slug})
+        request = self.context.get('request')
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        comments, next_link = CommentPagination().first_page(obj.comments.filter(approved=True), url)
+        return {
+            'count': obj.comment_count,
+            'next': next_link,
+            'results': CommentSerializer(comments, many=True).data,
+        }
     
-    def get_comments_count(self, obj):
-        """Nombre de commentaires approuvés"""
-        return obj.comments.filter(approved=True).count()
+    def get_related_posts(self, obj):
+        """Articles similaires issus de l'index précalculé"""
+        return RelatedPostSerializer(obj.get_related_posts(), many=True, context=self.context).data
     
     def get_is_recent(self, obj):
         """Vérifie si l'article est récent (moins de 30 jours)"""
@@ -98,9 +149,7 @@ class BlogPostDetailSerializer(serializers.ModelSerializer):
             return obj.reading_time
         
         # Calcul approximatif : 200 mots par minute
-        word_count = len(obj.content.split())
-        read_time = max(1, round(word_count / 200))
-        return read_time
+        return reading_time_for(obj.word_count or len(obj.content.split()))
 
 class BlogPostCreateSerializer(serializers.ModelSerializer):
     """Serializer pour créer/modifier un article"""
@@ -110,7 +159,7 @@ class BlogPostCreateSerializer(serializers.ModelSerializer):
         fields = (
             'title', 'excerpt', 'content', 'featured_image',
             'meta_title', 'meta_description', 'category', 'tags',
-            'featured', 'status'
+            'featured', 'status', 'published_at'
         )
     
     def validate_title(self, value):
@@ -0,0 +1,254 @@
+# ========== backend/apps/blog/signals.py ==========
+import threading
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.core import denorm, images
+from apps.core.cache import bump_version
+
+from . import search, similarity, stats
+from .models import SEARCH_FIELDS, BlogCategory, BlogPost, Comment, RelatedPost, Tag
+
+
+def _reindex(post_ids):
+    if post_ids:
+        search.index_posts(BlogPost.objects.filter(pk__in=post_ids).prefetch_related('tags'))
+
+
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def reindex_on_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Les noms de tags font partie du document indexé"""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            search.index_post(instance)
+            # Un ajout sans nouveau tag (pk_set vide) ne change pas les voisins
+            if instance.status == 'published' and (pk_set or action == 'post_clear'):
+                similarity.schedule(update=[instance.pk])
+        return
+
+    # Côté Tag : l'instance est un tag, pk_set contient des articles
+    if action == 'pre_clear':
+        instance._search_post_ids = list(instance.blogpost_set.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        _reindex(getattr(instance, '_search_post_ids', []))
+        similarity.schedule(update=getattr(instance, '_search_post_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        _reindex(pk_set)
+        similarity.schedule(update=pk_set)
+
+
+@receiver(post_save, sender=Tag)
+def reindex_on_tag_saved(sender, instance, created, **kwargs):
+    if not created:
+        _reindex(list(instance.blogpost_set.values_list('pk', flat=True)))
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tag_posts(sender, instance, **kwargs):
+    instance._search_post_ids = list(instance.blogpost_set.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def reindex_on_tag_deleted(sender, instance, **kwargs):
+    _reindex(getattr(instance, '_search_post_ids', []))
+    similarity.schedule(update=getattr(instance, '_search_post_ids', []))
+
+
+@receiver(post_delete, sender=BlogPost)
+def unindex_deleted_post(sender, instance, **kwargs):
+    search.remove_post(instance.pk)
+
+
+@receiver(post_save, sender=BlogPost)
+def update_related_on_post_saved(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Met à jour l'index des articles similaires pour cet article et ses
+    voisins, seulement si son texte ou sa publication ont changé
+    """
+    if 'published' not in (instance.status, instance.previous_value('status')):
+        return
+    fields = ('status',) + SEARCH_FIELDS
+    if created or any(instance.source_changed(field, update_fields) for field in fields):
+        similarity.schedule(update=[instance.pk])
+
+
+@receiver(pre_delete, sender=BlogPost)
+def remember_referencing_posts(sender, instance, **kwargs):
+    instance._referencing_post_ids = list(
+        RelatedPost.objects.filter(related=instance).values_list('post_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=BlogPost)
+def update_related_on_post_deleted(sender, instance, **kwargs):
+    # L'article sort aussi du corpus gardé en mémoire
+    similarity.schedule(update=[instance.pk], recompute=getattr(instance, '_referencing_post_ids', []))
+
+
+@receiver([post_save, post_delete], sender=BlogPost)
+@receiver([post_save, post_delete], sender=BlogCategory)
+@receiver([post_save, post_delete], sender=Tag)
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def invalidate_read_caches(sender, **kwargs):
+    """
+    Listes, détails (catégorie, tags et articles similaires imbriqués) et
+    comptages par catégorie/tag dépendent des articles et des taxonomies
+    """
+    bump_version('blog.posts', 'blog.details', 'blog.taxonomy')
+
+
+@receiver(post_save, sender=BlogPost)
+def schedule_featured_image_placeholder(sender, instance, **kwargs):
+    images.schedule(
+        instance, 'featured_image', 'featured_image_source',
+        placeholder_field='featured_image_placeholder', namespaces=('blog.posts', 'blog.details'),
+    )
+
+
+# Articles en cours de suppression : leurs commentaires, supprimés en
+# cascade, sont décomptés en un seul delta (voir uncount_deleted_post_comments)
+_deleting = threading.local()
+
+
+def _deleting_post_ids():
+    if not hasattr(_deleting, 'post_ids'):
+        _deleting.post_ids = set()
+    return _deleting.post_ids
+
+
+@receiver(pre_delete, sender=BlogPost)
+def uncount_deleted_post_comments(sender, instance, **kwargs):
+    _deleting_post_ids().add(instance.pk)
+    approved = Comment.objects.filter(post_id=instance.pk, approved=True).count()
+    stats.apply_delta(total_comments=-approved)
+
+
+@receiver(post_delete, sender=BlogPost)
+def forget_deleted_post(sender, instance, **kwargs):
+    _deleting_post_ids().discard(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def invalidate_comment_caches(sender, instance, **kwargs):
+    """Un commentaire ne touche que le détail de son article et les comptages des listes"""
+    if instance.post_id in _deleting_post_ids():
+        # Suppression en cascade : l'invalidation de l'article suffit
+        return
+    bump_version('blog.posts', f'blog.post:{instance.post.slug}')
+
+
+@receiver(post_save, sender=BlogPost)
+def count_published_post(sender, instance, created, **kwargs):
+    was_published = not created and instance.previous_value('status') == 'published'
+    is_published = instance.status == 'published'
+    stats.apply_delta(total_posts=int(is_published) - int(was_published))
+
+
+@receiver(post_delete, sender=BlogPost)
+def uncount_published_post(sender, instance, **kwargs):
+    if instance.previous_value('status') == 'published':
+        stats.apply_delta(total_posts=-1)
+
+
+@receiver(post_save, sender=Comment)
+def count_approved_comment(sender, instance, created, **kwargs):
+    was_approved = not created and bool(instance.previous_value('approved'))
+    delta = int(instance.approved) - int(was_approved)
+    stats.apply_delta(total_comments=delta)
+    denorm.adjust(BlogPost, [instance.post_id], 'comment_count', delta)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_approved_comment(sender, instance, **kwargs):
+    if instance.previous_value('approved') and instance.post_id not in _deleting_post_ids():
+        stats.apply_delta(total_comments=-1)
+        denorm.adjust(BlogPost, [instance.post_id], 'comment_count', -1)
+
+
+@receiver(post_save, sender=BlogCategory)
+@receiver(post_save, sender=Tag)
+def count_taxonomy(sender, instance, created, **kwargs):
+    if created:
+        field = 'total_categories' if sender is BlogCategory else 'total_tags'
+        stats.apply_delta(**{field: 1})
+
+
+@receiver(post_delete, sender=BlogCategory)
+@receiver(post_delete, sender=Tag)
+def uncount_taxonomy(sender, instance, **kwargs):
+    field = 'total_categories' if sender is BlogCategory else 'total_tags'
+    stats.apply_delta(**{field: -1})
+
+
+# Compteurs dénormalisés : articles publiés par catégorie et par tag,
+# commentaires approuvés par article (ces derniers : voir plus haut)
+
+denorm.register(
+    BlogCategory, 'post_count',
+    lambda: denorm.count_of(BlogPost.objects.published(), 'category'),
+    namespaces=('blog.taxonomy', 'blog.posts', 'blog.details'),
+)
+denorm.register(
+    Tag, 'post_count',
+    lambda: denorm.count_of(BlogPost.tags.through.objects.filter(blogpost__status='published'), 'tag'),
+    namespaces=('blog.taxonomy', 'blog.posts', 'blog.details'),
+)
+denorm.register(
+    BlogPost, 'comment_count',
+    lambda: denorm.count_of(Comment.objects.filter(approved=True), 'post'),
+    namespaces=('blog.posts', 'blog.details'),
+)
+
+
+@receiver(post_save, sender=BlogPost)
+def count_post_in_taxonomies(sender, instance, created, **kwargs):
+    was_published = not created and instance.previous_value('status') == 'published'
+    is_published = instance.status == 'published'
+    old_category = None if created else instance.previous_value('category_id')
+    if was_published and is_published and old_category == instance.category_id:
+        return
+    if was_published:
+        denorm.adjust(BlogCategory, [old_category], 'post_count', -1)
+    if is_published:
+        denorm.adjust(BlogCategory, [instance.category_id], 'post_count', 1)
+    if was_published != is_published and not created:
+        tag_ids = BlogPost.tags.through.objects.filter(blogpost_id=instance.pk).values_list('tag_id', flat=True)
+        denorm.adjust(Tag, list(tag_ids), 'post_count', 1 if is_published else -1)
+
+
+@receiver(pre_delete, sender=BlogPost)
+def remember_counted_tags(sender, instance, **kwargs):
+    instance._counted_tag_ids = list(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=BlogPost)
+def uncount_post_in_taxonomies(sender, instance, **kwargs):
+    if instance.previous_value('status') == 'published':
+        denorm.adjust(BlogCategory, [instance.category_id], 'post_count', -1)
+        denorm.adjust(Tag, getattr(instance, '_counted_tag_ids', []), 'post_count', -1)
+
+
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def count_tagged_posts(sender, instance, action, reverse, pk_set, **kwargs):
+    sign = {'post_add': 1, 'post_remove': -1}.get(action)
+    if not reverse:
+        # Côté article : pk_set contient des tags
+        if instance.status != 'published':
+            return
+        if action == 'pre_clear':
+            instance._cleared_tag_ids = list(instance.tags.values_list('pk', flat=True))
+        elif action == 'post_clear':
+            denorm.adjust(Tag, getattr(instance, '_cleared_tag_ids', []), 'post_count', -1)
+        elif sign:
+            denorm.adjust(Tag, pk_set, 'post_count', sign)
+        return
+
+    # Côté Tag : pk_set contient des articles
+    if action == 'pre_clear':
+        instance._cleared_post_count = instance.blogpost_set.published().count()
+    elif action == 'post_clear':
+        denorm.adjust(Tag, [instance.pk], 'post_count', -getattr(instance, '_cleared_post_count', 0))
+    elif sign:
+        published = BlogPost.objects.published().filter(pk__in=pk_set).count()
+        denorm.adjust(Tag, [instance.pk], 'post_count', sign * published)
@@ -0,0 +1,375 @@
+# ========== backend/apps/blog/similarity.py ==========
+"""
+Index des articles similaires.
+
+Score = TAG_WEIGHT * Jaccard(tags) + (1 - TAG_WEIGHT) * cosinus TF-IDF(texte),
+calculé de façon vectorisée avec NumPy sur les articles publiés. Les K
+meilleurs voisins de chaque article sont stockés dans `RelatedPost`, de
+sorte que la page de détail les lit avec une seule requête indexée.
+
+Les fréquences des termes hachés de chaque article sont enregistrées avec
+lui (`similarity_terms`, recalculé au save quand le texte change) : le
+corpus est assemblé depuis ces vecteurs, sans relire ni découper le texte
+des autres articles. Le processus garde ce corpus en mémoire et n'y
+remplace que les lignes des articles modifiés ; il le reconstruit si
+l'index a changé ailleurs (version 'blog.similarity'). Les mises à jour
+sont regroupées et appliquées hors de la requête, RELATED_POSTS_DEBOUNCE
+secondes après la première modification (RELATED_POSTS_MODE : 'thread',
+'inline' ou 'off').
+"""
+import logging
+import re
+import threading
+import zlib
+from collections import Counter, defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from apps.core.cache import bump_version, get_version
+
+from .models import BlogPost, RelatedPost
+from .search import strip_html
+
+logger = logging.getLogger(__name__)
+
+TAG_WEIGHT = 0.4
+HASH_DIMENSIONS = 2 ** 12
+MIN_SCORE = 1e-6
+
+WORD_RE = re.compile(r'[^\W\d_]{3,}', re.UNICODE)
+STOP_WORDS = frozenset(
+    'les des une un du de la le et en est pour dans par sur avec sont pas plus '
+    'qui que quoi ces ses nous vous ils elles leur leurs mais ou donc car aux '
+    'cette cet ce être avoir fait comme tout tous très bien aussi peut'.split()
+)
+
+
+def _setting(name, default):
+    return getattr(settings, f'RELATED_POSTS_{name}', default)
+
+
+def top_k():
+    return _setting('TOP_K', 10)
+
+
+def tokenize(text):
+    return [w for w in WORD_RE.findall(strip_html(text).lower()) if w not in STOP_WORDS]
+
+
+def term_counts(title, excerpt, content):
+    """Fréquences des termes hachés d'un article : [[colonne, occurrences], ...]"""
+    # Le titre compte double
+    words = tokenize(title) * 2 + tokenize(excerpt) + tokenize(content)
+    counts = Counter(zlib.crc32(w.encode()) % HASH_DIMENSIONS for w in words)
+    return sorted([bucket, count] for bucket, count in counts.items())
+
+
+def _fill_missing_terms(rows, batch_size=500):
+    """Articles enregistrés avant `similarity_terms` : termes calculés une fois et enregistrés"""
+    missing = [pk for pk, terms in rows if not terms]
+    filled = {}
+    for start in range(0, len(missing), batch_size):
+        posts = list(
+            BlogPost.objects.filter(pk__in=missing[start:start + batch_size]).only('pk', 'title', 'excerpt', 'content')
+        )
+        for post in posts:
+            post.similarity_terms = term_counts(post.title, post.excerpt, post.content)
+            filled[post.pk] = post.similarity_terms
+        BlogPost.objects.bulk_update(posts, ['similarity_terms'])
+    return [(pk, terms or filled.get(pk, [])) for pk, terms in rows]
+
+
+def _tag_pairs(posts):
+    return BlogPost.tags.through.objects.filter(blogpost__in=posts).values_list('blogpost_id', 'tag_id')
+
+
+class Corpus:
+    """
+    Matrices des termes (log TF, hachage) et des tags des articles publiés.
+
+    Les lignes sont tenues à jour une à une (refresh) ; l'IDF est dérivé des
+    fréquences de documents, maintenues avec les lignes, au moment du calcul
+    des scores. Les tableaux ont une capacité de réserve : ajouter un
+    article ne recopie pas la matrice.
+    """
+
+    def __init__(self):
+        rows = _fill_missing_terms(list(
+            BlogPost.objects.published().order_by('pk').values_list('pk', 'similarity_terms')
+        ))
+        tags = defaultdict(list)
+        for post_id, tag_id in _tag_pairs(BlogPost.objects.published()):
+            tags[post_id].append(tag_id)
+
+        capacity = max(len(rows), 16)
+        self.size = 0
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.position = {}
+        self.counts = np.zeros((capacity, HASH_DIMENSIONS), dtype=np.float32)
+        self.document_frequency = np.zeros(HASH_DIMENSIONS, dtype=np.int64)
+        self.tag_columns = {}
+        self.tags = np.zeros((capacity, max(len({t for ids in tags.values() for t in ids}), 1)), dtype=np.float32)
+        for pk, terms in rows:
+            self._set(pk, terms, tags.get(pk, ()))
+
+    def __len__(self):
+        return self.size
+
+    def refresh(self, post_ids):
+        """Relit termes et tags de ces articles seulement ; retire ceux qui ne sont plus publiés"""
+        post_ids = set(post_ids)
+        published = BlogPost.objects.published().filter(pk__in=post_ids)
+        rows = dict(_fill_missing_terms(list(published.values_list('pk', 'similarity_terms'))))
+        tags = defaultdict(list)
+        for post_id, tag_id in _tag_pairs(published):
+            tags[post_id].append(tag_id)
+        for pk in post_ids:
+            if pk in rows:
+                self._set(pk, rows[pk], tags.get(pk, ()))
+            else:
+                self._remove(pk)
+
+    def _grow(self, rows=0, columns=0):
+        if rows:
+            self.ids = np.concatenate([self.ids, np.zeros(rows, dtype=np.int64)])
+            self.counts = np.vstack([self.counts, np.zeros((rows, HASH_DIMENSIONS), dtype=np.float32)])
+        self.tags = np.pad(self.tags, ((0, rows), (0, columns)))
+
+    def _set(self, pk, terms, tag_ids):
+        row = self.position.get(pk)
+        if row is None:
+            if self.size == len(self.ids):
+                self._grow(rows=len(self.ids))
+            row = self.position[pk] = self.size
+            self.ids[row] = pk
+            self.size += 1
+        else:
+            self.document_frequency -= self.counts[row] > 0
+        self.counts[row] = 0
+        if terms:
+            buckets, occurrences = zip(*terms)
+            self.counts[row, list(buckets)] = np.log1p(occurrences)
+        self.document_frequency += self.counts[row] > 0
+
+        new_tags = [tag_id for tag_id in tag_ids if tag_id not in self.tag_columns]
+        spare = self.tags.shape[1] - len(self.tag_columns)
+        if len(new_tags) > spare:
+            self._grow(columns=max(len(new_tags) - spare, self.tags.shape[1]))
+        for tag_id in new_tags:
+            self.tag_columns[tag_id] = len(self.tag_columns)
+        self.tags[row] = 0
+        self.tags[row, [self.tag_columns[tag_id] for tag_id in tag_ids]] = 1
+
+    def _remove(self, pk):
+        """Retire une ligne en y déplaçant la dernière"""
+        row = self.position.pop(pk, None)
+        if row is None:
+            return
+        self.document_frequency -= self.counts[row] > 0
+        last = self.size - 1
+        if row != last:
+            self.ids[row] = self.ids[last]
+            self.counts[row] = self.counts[last]
+            self.tags[row] = self.tags[last]
+            self.position[int(self.ids[row])] = row
+        self.counts[last] = 0
+        self.tags[last] = 0
+        self.size = last
+
+    def scores(self, rows):
+        """Scores (len(rows) x N) des articles aux positions `rows` contre tout le corpus"""
+        n = self.size
+        counts, tags = self.counts[:n], self.tags[:n]
+        idf = (np.log((1 + n) / (1 + self.document_frequency)) + 1).astype(np.float32)
+        weights = idf * idf
+        norms = np.sqrt(np.einsum('ij,ij,j->i', counts, counts, weights))
+        norms[norms == 0] = 1
+        cosine = (counts[rows] * weights) @ counts.T / (norms[rows][:, None] * norms[None, :])
+        intersection = tags[rows] @ tags.T
+        sizes = tags.sum(axis=1)
+        union = sizes[rows][:, None] + sizes[None, :] - intersection
+        jaccard = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+        scores = TAG_WEIGHT * jaccard + (1 - TAG_WEIGHT) * cosine
+        scores[np.arange(len(rows)), rows] = -1  # pas de l'article lui-même
+        return scores
+
+    def neighbours(self, rows, k):
+        """Liste (post_id, [(related_id, score), ...]) triée par score décroissant"""
+        result = []
+        if not len(self) or not len(rows):
+            return result
+        scores = self.scores(np.asarray(rows))
+        k = min(k, len(self) - 1)
+        for i, row in enumerate(rows):
+            if k <= 0:
+                result.append((int(self.ids[row]), []))
+                continue
+            candidates = np.argpartition(-scores[i], k - 1)[:k]
+            candidates = candidates[np.argsort(-scores[i][candidates], kind='stable')]
+            result.append((int(self.ids[row]), [
+                (int(self.ids[j]), float(scores[i][j]))
+                for j in candidates if scores[i][j] > MIN_SCORE
+            ]))
+        return result
+
+
+def _write(neighbours):
+    post_ids = [post_id for post_id, _ in neighbours]
+    RelatedPost.objects.filter(post_id__in=post_ids).delete()
+    RelatedPost.objects.bulk_create([
+        RelatedPost(post_id=post_id, related_id=related_id, score=score, rank=rank)
+        for post_id, related in neighbours
+        for rank, (related_id, score) in enumerate(related)
+    ])
+    # Les articles similaires sont imbriqués dans les réponses de détail
+    bump_version('blog.details')
+
+
+def update_related_posts(post_id, corpus=None):
+    """
+    Mise à jour après modification de l'article `post_id` : seules ses
+    lignes et celles des articles dont le top-K peut changer (ceux qui le
+    référencent, ou pour qui il devient assez proche) sont recalculées.
+    Sans `corpus` fourni, il est assemblé depuis les vecteurs enregistrés
+    (voir apply pour le corpus tenu à jour par le processus).
+    """
+    corpus = corpus or Corpus()
+    k = top_k()
+    referencing = set(RelatedPost.objects.filter(related_id=post_id).values_list('post_id', flat=True))
+
+    with transaction.atomic():
+        if post_id not in corpus.position:
+            # Article dépublié ou supprimé : il sort de l'index
+            RelatedPost.objects.filter(post_id=post_id).delete()
+            affected = [corpus.position[pk] for pk in referencing if pk in corpus.position]
+            _write(corpus.neighbours(affected, k))
+            return
+
+        row = corpus.position[post_id]
+        own = corpus.neighbours([row], k)
+        scores = corpus.scores(np.array([row]))[0]
+
+        # Seuil d'entrée dans le top-K actuel de chaque article (-1 si incomplet)
+        thresholds = np.full(len(corpus), -1.0, dtype=np.float32)
+        for pk, score in RelatedPost.objects.filter(rank=k - 1).values_list('post_id', 'score'):
+            if pk in corpus.position:
+                thresholds[corpus.position[pk]] = score
+        closer = np.flatnonzero((scores > MIN_SCORE) & (scores > thresholds))
+        affected = {corpus.position[pk] for pk in referencing if pk in corpus.position}
+        affected.update(closer.tolist())
+        affected.discard(row)
+        _write(own + corpus.neighbours(sorted(affected), k))
+
+
+def recompute_related_posts(post_ids, corpus=None):
+    """Recalcule les voisins d'articles donnés (ex. après une suppression)"""
+    corpus = corpus or Corpus()
+    rows = [corpus.position[pk] for pk in post_ids if pk in corpus.position]
+    with transaction.atomic():
+        _write(corpus.neighbours(rows, top_k()))
+
+
+# Corpus gardé par le processus entre deux mises à jour, resynchronisé sur
+# la version partagée de l'index (apps.core.cache)
+VERSION_NAMESPACE = 'blog.similarity'
+_corpus = None
+_corpus_lock = threading.Lock()
+
+
+def _current_corpus(changed):
+    """
+    Corpus du processus, mis à jour pour les seuls articles `changed` ; il
+    est reconstruit si l'index a été modifié ailleurs (autre processus,
+    commandes) depuis sa dernière mise à jour
+    """
+    global _corpus
+    version = get_version(VERSION_NAMESPACE)
+    if _corpus is None or _corpus.version != version:
+        _corpus = Corpus()
+    else:
+        _corpus.refresh(changed)
+    # Invalide jusqu'à la fin de la mise à jour (un échec force la reconstruction)
+    _corpus.version = None
+    return _corpus, version
+
+
+def apply(update=(), recompute=()):
+    """Applique des mises à jour regroupées avec le corpus du processus"""
+    update, recompute = set(update), set(recompute) - set(update)
+    if not update and not recompute:
+        return
+    with _corpus_lock:
+        corpus, version = _current_corpus(update)
+        with transaction.atomic():
+            for post_id in sorted(update):
+                update_related_posts(post_id, corpus)
+            if recompute:
+                recompute_related_posts(sorted(recompute), corpus)
+        bump_version(VERSION_NAMESPACE)
+        # Aucune autre modification entre-temps : le corpus reste à jour
+        if get_version(VERSION_NAMESPACE) == version + 1:
+            corpus.version = version + 1
+
+
+# Mises à jour en attente dans ce processus, appliquées par la minuterie
+_pending = {'update': set(), 'recompute': set()}
+_lock = threading.Lock()
+_timer = None
+
+
+def schedule(update=(), recompute=()):
+    """
+    Planifie, après validation de la transaction, la mise à jour des
+    articles modifiés (`update`) et le recalcul des articles qui
+    référençaient un article supprimé (`recompute`)
+    """
+    mode = _setting('MODE', 'thread')
+    update, recompute = list(update), list(recompute)
+    if mode == 'off' or not (update or recompute):
+        return
+    if mode == 'inline':
+        transaction.on_commit(lambda: apply(update, recompute))
+    else:
+        transaction.on_commit(lambda: _enqueue(update, recompute))
+
+
+def _enqueue(update, recompute):
+    global _timer
+    with _lock:
+        _pending['update'].update(update)
+        _pending['recompute'].update(recompute)
+        if _timer is None:
+            _timer = threading.Timer(_setting('DEBOUNCE', 2), _apply_from_timer)
+            _timer.daemon = True
+            _timer.start()
+
+
+def _apply_from_timer():
+    global _timer
+    with _lock:
+        _timer = None
+        update, recompute = set(_pending['update']), set(_pending['recompute'])
+        _pending['update'].clear()
+        _pending['recompute'].clear()
+    try:
+        apply(update, recompute)
+    except Exception:
+        # rebuild_related_posts reconstruit l'index au besoin
+        logger.exception("Échec de la mise à jour des articles similaires")
+    finally:
+        close_old_connections()
+
+
+def rebuild_related_posts(batch_size=500):
+    """Recalcule tout l'index ; retourne le nombre d'articles traités"""
+    corpus = Corpus()
+    k = top_k()
+    with transaction.atomic():
+        RelatedPost.objects.all().delete()
+        for start in range(0, len(corpus), batch_size):
+            rows = list(range(start, min(start + batch_size, len(corpus))))
+            _write(corpus.neighbours(rows, k))
+    bump_version(VERSION_NAMESPACE)
+    return len(corpus)
@@ -0,0 +1,60 @@
+# ========== backend/apps/blog/stats.py ==========
+"""
+Instantané des statistiques du blog (modèle BlogStats, ligne unique).
+
+Les signaux appliquent des deltas atomiques (F()) à chaque publication,
+approbation, création ou suppression ; `rebuild()` recalcule tout depuis
+les tables et `check()` compare l'instantané aux comptages réels.
+"""
+from django.db.models import F
+from django.utils import timezone
+
+from .models import BlogCategory, BlogPost, BlogStats, Comment, Tag
+
+SNAPSHOT_PK = 1
+COUNTERS = ('total_posts', 'total_categories', 'total_tags', 'total_comments')
+
+
+def live_counts():
+    """Comptages calculés depuis les tables (coûteux : réservé au rebuild/check)"""
+    return {
+        'total_posts': BlogPost.objects.published().count(),
+        'total_categories': BlogCategory.objects.count(),
+        'total_tags': Tag.objects.count(),
+        'total_comments': Comment.objects.filter(approved=True).count(),
+    }
+
+
+def rebuild():
+    stats, _ = BlogStats.objects.update_or_create(pk=SNAPSHOT_PK, defaults=live_counts())
+    return stats
+
+
+def get_snapshot():
+    """Instantané courant, reconstruit s'il n'existe pas encore"""
+    stats = BlogStats.objects.filter(pk=SNAPSHOT_PK).first()
+    return stats or rebuild()
+
+
+def apply_delta(**deltas):
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    updated = BlogStats.objects.filter(pk=SNAPSHOT_PK).update(
+        updated_at=timezone.now(),
+        **{name: F(name) + delta for name, delta in deltas.items()}
+    )
+    if not updated:
+        # Pas encore d'instantané : le rebuild inclut déjà ce changement
+        rebuild()
+
+
+def check():
+    """Écarts {compteur: (instantané, réel)} ; vide si l'instantané est cohérent"""
+    stats = get_snapshot()
+    live = live_counts()
+    return {
+        name: (getattr(stats, name), live[name])
+        for name in COUNTERS
+        if getattr(stats, name) != live[name]
+    }
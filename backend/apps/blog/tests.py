@@ -0,0 +1,788 @@
+import gzip
+import json
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.core import publishing, response_cache
+from apps.core.counters import view_counter
+
+from . import ingestion, similarity, stats
+from .models import BlogPost, BlogCategory, Tag, Comment, RelatedPost
+
+User = get_user_model()
+
+
+def create_posts(author, count, category=None, tags=(), comments=0, **extra):
+    """Crée `count` articles publiés avec tags et commentaires approuvés"""
+    posts = []
+    for i in range(count):
+        post = BlogPost.objects.create(
+            title=f'Article de test numéro {i}',
+            excerpt='Un extrait suffisamment long pour le test.',
+            content='Du contenu de test. ' * 50,
+            author=author,
+            category=category,
+            status='published',
+            **extra
+        )
+        post.tags.set(tags)
+        for j in range(comments):
+            Comment.objects.create(
+                post=post, name='Lecteur', email='lecteur@example.com',
+                content='Un commentaire de test approuvé.', approved=True
+            )
+        Comment.objects.create(
+            post=post, name='Spam', email='spam@example.com',
+            content='Un commentaire en attente de modération.'
+        )
+        posts.append(post)
+    return posts
+
+
+class BlogTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Échéance des publications programmées mémorisée hors des budgets de requêtes
+        publishing.next_due()
+        view_counter.flush()
+        self.addCleanup(view_counter.flush)
+        self.client = Client()
+        self.author = User.objects.create_user(
+            username='auteur', email='auteur@example.com', password='secret-pass'
+        )
+        self.category = BlogCategory.objects.create(name='Django')
+        self.tags = [Tag.objects.create(name='python'), Tag.objects.create(name='web')]
+
+
+class BlogPostListQueryBudgetTests(BlogTestCase):
+    def assertConstantQueries(self, url, num, small=2, large=30, **extra):
+        create_posts(self.author, small, self.category, self.tags, comments=2, **extra)
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        create_posts(self.author, large - small, self.category, self.tags, comments=2, **extra)
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_post_list_query_count_is_constant(self):
+        """count + articles annotés + tags préchargés"""
+        response = self.assertConstantQueries(
+            reverse('blog:post-list') + '?page_size=100', 3
+        )
+        first = response.json()['results'][0]
+        self.assertEqual(first['comments_count'], 2)
+        self.assertEqual(first['author'], 'auteur@example.com')
+        self.assertEqual(first['category']['slug'], 'django')
+        self.assertEqual(len(first['tags']), 2)
+
+    def test_featured_posts_query_count_is_constant(self):
+        """articles annotés + tags préchargés"""
+        self.assertConstantQueries(reverse('blog:featured-posts'), 2, large=6, featured=True)
+
+    def test_blog_stats_query_count_is_constant(self):
+        """instantané des stats + articles récents annotés + tags préchargés"""
+        self.assertConstantQueries(reverse('blog:blog-stats'), 3)
+
+
+@override_settings(VIEW_COUNTER_FLUSH_THRESHOLD=1000, VIEW_COUNTER_FLUSH_INTERVAL=3600)
+class BufferedViewCounterTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = create_posts(self.author, 1)[0]
+        self.url = reverse('blog:post-detail', kwargs={'slug': self.post.slug})
+
+    def test_views_are_buffered_then_flushed_in_batch(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()['view_count'], 1)
+        # Les vues servies depuis le cache de réponses comptent aussi
+        for _ in range(2):
+            self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 0)
+        self.assertEqual(view_counter.pending_count(), 3)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(view_counter.flush(), 3)
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        # Un UPDATE pour les compteurs, un pour la tranche horaire du classement tendance
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(sum('"blog_blogpost"' in sql for sql in updates), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 3)
+        self.assertEqual(view_counter.pending_count(), 0)
+
+    def test_idle_timer_flushes_pending_views(self):
+        with mock.patch('apps.core.counters.threading.Timer') as timer:
+            self.client.get(self.url)
+            self.client.get(self.url)
+        # Une seule minuterie armée par le premier incrément en attente
+        timer.assert_called_once_with(3600, view_counter._flush_from_timer)
+        with mock.patch('apps.core.counters.close_old_connections'):
+            timer.call_args[0][1]()
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.view_count, view_counter.pending_count()), (2, 0))
+
+    @override_settings(VIEW_COUNTER_FLUSH_THRESHOLD=2)
+    def test_threshold_triggers_flush(self):
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 2)
+        self.assertEqual(view_counter.pending_count(), 0)
+
+
+class BlogSearchTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.django_post = BlogPost.objects.create(
+            title='Déployer une application Django',
+            excerpt='Un guide pratique pour la mise en production.',
+            content='<p>Les développements récents simplifient le déploiement.</p>' * 5,
+            author=self.author, status='published'
+        )
+        self.other_post = BlogPost.objects.create(
+            title='Introduction à React',
+            excerpt='Les composants et le state expliqués simplement.',
+            content='<p>Un article qui mentionne Django une seule fois.</p>',
+            author=self.author, status='published'
+        )
+        self.url = reverse('blog:post-list')
+
+    def search(self, query):
+        response = self.client.get(self.url, {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_results_are_ranked_and_highlighted(self):
+        results = self.search('django')
+        self.assertEqual([r['id'] for r in results], [self.django_post.pk, self.other_post.pk])
+        self.assertIn('<mark>', results[0]['search_snippet'])
+
+    def test_content_is_searched_with_french_stemming(self):
+        results = self.search('développement')
+        self.assertEqual([r['id'] for r in results], [self.django_post.pk])
+
+    def test_index_follows_tags_and_deletion(self):
+        self.other_post.tags.add(self.tags[0])
+        self.assertEqual([r['id'] for r in self.search('python')], [self.other_post.pk])
+
+        self.tags[0].name = 'typescript'
+        self.tags[0].save()
+        self.assertEqual(self.search('python'), [])
+        self.assertEqual([r['id'] for r in self.search('typescript')], [self.other_post.pk])
+
+        self.other_post.delete()
+        self.assertEqual([r['id'] for r in self.search('django')], [self.django_post.pk])
+
+    @override_settings(BLOG_SEARCH_MAX_RESULTS=1)
+    def test_filters_apply_before_the_result_limit(self):
+        # Brouillon mieux classé que l'article publié : il ne doit pas occuper la limite
+        BlogPost.objects.create(
+            title='Django Django Django', excerpt='Brouillon sur Django.',
+            content='<p>Django.</p>', author=self.author, status='draft'
+        )
+        self.other_post.tags.add(self.tags[0])
+        self.assertEqual([r['id'] for r in self.search('django')], [self.django_post.pk])
+        response = self.client.get(self.url, {'search': 'django', 'tag': self.tags[0].slug})
+        self.assertEqual([r['id'] for r in response.json()['results']], [self.other_post.pk])
+
+
+@override_settings(RELATED_POSTS_MODE='inline')
+class RelatedPostsIndexTests(BlogTestCase):
+    def create_post(self, title, content, tags=()):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = BlogPost.objects.create(
+                title=title, excerpt=title, content=content, author=self.author, status='published'
+            )
+            post.tags.set(tags)
+        return post
+
+    def test_neighbours_follow_tags_and_text(self):
+        python_tag, web_tag = self.tags
+        orm = self.create_post('Optimiser les requêtes ORM', 'django queryset index jointure ' * 20, [python_tag])
+        cache_post = self.create_post('Le cache Django', 'django cache invalidation queryset ' * 20, [python_tag])
+        unique = self.create_post('Animer une interface', 'animation css transition ' * 20, [web_tag])
+
+        self.assertEqual(list(orm.get_related_posts()), [cache_post])
+        self.assertEqual(list(cache_post.get_related_posts()), [orm])
+        self.assertEqual(list(unique.get_related_posts()), [])
+
+        # Un nouvel article ne recalcule que les voisins concernés
+        css_post = self.create_post('Transitions CSS', 'animation css keyframes ' * 20, [web_tag])
+        self.assertEqual(list(unique.get_related_posts()), [css_post])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            css_post.delete()
+        self.assertEqual(list(unique.get_related_posts()), [])
+
+    def test_only_text_tag_or_publication_changes_update_the_index(self):
+        post = self.create_post('Optimiser les requêtes ORM', 'django queryset index ' * 20, [self.tags[0]])
+        with mock.patch('apps.blog.similarity.apply') as apply, self.captureOnCommitCallbacks(execute=True):
+            post.meta_title = 'Autre titre SEO'
+            post.save()
+            post.tags.add(self.tags[0])  # déjà présent
+            draft = BlogPost.objects.create(
+                title='Brouillon', excerpt='Brouillon', content='brouillon ' * 20, author=self.author
+            )
+            draft.tags.add(self.tags[1])
+        apply.assert_not_called()
+
+        with mock.patch('apps.blog.similarity.apply') as apply, self.captureOnCommitCallbacks(execute=True):
+            post.content = 'django cache invalidation ' * 20
+            post.save()
+        apply.assert_called_once_with([post.pk], [])
+
+    def test_corpus_reads_stored_terms_not_text(self):
+        post = self.create_post('Optimiser les requêtes ORM', 'django queryset index ' * 20, [self.tags[0]])
+        self.assertTrue(post.similarity_terms)
+        with CaptureQueriesContext(connection) as queries:
+            corpus = similarity.Corpus()
+        self.assertEqual(len(corpus), 1)
+        self.assertFalse(any('"content"' in query['sql'] for query in queries))
+
+    def test_update_refreshes_only_the_changed_row(self):
+        python_tag, web_tag = self.tags
+        orm = self.create_post('Optimiser les requêtes ORM', 'django queryset index jointure ' * 20, [python_tag])
+        self.create_post('Le cache Django', 'django cache invalidation queryset ' * 20, [python_tag])
+        css = self.create_post('Animer une interface', 'animation css transition ' * 20, [web_tag])
+
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            css.content = 'django queryset index jointure ' * 20
+            css.save()
+        # Seuls les termes et tags de l'article modifié sont relus
+        term_reads = [q['sql'] for q in queries if q['sql'].startswith('SELECT') and 'similarity_terms' in q['sql']]
+        self.assertEqual(len(term_reads), 1)
+        self.assertIn(f'IN ({css.pk})', term_reads[0])
+        self.assertIn(css, orm.get_related_posts())
+
+        # Même index qu'une reconstruction complète, qui force ensuite la
+        # relecture du corpus du processus
+        incremental = sorted(RelatedPost.objects.values_list('post_id', 'related_id', 'rank'))
+        with mock.patch('apps.blog.similarity.Corpus', wraps=similarity.Corpus) as corpus:
+            similarity.rebuild_related_posts()
+            self.assertEqual(sorted(RelatedPost.objects.values_list('post_id', 'related_id', 'rank')), incremental)
+            with self.captureOnCommitCallbacks(execute=True):
+                css.title = 'Animer une interface Django'
+                css.save()
+        self.assertEqual(corpus.call_count, 2)
+
+    @override_settings(RELATED_POSTS_MODE='thread', RELATED_POSTS_DEBOUNCE=2)
+    def test_updates_are_grouped_off_the_request(self):
+        with mock.patch('apps.blog.similarity.threading.Timer') as timer:
+            first = self.create_post('Le cache Django', 'django cache queryset ' * 20, self.tags)
+            second = self.create_post('Le cache Django, suite', 'django cache queryset ' * 20, self.tags)
+        # Une seule minuterie pour les deux articles, rien d'écrit pendant la requête
+        timer.assert_called_once_with(2, similarity._apply_from_timer)
+        self.assertEqual(list(first.get_related_posts()), [])
+        with mock.patch('apps.blog.similarity.close_old_connections'):
+            timer.call_args[0][1]()
+        self.assertEqual(list(first.get_related_posts()), [second])
+
+    def test_detail_reads_related_posts_from_index(self):
+        first = self.create_post('Premier article', 'django queryset ' * 20, self.tags)
+        second = self.create_post('Second article', 'django queryset ' * 20, self.tags)
+        response = self.client.get(reverse('blog:post-detail', kwargs={'slug': first.slug}))
+        self.assertEqual([p['slug'] for p in response.json()['related_posts']], [second.slug])
+
+
+class TaxonomyEndpointTests(BlogTestCase):
+    def test_categories_and_tags_cost_one_query_then_hit_cache(self):
+        create_posts(self.author, 3, self.category, self.tags)
+        draft = BlogPost.objects.first()
+        draft.status = 'draft'
+        draft.save()
+
+        for name, expected in (('blog:categories', 2), ('blog:tags', 2)):
+            with self.assertNumQueries(1):
+                data = self.client.get(reverse(name)).json()
+            self.assertEqual(data[0]['post_count'], expected)
+            with self.assertNumQueries(0):
+                self.client.get(reverse(name))
+
+    def test_cache_is_invalidated_by_content_changes(self):
+        self.assertEqual(self.client.get(reverse('blog:tags')).json()[0]['post_count'], 0)
+        create_posts(self.author, 1, tags=self.tags)
+        self.assertEqual(self.client.get(reverse('blog:tags')).json()[0]['post_count'], 1)
+
+        BlogCategory.objects.create(name='Nouvelle')
+        self.assertEqual(len(self.client.get(reverse('blog:categories')).json()), 2)
+
+
+class BlogStatsSnapshotTests(BlogTestCase):
+    def test_snapshot_follows_publication_moderation_and_deletion(self):
+        post = create_posts(self.author, 2, self.category, self.tags, comments=1)[0]
+        comment = Comment.objects.filter(approved=False).first()
+        comment.approved = True
+        comment.save()
+
+        post.status = 'draft'
+        post.save()
+        Tag.objects.create(name='nouveau')
+        self.category.delete()
+
+        self.assertEqual(stats.check(), {})
+        data = self.client.get(reverse('blog:blog-stats')).json()
+        self.assertEqual(
+            (data['total_posts'], data['total_categories'], data['total_tags'], data['total_comments']),
+            (1, 0, 3, 3)
+        )
+
+        BlogPost.objects.filter(status='published').delete()
+        self.assertEqual(stats.check(), {})
+
+    def test_post_deletion_cost_does_not_grow_with_its_comments(self):
+        def deletion_queries(comments):
+            post = create_posts(self.author, 1, comments=comments)[0]
+            with CaptureQueriesContext(connection) as queries:
+                post.delete()
+            return len(queries)
+
+        self.assertEqual(deletion_queries(1), deletion_queries(6))
+        self.assertEqual(stats.check(), {})
+
+    def test_check_detects_and_rebuild_repairs_drift(self):
+        create_posts(self.author, 1)
+        Comment.objects.update(approved=True)  # contourne les signaux
+        self.assertEqual(stats.check(), {'total_comments': (0, 1)})
+        stats.rebuild()
+        self.assertEqual(stats.check(), {})
+
+
+class ResponseCacheTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = create_posts(self.author, 1, self.category, self.tags)[0]
+        self.list_url = reverse('blog:post-list')
+        self.detail_url = reverse('blog:post-detail', kwargs={'slug': self.post.slug})
+
+    def test_hit_after_miss_with_normalized_query_string(self):
+        self.assertEqual(self.client.get(self.list_url + '?page=1&page_size=5')['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url + '?page_size=5&page=1')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.json()['results'][0]['slug'], self.post.slug)
+
+    def test_precompressed_body_is_served_to_gzip_clients(self):
+        self.client.get(self.detail_url)
+        response = self.client.get(self.detail_url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(response.content))['slug'], self.post.slug)
+
+    def test_signals_invalidate_only_affected_responses(self):
+        other = create_posts(self.author, 1)[0]
+        other_url = reverse('blog:post-detail', kwargs={'slug': other.slug})
+        for url in (self.list_url, self.detail_url, other_url):
+            self.client.get(url)
+
+        Comment.objects.create(
+            post=self.post, name='Lecteur', email='lecteur@example.com',
+            content='Un nouveau commentaire approuvé.', approved=True
+        )
+        self.assertEqual(self.client.get(self.detail_url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(other_url)['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get(self.list_url)['X-Cache'], 'MISS')
+
+        self.post.title = 'Titre modifié pour le test'
+        self.post.save()
+        response = self.client.get(self.list_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        titles = {r['id']: r['title'] for r in response.json()['results']}
+        self.assertEqual(titles[self.post.pk], 'Titre modifié pour le test')
+
+    def test_stats_report_the_volume_under_the_current_version(self):
+        body = self.client.get(self.list_url).content
+        size = response_cache.stats()['size']['blog.posts']
+        self.assertEqual(size['entries'], 1)
+        self.assertGreaterEqual(size['bytes'], len(body))
+
+        self.post.title = 'Titre modifié pour le volume'
+        self.post.save()
+        self.assertEqual(response_cache.stats()['size']['blog.posts'], {'entries': 0, 'bytes': 0})
+
+    def test_authenticated_editors_bypass_cache(self):
+        self.client.get(self.list_url)
+        self.client.force_login(self.author)
+        self.assertEqual(self.client.get(self.list_url)['X-Cache'], 'BYPASS')
+        self.assertEqual(response_cache.stats()['hits'], 0)
+
+
+class ConditionalGetTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = create_posts(self.author, 1, self.category, self.tags)[0]
+        self.detail_url = reverse('blog:post-detail', kwargs={'slug': self.post.slug})
+
+    def test_list_revalidation_costs_no_query(self):
+        url = reverse('blog:post-list')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        create_posts(self.author, 1)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail_emits_validators_and_answers_304(self):
+        response = self.client.get(self.detail_url)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(
+            self.detail_url, HTTP_IF_MODIFIED_SINCE=self.client.get(self.detail_url)['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_detail_revalidations_count_as_views(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        self.client.get(self.detail_url)
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        view_counter.flush()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 3)
+
+    def test_detail_etag_changes_with_comments(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        Comment.objects.create(
+            post=self.post, name='Lecteur', email='lecteur@example.com',
+            content='Un nouveau commentaire approuvé.', approved=True
+        )
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class KeysetPaginationTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        create_posts(self.author, 4, self.category, self.tags)
+        create_posts(self.author, 3, self.category, self.tags, featured=True)
+        self.url = reverse('blog:post-list')
+        self.expected = [post['id'] for post in self.client.get(self.url, {'page_size': 100}).data['results']]
+
+    def walk(self, url, direction):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.append([post['id'] for post in response.data['results']])
+            url = response.data[direction]
+            pages += 1
+        return ids, pages, response
+
+    def test_forward_and_backward_walks_match_page_number_order(self):
+        forward, pages, last = self.walk(f'{self.url}?pagination=cursor&page_size=3', 'next')
+        self.assertEqual(pages, 3)
+        self.assertEqual(sum(forward, []), self.expected)
+        self.assertIsNone(last.data['count'])
+
+        backward, _, first = self.walk(last.data['previous'], 'previous')
+        self.assertEqual(sum(reversed(backward), []) + forward[-1], self.expected)
+        self.assertIsNone(first.data['previous'])
+
+    def test_pages_use_neither_offset_nor_count(self):
+        first = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 3})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first.data['next'])
+        sql = ' '.join(query['sql'].upper() for query in queries)
+        self.assertNotIn('OFFSET', sql)
+        self.assertNotIn('COUNT(*)', sql)
+
+    def test_optional_count_and_invalid_cursor(self):
+        response = self.client.get(self.url, {'pagination': 'cursor', 'with_count': '1'})
+        self.assertEqual(response.data['count'], len(self.expected))
+        response = self.client.get(self.url, {'cursor': 'falsifie'})
+        self.assertEqual(response.status_code, 404)
+
+
+class SparseFieldsetTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = create_posts(self.author, 3, self.category, self.tags, comments=1)[0]
+        self.url = reverse('blog:post-list')
+
+    def test_fields_prune_payload_and_queries(self):
+        # Ni jointure, ni prefetch des tags, ni sous-requête de commentaires
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'fields': 'id,title,slug,featured_image'})
+        self.assertEqual(len(queries), 2)  # COUNT de pagination + page
+        self.assertNotIn('JOIN', queries[1]['sql'].upper())
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title', 'slug', 'featured_image'})
+
+    def test_expand_selects_relations(self):
+        result = self.client.get(self.url, {'expand': 'category'}).data['results'][0]
+        self.assertIn('category', result)
+        self.assertIn('comments_count', result)
+        self.assertNotIn('tags', result)
+        self.assertNotIn('author', result)
+
+        result = self.client.get(self.url, {'fields': 'id,tags'}).data['results'][0]
+        self.assertEqual(set(result), {'id', 'tags'})
+        self.assertEqual({tag['name'] for tag in result['tags']}, {'python', 'web'})
+
+    def test_detail_skips_unrequested_relations(self):
+        url = reverse('blog:post-detail', kwargs={'slug': self.post.slug})
+        with self.assertNumQueries(2):  # Last-Modified + article
+            data = self.client.get(url, {'fields': 'title,content'}).data
+        self.assertEqual(set(data), {'title', 'content'})
+        self.assertEqual(self.client.get(url).data['comments']['count'], 1)
+
+
+class DerivedFieldsTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = create_posts(self.author, 1, self.category, self.tags)[0]
+        self.post = BlogPost.objects.get(pk=self.post.pk)
+
+    def test_unrelated_update_skips_derived_fields_and_reindex(self):
+        self.post.featured = True
+        with CaptureQueriesContext(connection) as queries:
+            self.post.save(update_fields=['featured'])
+        writes = [query['sql'] for query in queries if query['sql'].startswith(('UPDATE', 'INSERT', 'DELETE'))]
+        self.assertEqual(len(writes), 1)
+        self.assertIn('"featured"', writes[0])
+        self.assertNotIn('"reading_time"', writes[0])
+
+    def test_content_change_recomputes_reading_time_within_update_fields(self):
+        self.post.content = '<p>mot</p> ' * 1000
+        self.post.save(update_fields=['content'])
+        self.assertEqual(BlogPost.objects.get(pk=self.post.pk).reading_time, 5)
+
+    def test_recompute_command_fixes_stale_rows_in_bulk(self):
+        BlogPost.objects.filter(pk=self.post.pk).update(reading_time=42, meta_title='')
+        out = StringIO()
+        call_command('recompute_derived_fields', stdout=out)
+        post = BlogPost.objects.get(pk=self.post.pk)
+        self.assertEqual(post.reading_time, 1)
+        self.assertEqual(post.meta_title, post.title[:60])
+        self.assertIn('1 mis à jour', out.getvalue())
+
+
+class RenderedContentTests(BlogTestCase):
+    CONTENT = (
+        '<h1>Introduction</h1><p onclick="x()">Du <b>texte</b> et un '
+        '<a href="javascript:alert(1)">lien</a>.</p><script>alert(1)</script>'
+        '<h2>Suite</h2><h3>Détails <em>fins</em></h3><h2>Suite</h2>'
+    )
+
+    def setUp(self):
+        super().setUp()
+        self.post = BlogPost.objects.create(
+            title='Article rendu', excerpt='Un extrait suffisamment long pour le test.',
+            content=self.CONTENT, author=self.author, status='published'
+        )
+
+    def test_content_is_sanitized_with_anchored_toc(self):
+        post = BlogPost.objects.get(pk=self.post.pk)
+        self.assertNotIn('script', post.content_html)
+        self.assertNotIn('onclick', post.content_html)
+        self.assertNotIn('javascript', post.content_html)
+        self.assertIn('<h2 id="introduction">Introduction</h2>', post.content_html)
+        self.assertEqual(
+            [(entry['level'], entry['id']) for entry in post.content_toc],
+            [(2, 'introduction'), (2, 'suite'), (3, 'details-fins'), (2, 'suite-1')]
+        )
+        self.assertEqual(post.word_count, 10)
+
+    def test_rendering_runs_only_when_content_changes(self):
+        post = BlogPost.objects.get(pk=self.post.pk)
+        with mock.patch('apps.blog.models.render_content') as render:
+            post.title = 'Un autre titre pour cet article'
+            post.save()
+            post.content = self.CONTENT
+            post.save()
+        render.assert_not_called()
+
+        post.content = '<p>Nouveau contenu</p>'
+        post.save()
+        self.assertEqual(BlogPost.objects.get(pk=post.pk).content_html, '<p>Nouveau contenu</p>')
+
+    def test_detail_serves_rendered_fields(self):
+        data = self.client.get(reverse('blog:post-detail', kwargs={'slug': self.post.slug})).data
+        self.assertEqual(data['content_html'], self.post.content_html)
+        self.assertEqual(len(data['toc']), 4)
+
+
+class CommentPaginationTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = create_posts(self.author, 1, comments=25)[0]
+        self.url = reverse('blog:post-comments', kwargs={'slug': self.post.slug})
+
+    def test_detail_carries_count_and_first_page(self):
+        comments = self.client.get(reverse('blog:post-detail', kwargs={'slug': self.post.slug})).data['comments']
+        self.assertEqual(comments['count'], 25)
+        self.assertEqual(len(comments['results']), 10)
+        self.assertIn('/comments/?cursor=', comments['next'])
+
+        # La suite reprend exactement après la première page
+        ids = [comment['id'] for comment in comments['results']]
+        url = comments['next']
+        while url:
+            data = self.client.get(url).data
+            ids += [comment['id'] for comment in data['results']]
+            url = data['next']
+        expected = Comment.objects.filter(post=self.post, approved=True).order_by('-created_at', '-id')
+        self.assertEqual(ids, list(expected.values_list('id', flat=True)))
+
+    def test_page_is_an_index_seek(self):
+        first = self.client.get(self.url, {'page_size': 5}).data
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first['next'])
+        self.assertEqual(len(queries), 2)  # article + page
+        self.assertNotIn('OFFSET', queries[1]['sql'].upper())
+
+    @override_settings(COMMENT_QUEUE_DRAIN='worker')
+    def test_post_still_adds_a_comment_and_refreshes_the_list(self):
+        self.client.get(self.url)
+        response = self.client.post(self.url, {
+            'name': 'Lectrice', 'email': 'lectrice@example.com', 'content': 'Un commentaire publié via POST.'
+        })
+        self.assertEqual(response.status_code, 202)
+        ingestion.drain()
+        comment = Comment.objects.get(email='lectrice@example.com')
+        comment.approved = True
+        comment.save()
+        self.assertEqual(self.client.get(self.url).data['results'][0]['id'], comment.pk)
+
+        self.assertEqual(self.client.get(reverse('blog:post-comments', kwargs={'slug': 'inconnu'})).status_code, 404)
+
+
+@override_settings(COMMENT_QUEUE_DRAIN='worker')
+class CommentIngestionTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = create_posts(self.author, 1)[0]
+        self.url = reverse('blog:post-comments', kwargs={'slug': self.post.slug})
+
+    def send(self, content, email='lecteur@example.com'):
+        return self.client.post(self.url, {'name': 'Lecteur', 'email': email, 'content': content})
+
+    def test_post_enqueues_without_writing_comments(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.send('Un commentaire mis en file.')
+        self.assertEqual(response.status_code, 202)
+        # Une ligne dans la table de transit, rien dans les commentaires
+        self.assertEqual([query['sql'].split('(')[0] for query in queries if 'INSERT' in query['sql']],
+                         ['INSERT INTO "blog_queuedcomment" '])
+        self.assertEqual(ingestion.depth(), 1)
+        self.assertEqual(self.send('court').status_code, 400)
+        self.assertEqual(ingestion.depth(), 1)
+
+    def test_worker_screens_and_bulk_inserts_a_burst(self):
+        for i in range(20):
+            self.send(f'Commentaire numéro {i} sur cet article.', email=f'lecteur{i}@example.com')
+        self.send('Commentaire numéro 0 sur  cet article.', email='LECTEUR0@example.com')  # doublon
+        self.send('Voir http://a.example http://b.example http://c.example pour plus.')
+        for i in range(5):
+            self.send(f'Encore un message du même auteur {i}.', email='bavard@example.com')
+
+        with CaptureQueriesContext(connection) as queries:
+            inserted = ingestion.drain(batch_size=100)
+        self.assertEqual(sum(query['sql'].startswith('INSERT') for query in queries), 1)
+        self.assertEqual(inserted, 26)
+        self.assertEqual(ingestion.depth(), 0)
+        # Lien multiples + 2 messages au-delà de la limite par auteur
+        self.assertEqual(Comment.objects.filter(post=self.post, flagged=True).count(), 3)
+        self.assertFalse(Comment.objects.filter(post=self.post, approved=True).exists())
+
+        metrics = ingestion.stats()
+        self.assertEqual((metrics['enqueued'], metrics['inserted'], metrics['duplicates']), (27, 26, 1))
+        self.assertEqual(metrics['flagged'], 3)
+
+    def test_concurrent_drains_insert_each_comment_once(self):
+        self.send('Un commentaire lu par deux workers.')
+        # Lot lu par un second traitement avant que le premier ne le supprime
+        with transaction.atomic():
+            stale = ingestion._claim(10)
+        self.assertEqual(ingestion.drain(), 1)
+        batches = iter([stale])
+        with mock.patch('apps.blog.ingestion._claim', side_effect=lambda size: next(batches, [])):
+            self.assertEqual(ingestion.drain(), 0)
+        self.assertEqual(Comment.objects.filter(email='lecteur@example.com').count(), 1)
+
+    @override_settings(COMMENT_QUEUE_DRAIN='thread', COMMENT_QUEUE_FLUSH_INTERVAL=5)
+    def test_idle_timer_drains_the_durable_queue(self):
+        existing = Comment.objects.filter(post=self.post).count()
+        with mock.patch('apps.blog.ingestion.threading.Timer') as timer:
+            self.send('Un premier commentaire en attente.')
+            self.send('Un second commentaire en attente.', email='autre@example.com')
+        # Une seule minuterie armée par le premier enfilage
+        timer.assert_called_once_with(5, ingestion._drain_from_timer)
+
+        # La file est en base : elle ne dépend pas du cache (éviction, redémarrage)
+        cache.clear()
+        self.assertEqual(ingestion.depth(), 2)
+        with mock.patch('apps.blog.ingestion.close_old_connections'):
+            timer.call_args[0][1]()
+        self.assertEqual(Comment.objects.filter(post=self.post).count(), existing + 2)
+        self.assertEqual(ingestion.depth(), 0)
+
+    def test_batch_approval_refreshes_cached_comments(self):
+        self.send('Un commentaire à modérer en lot.')
+        ingestion.drain()
+        self.assertEqual(self.client.get(self.url).data['results'], [])
+
+        admin = Client()
+        admin.force_login(User.objects.create_superuser('moderateur', 'moderateur@example.com', 'secret-pass'))
+        pending = Comment.objects.filter(post=self.post, approved=False)
+        admin.post(reverse('admin:blog_comment_changelist'), {
+            'action': 'approve_comments', '_selected_action': list(pending.values_list('pk', flat=True)),
+        })
+        self.assertEqual(len(self.client.get(self.url).data['results']), 2)
+        self.assertEqual(ingestion.stats()['approved'], 2)
+
+
+class DenormalizedCounterTests(BlogTestCase):
+    def refreshed(self, *objs):
+        for obj in objs:
+            obj.refresh_from_db()
+        return [getattr(obj, 'post_count', None) for obj in objs]
+
+    def test_counters_follow_publication_tags_and_moderation(self):
+        tag, other = self.tags
+        post = create_posts(self.author, 1, self.category, [tag])[0]
+        self.assertEqual(self.refreshed(self.category, tag, other), [1, 1, 0])
+
+        post.tags.add(other)
+        other.blogpost_set.remove(post)
+        post.status = 'draft'
+        post.save()
+        self.assertEqual(self.refreshed(self.category, tag, other), [0, 0, 0])
+
+        post.status = 'published'
+        post.save()
+        comment = Comment.objects.create(post=post, name='Lecteur', email='l@example.com', content='Très bon article.')
+        comment.approved = True
+        comment.save()
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 1)
+
+        # Un save complet d'une instance périmée n'écrase pas le compteur
+        stale = BlogCategory.objects.get(pk=self.category.pk)
+        create_posts(self.author, 1, self.category)
+        stale.save()
+        self.assertEqual(self.refreshed(self.category), [2])
+
+        post.delete()
+        self.assertEqual(self.refreshed(self.category, tag), [1, 0])
+
+    def test_reconcile_repairs_drift(self):
+        create_posts(self.author, 2, self.category, self.tags)
+        BlogCategory.objects.update(post_count=7)
+        Tag.objects.filter(pk=self.tags[0].pk).update(post_count=0)
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.assertIn('blog.BlogCategory.post_count: 1 ligne(s)', out.getvalue())
+        self.assertEqual(self.refreshed(self.category, *self.tags), [2, 2, 2])
@@ -7,6 +7,7 @@ app_name = 'blog'
 urlpatterns = [
     # IMPORTANT: Featured AVANT le slug générique
     path('posts/featured/', views.featured_posts, name='featured-posts'),
+    path('posts/trending/', views.trending_posts, name='trending-posts'),
     
     # Liste des articles
     path('posts/', views.BlogPostListCreateView.as_view(), name='post-list'),
@@ -15,7 +16,7 @@ urlpatterns = [
     path('posts/<slug:slug>/', views.BlogPostDetailView.as_view(), name='post-detail'),
     
     # Commentaires
-    path('posts/<slug:slug>/comments/', views.add_comment, name='add-comment'),
+    path('posts/<slug:slug>/comments/', views.post_comments, name='post-comments'),
     
     # Métadonnées
     path('categories/', views.blog_categories, name='categories'),
@@ -3,19 +3,55 @@ from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from django.db.models import F
+from django.conf import settings
+from django.db.models import Case, IntegerField, Q, When
+from django.utils.decorators import method_decorator
+from apps.core import trending
+from apps.core.cache import cached
+from apps.core.conditional import conditional_get
+from apps.core.counters import view_counter
+from apps.core.pagination import KeysetPaginationMixin
+from apps.core.response_cache import cache_response
+from apps.core.serializers import selected_fields
+from . import ingestion
 from .models import BlogPost, BlogCategory, Tag, Comment
+from .pagination import CommentPagination
+from .search import search_posts
+from .stats import get_snapshot
 from .serializers import (
     BlogPostListSerializer, BlogPostDetailSerializer,
-    BlogPostCreateSerializer, BlogCategorySerializer,
-    TagSerializer, CommentSerializer
+    BlogPostCreateSerializer, BlogCategoryCountSerializer,
+    TagCountSerializer, CommentSerializer
 )
 
-class BlogPostListCreateView(generics.ListCreateAPIView):
+def count_cached_view(request, entry):
+    """Une vue servie depuis le cache compte quand même"""
+    if entry.get('object_pk'):
+        view_counter.increment(BlogPost(pk=entry['object_pk']))
+
+def count_revalidated_view(request, slug):
+    """Un 304 (copie du client revalidée) compte aussi comme une vue"""
+    pk = BlogPost.objects.published().filter(slug=slug).values_list('pk', flat=True).first()
+    if pk:
+        view_counter.increment(BlogPost(pk=pk))
+
+def post_last_modified(request, slug):
+    return BlogPost.objects.published().filter(slug=slug).values_list('updated_at', flat=True).first()
+
+@method_decorator([conditional_get('blog.posts'), cache_response('blog.posts')], name='dispatch')
+class BlogPostListCreateView(KeysetPaginationMixin, generics.ListCreateAPIView):
     """Liste et création d'articles de blog avec filtrage"""
+    keyset_ordering = ('-featured', '-published_at', '-id')
+    
+    def get_keyset_ordering(self):
+        # La recherche est triée par pertinence : pagination par numéro de page
+        if self.request.query_params.get('search', '').strip():
+            return None
+        return self.keyset_ordering
     
     def get_queryset(self):
-        queryset = BlogPost.objects.filter(status='published').order_by('-featured', '-published_at')
+        self.rendered_fields = selected_fields(BlogPostListSerializer, self.request.query_params)
+        queryset = BlogPost.objects.published().order_by('-featured', '-published_at')
         
         # Filtrage par catégorie
         category = self.request.query_params.get('category')
@@ -27,16 +63,33 @@ class BlogPostListCreateView(generics.ListCreateAPIView):
         if tag:
             queryset = queryset.filter(tags__slug=tag)
             
-        # Recherche dans le titre et le contenu
-        search = self.request.query_params.get('search')
+        # Recherche plein texte classée (titre, extrait, contenu, tags)
+        search = self.request.query_params.get('search', '').strip()
         if search:
-            queryset = queryset.filter(
-                title__icontains=search
-            ) | queryset.filter(
-                excerpt__icontains=search
-            )
+            return self.search_queryset(queryset, search)
             
-        return queryset.distinct()
+        return queryset.distinct().for_listing(self.rendered_fields)
+    
+    def search_queryset(self, queryset, search):
+        # Filtres (statut, catégorie, tag) appliqués dans la requête plein texte, avant la limite
+        hits = search_posts(search, limit=settings.BLOG_SEARCH_MAX_RESULTS, within=queryset)
+        if hits is None:
+            # Base sans index plein texte : simple filtrage sans classement
+            return queryset.filter(
+                Q(title__icontains=search) | Q(excerpt__icontains=search) | Q(content__icontains=search)
+            ).distinct().for_listing(self.rendered_fields)
+        
+        self.search_snippets = {hit.post_id: hit.snippet for hit in hits}
+        ranking = Case(
+            *[When(pk=hit.post_id, then=position) for position, hit in enumerate(hits)],
+            output_field=IntegerField()
+        )
+        return queryset.filter(pk__in=self.search_snippets).distinct().for_listing(self.rendered_fields).order_by(ranking)
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['search_snippets'] = getattr(self, 'search_snippets', {})
+        return context
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -53,11 +106,23 @@ class BlogPostListCreateView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+@method_decorator([
+    conditional_get(
+        'blog.details', 'blog.post:{slug}',
+        last_modified=post_last_modified, on_not_modified=count_revalidated_view,
+    ),
+    cache_response('blog.details', 'blog.post:{slug}', on_hit=count_cached_view),
+], name='dispatch')
 class BlogPostDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Détail, modification et suppression d'un article"""
-    queryset = BlogPost.objects.filter(status='published')
     lookup_field = 'slug'
     
+    def get_queryset(self):
+        queryset = BlogPost.objects.published()
+        if self.request.method == 'GET':
+            queryset = queryset.for_listing(selected_fields(BlogPostDetailSerializer, self.request.query_params))
+        return queryset
+    
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
             return BlogPostCreateSerializer
@@ -72,24 +137,25 @@ class BlogPostDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        # Incrémenter le compteur de vues de façon atomique
-        BlogPost.objects.filter(id=instance.id).update(view_count=F('view_count') + 1)
-        # Recharger l'instance avec la nouvelle valeur
-        instance.refresh_from_db()
+        # Incrément différé : écrit en base par lots, la valeur servie
+        # inclut les vues pas encore persistées
+        instance.view_count += view_counter.increment(instance)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
+@conditional_get('blog.posts')
+@cache_response('blog.posts')
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def featured_posts(request):
     """Articles mis en avant"""
     try:
-        posts = BlogPost.objects.filter(
-            status='published', 
+        fields = selected_fields(BlogPostListSerializer, request.query_params)
+        posts = BlogPost.objects.published().filter(
             featured=True
-        ).order_by('-published_at')[:6]  # Limite à 6 articles
+        ).for_listing(fields).order_by('-published_at')[:6]  # Limite à 6 articles
         
-        serializer = BlogPostListSerializer(posts, many=True)
+        serializer = BlogPostListSerializer(posts, many=True, context={'request': request})
         return Response(serializer.data)
     except Exception as e:
         return Response(
@@ -97,22 +163,30 @@ def featured_posts(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@conditional_get('blog.posts', 'blog.trending')
+@cache_response('blog.posts', 'blog.trending')
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def trending_posts(request):
+    """Articles tendance (classement précalculé, voir apps.core.trending)"""
+    fields = selected_fields(BlogPostListSerializer, request.query_params)
+    posts = trending.ranked(
+        BlogPost.objects.published().for_listing(fields), trending.requested_limit(request)
+    )
+    serializer = BlogPostListSerializer(posts, many=True, context={'request': request})
+    return Response(serializer.data)
+
+@conditional_get('blog.taxonomy')
+@cache_response('blog.taxonomy')
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def blog_categories(request):
     """Liste des catégories de blog avec comptage"""
     try:
-        categories = BlogCategory.objects.all()
-        # Ajouter le count d'articles pour chaque catégorie
-        data = []
-        for category in categories:
-            category_data = BlogCategorySerializer(category).data
-            category_data['post_count'] = BlogPost.objects.filter(
-                category=category, 
-                status='published'
-            ).count()
-            data.append(category_data)
-        
+        # Une requête (compteurs maintenus en colonne), mise en cache jusqu'au prochain changement
+        data = cached('blog.taxonomy', 'categories', lambda: BlogCategoryCountSerializer(
+            BlogCategory.objects.all(), many=True
+        ).data)
         return Response(data)
     except Exception as e:
         return Response(
@@ -120,22 +194,17 @@ def blog_categories(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@conditional_get('blog.taxonomy')
+@cache_response('blog.taxonomy')
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def blog_tags(request):
     """Liste des tags avec comptage"""
     try:
-        tags = Tag.objects.all()
-        # Ajouter le count d'articles pour chaque tag
-        data = []
-        for tag in tags:
-            tag_data = TagSerializer(tag).data
-            tag_data['post_count'] = BlogPost.objects.filter(
-                tags=tag, 
-                status='published'
-            ).count()
-            data.append(tag_data)
-        
+        # Une requête (compteurs maintenus en colonne), mise en cache jusqu'au prochain changement
+        data = cached('blog.taxonomy', 'tags', lambda: TagCountSerializer(
+            Tag.objects.all(), many=True
+        ).data)
         return Response(data)
     except Exception as e:
         return Response(
@@ -143,8 +212,22 @@ def blog_tags(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
-@api_view(['POST'])
+@conditional_get('blog.post:{slug}')
+@cache_response('blog.post:{slug}')
+@api_view(['GET', 'POST'])
 @permission_classes([permissions.AllowAny])
+def post_comments(request, slug):
+    """Commentaires approuvés d'un article (GET, par curseur) ou ajout (POST)"""
+    if request.method == 'POST':
+        return add_comment(request, slug)
+    
+    post = get_object_or_404(BlogPost.objects.published().only('id'), slug=slug)
+    # Parcours de l'index (post, approved, created_at), sans OFFSET
+    comments = Comment.objects.filter(post=post, approved=True)
+    paginator = CommentPagination()
+    page = paginator.paginate_queryset(comments, request)
+    return paginator.get_paginated_response(CommentSerializer(page, many=True).data)
+
 def add_comment(request, slug):
     """Ajouter un commentaire à un article"""
     try:
@@ -185,8 +268,13 @@ def add_comment(request, slug):
         
         serializer = CommentSerializer(data=comment_data)
         if serializer.is_valid():
-            serializer.save(post=post)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            # Écriture différée : la file insère par lots (voir ingestion.py).
+            # L'email, validé plus haut, n'est pas exposé par CommentSerializer
+            ingestion.enqueue(post, {**serializer.validated_data, 'email': comment_data['email']})
+            return Response(
+                {'message': 'Commentaire reçu, il sera visible après modération.'},
+                status=status.HTTP_202_ACCEPTED
+            )
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             
@@ -201,17 +289,21 @@ def add_comment(request, slug):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@conditional_get('blog.posts')
+@cache_response('blog.posts')
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def blog_stats(request):
     """Statistiques du blog"""
     try:
-        recent_posts = BlogPost.objects.filter(status='published').order_by('-published_at')[:5]
+        # Comptages lus dans l'instantané maintenu par signaux (une requête)
+        snapshot = get_snapshot()
+        recent_posts = BlogPost.objects.published().for_listing().order_by('-published_at')[:5]
         stats = {
-            'total_posts': BlogPost.objects.filter(status='published').count(),
-            'total_categories': BlogCategory.objects.count(),
-            'total_tags': Tag.objects.count(),
-            'total_comments': Comment.objects.filter(approved=True).count(),
+            'total_posts': snapshot.total_posts,
+            'total_categories': snapshot.total_categories,
+            'total_tags': snapshot.total_tags,
+            'total_comments': snapshot.total_comments,
             'recent_posts': BlogPostListSerializer(recent_posts, many=True).data,
         }
         return Response(stats)
@@ -0,0 +1,138 @@
+# ========== apps/core/analytics.py ==========
+"""
+Statistiques de vues par jour.
+
+Chaque flush de view_counter ajoute au flux `ViewEvent` une ligne par
+contenu vu (un seul INSERT groupé, jamais une écriture par requête).
+rollup() agrège ces événements par contenu et par jour (heure locale)
+dans `DailyViews`, puis les supprime : le flux brut reste court. Le
+rollup est lancé au plus toutes les ANALYTICS_ROLLUP_INTERVAL secondes
+après un flush, ou par la commande rollup_views.
+
+Aucun verrou inter-processus n'est nécessaire : chaque lot d'événements
+est revendiqué par sa suppression (SKIP LOCKED là où la base le permet),
+et DailyViews est incrémenté en base (views = views + n), jamais réécrit
+depuis une valeur lue. Deux rollups concurrents ne comptent donc chaque
+vue qu'une fois.
+
+L'API de statistiques (apps.core.views) ne lit que `DailyViews` : les
+vues encore dans le flux n'y apparaissent qu'après le rollup suivant.
+"""
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import DailyViews, ViewEvent
+
+logger = logging.getLogger(__name__)
+
+LAST_ROLLUP_KEY = 'analytics:last-rollup'
+BATCH_SIZE = 5000
+
+
+def rollup_interval():
+    return getattr(settings, 'ANALYTICS_ROLLUP_INTERVAL', 3600)
+
+
+def record_events(pending):
+    """Ajoute au flux les vues `{(label, pk): delta}` écrites par view_counter"""
+    now = timezone.now()
+    ViewEvent.objects.bulk_create([
+        ViewEvent(model_label=label, object_id=pk, views=delta, recorded_at=now)
+        for (label, pk), delta in pending.items() if delta > 0
+    ])
+    transaction.on_commit(maybe_rollup)
+
+
+def maybe_rollup():
+    if time.time() - (cache.get(LAST_ROLLUP_KEY) or 0) < rollup_interval():
+        return
+    try:
+        rollup()
+    except Exception:
+        logger.exception("Échec de l'agrégation des vues quotidiennes")
+
+
+def _claim_batch():
+    """Événements les plus anciens, verrouillés jusqu'à la fin de la transaction"""
+    events = ViewEvent.objects.order_by('pk')
+    if connection.features.has_select_for_update_skip_locked:
+        events = events.select_for_update(skip_locked=True)
+    return list(events.values_list('pk', 'model_label', 'object_id', 'recorded_at', 'views')[:BATCH_SIZE])
+
+
+def _add_daily_views(totals):
+    """Ajoute `{(label, object_id, jour): vues}` à DailyViews par des UPDATE relatifs"""
+    DailyViews.objects.bulk_create(
+        [DailyViews(model_label=label, object_id=object_id, day=day, views=0)
+         for label, object_id, day in totals],
+        ignore_conflicts=True,
+    )
+    # Une requête par (contenu, jour, delta), comme les compteurs de vues
+    groups = defaultdict(list)
+    for (label, object_id, day), views in totals.items():
+        groups[(label, day, views)].append(object_id)
+    for (label, day, views), object_ids in groups.items():
+        DailyViews.objects.filter(model_label=label, day=day, object_id__in=object_ids).update(
+            views=F('views') + views
+        )
+
+
+def rollup():
+    """Agrège le flux dans DailyViews puis le purge ; retourne le nombre d'événements traités"""
+    cache.set(LAST_ROLLUP_KEY, time.time(), None)
+    processed = 0
+    while True:
+        with transaction.atomic():
+            events = _claim_batch()
+            if not events:
+                return processed
+            # La suppression revendique le lot : si un autre rollup en a déjà
+            # supprimé une partie, on annule et on relit
+            deleted, _ = ViewEvent.objects.filter(pk__in=[event[0] for event in events]).delete()
+            if deleted != len(events):
+                transaction.set_rollback(True)
+                continue
+
+            totals = defaultdict(int)
+            for _, label, object_id, recorded_at, views in events:
+                totals[(label, object_id, timezone.localdate(recorded_at))] += views
+            _add_daily_views(totals)
+        processed += len(events)
+
+
+def period_start(day, interval):
+    return day - timedelta(days=day.weekday()) if interval == 'week' else day
+
+
+def series(label, start, end, interval='day', object_id=None):
+    """Vues par jour (ou par semaine, commençant le lundi) entre start et end inclus"""
+    rows = DailyViews.objects.filter(model_label=label, day__range=(start, end))
+    if object_id is not None:
+        rows = rows.filter(object_id=object_id)
+    totals = defaultdict(int)
+    for day, views in rows.values('day').annotate(total=Sum('views')).values_list('day', 'total'):
+        totals[period_start(day, interval)] += views
+
+    step = timedelta(days=7 if interval == 'week' else 1)
+    points, current = [], period_start(start, interval)
+    while current <= end:
+        points.append({'date': current.isoformat(), 'views': totals.get(current, 0)})
+        current += step
+    return points
+
+
+def top_items(label, start, end, limit=10):
+    """(object_id, vues) des contenus les plus vus sur la période"""
+    return list(
+        DailyViews.objects.filter(model_label=label, day__range=(start, end))
+        .values('object_id').annotate(total=Sum('views'))
+        .order_by('-total', 'object_id').values_list('object_id', 'total')[:limit]
+    )
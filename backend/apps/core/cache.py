@@ -0,0 +1,47 @@
+# ========== apps/core/cache.py ==========
+"""
+Cache versionné par espace de noms.
+
+Chaque espace de noms (ex. 'blog.taxonomy') possède un numéro de version
+stocké dans le cache ; les clés de données l'incluent. Invalider revient à
+incrémenter la version : les anciennes entrées ne sont plus jamais lues et
+expirent d'elles-mêmes.
+"""
+import time
+
+from django.core.cache import cache
+
+VERSION_PREFIX = 'nsversion'
+
+
+def _version_key(namespace):
+    return f'{VERSION_PREFIX}:{namespace}'
+
+
+def get_version(namespace):
+    # Valeur initiale horodatée : une version évincée du cache ne peut pas
+    # retomber sur un numéro déjà utilisé
+    return cache.get_or_set(_version_key(namespace), lambda: int(time.time() * 1000), None)
+
+
+def bump_version(*namespaces):
+    """Invalide d'un coup toutes les entrées des espaces de noms donnés"""
+    for namespace in namespaces:
+        try:
+            cache.incr(_version_key(namespace))
+        except ValueError:
+            cache.set(_version_key(namespace), int(time.time() * 1000), None)
+
+
+def make_key(namespace, key):
+    return f'{namespace}:{get_version(namespace)}:{key}'
+
+
+def cached(namespace, key, builder, timeout=None):
+    """Retourne la valeur en cache ou la construit avec `builder()`"""
+    full_key = make_key(namespace, key)
+    value = cache.get(full_key)
+    if value is None:
+        value = builder()
+        cache.set(full_key, value, timeout)
+    return value
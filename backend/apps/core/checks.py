@@ -0,0 +1,26 @@
+# ========== apps/core/checks.py ==========
+from django.conf import settings
+from django.core.checks import Error, register
+
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def shared_cache_check(app_configs, **kwargs):
+    """
+    Le cache de réponses, les versions de apps.core.cache et les métriques
+    doivent être partagés entre workers : un cache par processus sert des
+    réponses périmées après une écriture
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    workers = getattr(settings, 'WEB_CONCURRENCY', 1)
+    if workers > 1 and backend in LOCAL_CACHE_BACKENDS:
+        return [Error(
+            f'{backend} est propre à chaque processus, or WEB_CONCURRENCY vaut {workers}',
+            hint="Définir REDIS_URL (cache partagé) ou servir avec un seul worker.",
+            id='core.E001',
+        )]
+    return []
@@ -0,0 +1,59 @@
+# ========== apps/core/conditional.py ==========
+"""
+GET conditionnels (ETag / Last-Modified) pour les endpoints publics.
+
+L'ETag est dérivé des versions des espaces de noms de apps.core.cache
+(incrémentées par signaux à chaque modification), du chemin et de la
+query string normalisée : le calculer ne coûte aucune requête SQL, et un
+304 est renvoyé avant toute sérialisation ou lecture du cache de réponses.
+"""
+import hashlib
+from functools import wraps
+
+from django.views.decorators.http import condition
+
+from .cache import get_version
+from .response_cache import is_editor_request, normalized_query_string
+
+
+def collection_etag(*namespaces):
+    def etag_func(request, *args, **kwargs):
+        if is_editor_request(request):
+            return None
+        parts = [f'{ns}={get_version(ns.format(**kwargs))}' for ns in namespaces]
+        parts.append(f'{request.path}?{normalized_query_string(request)}')
+        # Représentation gzip et identité : ETags distincts (validateurs forts)
+        parts.append('gzip' if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '') else 'identity')
+        return hashlib.md5('|'.join(parts).encode()).hexdigest()
+    return etag_func
+
+
+def conditional_get(*namespaces, last_modified=None, on_not_modified=None):
+    """
+    Décorateur : ETag calculé depuis les versions de `namespaces` (gabarits
+    formatés avec les kwargs de l'URL) et, si fourni, Last-Modified via
+    `last_modified(request, **kwargs)`. `on_not_modified(request, **kwargs)`
+    est appelé pour chaque GET répondu par un 304 (ex. compter la vue).
+    """
+    if last_modified is not None:
+        def last_modified_func(request, *args, **kwargs):
+            if is_editor_request(request):
+                return None
+            return last_modified(request, *args, **kwargs)
+    else:
+        last_modified_func = None
+    conditional = condition(etag_func=collection_etag(*namespaces), last_modified_func=last_modified_func)
+    if on_not_modified is None:
+        return conditional
+
+    def decorator(view):
+        view_func = conditional(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 304 and request.method == 'GET':
+                on_not_modified(request, *args, **kwargs)
+            return response
+        return wrapper
+    return decorator
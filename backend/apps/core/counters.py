@@ -0,0 +1,145 @@
+# ========== apps/core/counters.py ==========
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+
+from . import analytics, trending
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedCounter:
+    """
+    Compteur à écriture différée.
+
+    Les incréments sont accumulés en mémoire par (modèle, pk) puis écrits
+    en base par lots d'UPDATE groupés par delta, quand le seuil
+    d'incréments est atteint, à l'arrêt du worker, et au plus tard
+    `flush_interval` secondes après le premier incrément en attente
+    (minuterie armée par cet incrément, même sans trafic ultérieur). Les
+    lectures ajoutent le delta en attente à la valeur persistée.
+    Chaque fonction de `on_flush` reçoit les deltas écrits `{(label, pk): delta}`,
+    dans la même transaction que les UPDATE.
+    """
+
+    def __init__(self, field, on_flush=()):
+        self.field = field
+        self.on_flush = on_flush
+        self._pending = defaultdict(int)
+        self._pending_total = 0
+        self._inflight = {}
+        self._inflight_total = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'VIEW_COUNTER_FLUSH_INTERVAL', 30)
+
+    @property
+    def flush_threshold(self):
+        return getattr(settings, 'VIEW_COUNTER_FLUSH_THRESHOLD', 100)
+
+    @staticmethod
+    def _key(instance):
+        return (instance._meta.label, instance.pk)
+
+    def increment(self, instance, amount=1):
+        """
+        Enregistre `amount` incréments pour l'instance et retourne le delta
+        non encore persisté pour celle-ci (incréments courants inclus).
+        """
+        key = self._key(instance)
+        with self._lock:
+            self._pending[key] += amount
+            self._pending_total += amount
+            delta = self._pending[key] + self._inflight.get(key, 0)
+            due = self._pending_total >= self.flush_threshold
+            if not due:
+                self._arm_timer()
+        if due:
+            self.flush()
+        return delta
+
+    def _arm_timer(self):
+        """Programme un flush dans `flush_interval` secondes (appelé sous _lock)"""
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_from_timer(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        finally:
+            close_old_connections()
+
+    def pending_for(self, instance):
+        """Delta non encore persisté pour une instance"""
+        key = self._key(instance)
+        with self._lock:
+            return self._pending.get(key, 0) + self._inflight.get(key, 0)
+
+    def pending_count(self):
+        """Nombre total d'incréments en attente d'écriture"""
+        with self._lock:
+            return self._pending_total + self._inflight_total
+
+    def flush(self):
+        """Écrit les incréments en attente et retourne le nombre persisté"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, defaultdict(int)
+                total, self._pending_total = self._pending_total, 0
+                self._inflight, self._inflight_total = dict(pending), total
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not pending:
+                return 0
+
+            # Une seule requête UPDATE par (modèle, delta)
+            batches = defaultdict(lambda: defaultdict(list))
+            for (label, pk), delta in pending.items():
+                batches[label][delta].append(pk)
+
+            try:
+                with transaction.atomic():
+                    for label, deltas in batches.items():
+                        model = apps.get_model(label)
+                        for delta, pks in deltas.items():
+                            model._base_manager.filter(pk__in=pks).update(
+                                **{self.field: F(self.field) + delta}
+                            )
+                    for listener in self.on_flush:
+                        listener(pending)
+            except Exception:
+                logger.exception("Échec de l'écriture des compteurs %s", self.field)
+                with self._lock:
+                    for key, delta in pending.items():
+                        self._pending[key] += delta
+                    self._pending_total += total
+                    self._inflight, self._inflight_total = {}, 0
+                    # Nouvel essai à la prochaine échéance
+                    self._arm_timer()
+                return 0
+
+            with self._lock:
+                self._inflight, self._inflight_total = {}, 0
+            return total
+
+
+# Les vues alimentent aussi le classement tendance et les statistiques quotidiennes
+view_counter = BufferedCounter('view_count', on_flush=(trending.record_views, analytics.record_events))
+
+# Ne pas perdre les vues en attente à l'arrêt du worker
+atexit.register(view_counter.flush)
@@ -0,0 +1,67 @@
+# ========== apps/core/denorm.py ==========
+"""
+Compteurs dénormalisés : colonnes tenues à jour par les signaux des
+applications avec des deltas atomiques (F()), dans la transaction de
+l'écriture qui les déclenche.
+
+Chaque colonne est enregistrée avec l'expression qui la recalcule depuis
+les tables : `reconcile` (commande reconcile_counters) répare la dérive
+laissée par les écritures qui contournent les signaux (update(),
+bulk_create, SQL brut).
+"""
+from collections import defaultdict
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .cache import bump_version
+
+# (modèle, champ, fabrique de l'expression de recalcul, espaces de cache)
+REGISTRY = []
+
+
+def register(model, field, expression, namespaces=()):
+    REGISTRY.append((model, field, expression, namespaces))
+
+
+def adjust(model, pks, field, delta):
+    """Ajoute `delta` au compteur des lignes `pks` (une requête)"""
+    pks = {pk for pk in pks if pk is not None}
+    if pks and delta:
+        model._base_manager.filter(pk__in=pks).update(**{field: F(field) + delta})
+
+
+def apply_deltas(model, field, deltas):
+    """Deltas par ligne {pk: delta} : une requête par valeur de delta"""
+    by_delta = defaultdict(list)
+    for pk, delta in deltas.items():
+        by_delta[delta].append(pk)
+    for delta, pks in by_delta.items():
+        adjust(model, pks, field, delta)
+
+
+def count_of(queryset, outer_field):
+    """Expression : nombre de lignes de `queryset` rattachées à la ligne externe"""
+    counts = queryset.filter(**{outer_field: OuterRef('pk')}).order_by().values(outer_field).annotate(
+        total=Count('pk')
+    ).values('total')
+    return Coalesce(Subquery(counts), 0)
+
+
+def reconcile(dry_run=False):
+    """Corrige les compteurs faux ; retourne {'label.champ': lignes corrigées}"""
+    fixed = {}
+    namespaces = set()
+    for model, field, expression, cache_namespaces in REGISTRY:
+        drifted = list(
+            model._base_manager.annotate(expected=expression()).exclude(
+                **{field: F('expected')}
+            ).values_list('pk', flat=True)
+        )
+        if drifted and not dry_run:
+            model._base_manager.filter(pk__in=drifted).update(**{field: expression()})
+            namespaces.update(cache_namespaces)
+        fixed[f'{model._meta.label}.{field}'] = len(drifted)
+    if namespaces:
+        bump_version(*namespaces)
+    return fixed
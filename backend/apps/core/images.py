@@ -0,0 +1,225 @@
+# ========== apps/core/images.py ==========
+"""
+Dérivés responsives et placeholders des images téléversées.
+
+L'original n'est jamais modifié. Après la validation de la transaction
+qui enregistre une nouvelle image, un pool de threads calcule, hors du
+cycle de la requête :
+- des versions WebP aux largeurs de VARIANT_WIDTHS (celles
+  d'execution/optimize_images.py), sans dépasser l'original ;
+- un placeholder : dimensions intrinsèques, couleur dominante et LQIP
+  (miniature floue en data URI), pour réserver la place et peindre une
+  ébauche avant le téléchargement de l'image.
+
+Chaque modèle concerné déclare son champ image, le champ de l'image
+source traitée et les champs JSON à remplir : une image inchangée n'est pas
+retraitée, et un résultat arrivé après le remplacement de l'image est
+écarté. Les dérivés remplacés, écartés ou dont la ligne est supprimée
+sont effacés du stockage (delete_variants). IMAGE_VARIANTS_MODE vaut 'thread' (défaut), 'inline' (tests,
+commandes) ou 'off'.
+"""
+import base64
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from .cache import bump_version
+
+logger = logging.getLogger(__name__)
+
+# Mêmes largeurs que SIZES dans execution/optimize_images.py
+VARIANT_WIDTHS = (400, 800, 1200)
+WEBP_QUALITY = 85
+VARIANTS_DIR = 'variants'
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 40
+
+_executor = None
+
+
+def _setting(name, default):
+    return getattr(settings, f'IMAGE_VARIANTS_{name}', default)
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_setting('WORKERS', 2), thread_name_prefix='image-variants')
+    return _executor
+
+
+def variant_name(name, width):
+    """Nom complet de l'original (extension comprise) : cover.jpg et cover.png ne partagent rien"""
+    directory, filename = os.path.split(name)
+    return os.path.join(directory, VARIANTS_DIR, f'{filename}-{width}w.webp')
+
+
+def delete_variants(variants, keep=()):
+    """Supprime du stockage les fichiers dérivés, après validation de la transaction"""
+    names = [variant['name'] for variant in variants or [] if variant['name'] not in keep]
+    if names:
+        transaction.on_commit(lambda: _delete_files(names))
+
+
+def _delete_files(names):
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except OSError:
+            logger.exception("Suppression impossible du dérivé %s", name)
+
+
+def flatten(image):
+    """RGB ou RGBA selon la transparence, orientation EXIF appliquée"""
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        return image.convert('RGBA')
+    return image.convert('RGB')
+
+
+def build_variants(name, original):
+    """Génère les dérivés de l'image `name` du stockage ; retourne leur description"""
+    variants = []
+    for width in VARIANT_WIDTHS:
+        if width > original.width:
+            break
+        height = round(original.height * width / original.width)
+        buffer = BytesIO()
+        original.resize((width, height), Image.Resampling.LANCZOS).save(
+            buffer, 'WEBP', quality=WEBP_QUALITY, method=6
+        )
+        target = variant_name(name, width)
+        if default_storage.exists(target):
+            default_storage.delete(target)
+        saved = default_storage.save(target, ContentFile(buffer.getvalue()))
+        variants.append({'name': saved, 'width': width, 'height': height, 'bytes': buffer.tell()})
+    return variants
+
+
+def dominant_color(image):
+    """Couleur la plus représentée (quantification en 5 teintes), en hexadécimal"""
+    small = image.copy()
+    small.thumbnail((64, 64))
+    if small.mode == 'RGBA':
+        # Zones transparentes rendues sur fond blanc
+        background = Image.new('RGBA', small.size, (255, 255, 255, 255))
+        small = Image.alpha_composite(background, small)
+    quantized = small.convert('RGB').quantize(colors=5, method=Image.Quantize.MEDIANCUT)
+    count, index = max(quantized.getcolors())
+    red, green, blue = quantized.getpalette()[index * 3:index * 3 + 3]
+    return f'#{red:02x}{green:02x}{blue:02x}'
+
+
+def placeholder(image):
+    """
+    Dimensions intrinsèques, couleur dominante et LQIP (miniature WebP de
+    PLACEHOLDER_SIZE px en data URI, quelques centaines d'octets)
+    """
+    thumbnail = image.copy()
+    thumbnail.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    buffer = BytesIO()
+    thumbnail.save(buffer, 'WEBP', quality=PLACEHOLDER_QUALITY)
+    return {
+        'width': image.width,
+        'height': image.height,
+        'color': dominant_color(image),
+        'lqip': 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode(),
+    }
+
+
+def process(model, pk, image_field, source_field, variants_field=None, placeholder_field=None, namespaces=()):
+    """
+    Calcule et enregistre, pour l'image courante d'une instance, les dérivés
+    (`variants_field`) et/ou le placeholder (`placeholder_field`)
+    """
+    row = model._base_manager.filter(pk=pk).values(image_field, *filter(None, [variants_field])).first()
+    if not row or not row[image_field]:
+        return {}
+    name = row[image_field]
+    previous = row.get(variants_field) or []
+    values = {source_field: name}
+    if variants_field:
+        values[variants_field] = []
+    if placeholder_field:
+        values[placeholder_field] = {}
+    try:
+        with default_storage.open(name, 'rb') as source:
+            original = flatten(Image.open(source))
+        if variants_field:
+            values[variants_field] = build_variants(name, original)
+        if placeholder_field:
+            values[placeholder_field] = placeholder(original)
+    except (OSError, ValueError):
+        logger.exception("Dérivés impossibles pour %s", name)
+    # L'image a pu être remplacée entre-temps : n'écrire que pour la même source
+    updated = model._base_manager.filter(pk=pk, **{image_field: name}).update(**values)
+    if variants_field:
+        created = values[variants_field]
+        if updated:
+            # Dérivés de l'image précédente, ou d'un calcul antérieur
+            delete_variants(previous, keep={variant['name'] for variant in created})
+        else:
+            # Résultat écarté : ses fichiers ne seraient référencés par rien
+            delete_variants(created)
+    if updated and namespaces:
+        bump_version(*namespaces)
+    return values
+
+
+def _process_in_thread(*args, **kwargs):
+    try:
+        process(*args, **kwargs)
+    except Exception:
+        logger.exception("Échec de la génération des dérivés d'image")
+    finally:
+        close_old_connections()
+
+
+def schedule(instance, image_field, source_field, variants_field=None, placeholder_field=None, namespaces=()):
+    """
+    Planifie le traitement si l'image a changé depuis le dernier passage ;
+    sans image, dérivés et placeholder sont vidés tout de suite.
+    """
+    name = getattr(instance, image_field).name or ''
+    if name == getattr(instance, source_field):
+        return False
+    mode = _setting('MODE', 'thread')
+    if mode == 'off':
+        return False
+    model = type(instance)
+    if not name:
+        cleared = {source_field: ''}
+        if variants_field:
+            cleared[variants_field] = []
+            delete_variants(getattr(instance, variants_field))
+        if placeholder_field:
+            cleared[placeholder_field] = {}
+        model._base_manager.filter(pk=instance.pk).update(**cleared)
+        return False
+    args = (model, instance.pk, image_field, source_field, variants_field, placeholder_field, namespaces)
+    if mode == 'inline':
+        transaction.on_commit(lambda: process(*args))
+    else:
+        transaction.on_commit(lambda: executor().submit(_process_in_thread, *args))
+    return True
+
+
+def srcset(variants, request=None):
+    """Structure prête pour <img srcset> à partir des variantes enregistrées"""
+    items = []
+    for variant in variants or []:
+        url = default_storage.url(variant['name'])
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        items.append({'url': url, 'width': variant['width'], 'height': variant['height'], 'bytes': variant['bytes']})
+    return {
+        'srcset': ', '.join(f"{item['url']} {item['width']}w" for item in items),
+        'variants': items,
+    }
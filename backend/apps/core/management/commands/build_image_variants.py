@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+
+from apps.blog.models import BlogPost
+from apps.core import images
+from apps.core.cache import bump_version
+from apps.portfolio.models import Project, ProjectImage
+
+# Modèle -> (champ image, champ de la source traitée, dérivés, placeholder)
+TARGETS = (
+    (Project, 'featured_image', 'featured_image_source', 'featured_image_variants', 'featured_image_placeholder'),
+    (ProjectImage, 'image', 'image_source', 'variants', 'placeholder'),
+    (BlogPost, 'featured_image', 'featured_image_source', None, 'featured_image_placeholder'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Génère les dérivés WebP et placeholders manquants des images "
+        "(toutes les images avec --force)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regénère aussi les images à jour')
+
+    def handle(self, *args, **options):
+        total = 0
+        for model, image_field, source_field, variants_field, placeholder_field in TARGETS:
+            queryset = model._base_manager.exclude(**{image_field: ''}).exclude(**{f'{image_field}__isnull': True})
+            if not options['force']:
+                queryset = queryset.filter(~Q(**{source_field: F(image_field)}) | Q(**{placeholder_field: {}}))
+            for pk in queryset.values_list('pk', flat=True).iterator():
+                images.process(model, pk, image_field, source_field, variants_field, placeholder_field)
+                total += 1
+        bump_version('portfolio.projects', 'portfolio.details', 'blog.posts', 'blog.details')
+        self.stdout.write(self.style.SUCCESS(f'Images traitées : {total}'))
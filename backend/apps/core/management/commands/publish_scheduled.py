@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.core import publishing
+
+
+class Command(BaseCommand):
+    help = (
+        "Met en ligne les articles et projets programmés dont l'échéance est "
+        "passée (une passe, ou en continu avec --loop)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Surveille les échéances en continu')
+        parser.add_argument('--interval', type=float, default=30.0, help='Attente maximale entre deux passes (secondes)')
+
+    def handle(self, *args, **options):
+        while True:
+            published = publishing.publish_due()
+            if published or not options['loop']:
+                self.stdout.write(f'{published} publication(s) mise(s) en ligne')
+            if not options['loop']:
+                break
+            # Réveil à la prochaine échéance si elle précède l'intervalle
+            time.sleep(max(0.5, min(options['interval'], publishing.next_due() - time.time())))
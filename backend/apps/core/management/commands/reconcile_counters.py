@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.core import denorm
+
+
+class Command(BaseCommand):
+    help = "Recalcule les compteurs dénormalisés et corrige ceux qui ont dérivé"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Affiche les écarts sans les corriger')
+
+    def handle(self, *args, **options):
+        fixed = denorm.reconcile(dry_run=options['dry_run'])
+        verb = 'à corriger' if options['dry_run'] else 'corrigée(s)'
+        for counter, rows in fixed.items():
+            self.stdout.write(f'{counter}: {rows} ligne(s) {verb}')
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from apps.core import response_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Affiche les compteurs du cache de réponses (hits, misses, bypass, "
+        "réponses écrites) et son volume par espace de noms"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Remet les compteurs à zéro')
+
+    def handle(self, *args, **options):
+        stats = response_cache.stats()
+        lookups = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / lookups * 100 if lookups else 0
+        sizes = stats.pop('size')
+        for name, value in stats.items():
+            self.stdout.write(f'{name}: {value}')
+        for namespace, size in sizes.items():
+            self.stdout.write(f"{namespace}: {size['entries']} entrée(s), {size['bytes'] / 1024:.1f} Ko")
+        self.stdout.write(f'hit ratio: {ratio:.1f}%')
+        if options['reset']:
+            response_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS('Compteurs remis à zéro'))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.core import analytics
+
+
+class Command(BaseCommand):
+    help = (
+        "Agrège le flux des vues dans les statistiques quotidiennes et purge "
+        "les événements traités (une passe, ou périodiquement avec --loop)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Agrège périodiquement')
+        parser.add_argument('--interval', type=float, default=3600.0, help='Pause entre deux passes (secondes)')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = analytics.rollup()
+            self.stdout.write(f'{processed} événement(s) de vue agrégé(s)')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
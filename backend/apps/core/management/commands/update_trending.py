@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.core import trending
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les classements tendance à partir des vues horaires "
+        "(une passe, ou périodiquement avec --loop)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Recalcule périodiquement')
+        parser.add_argument('--interval', type=float, default=600.0, help='Pause entre deux passes (secondes)')
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            sizes = trending.update_trending()
+            elapsed = (time.perf_counter() - started) * 1000
+            summary = ', '.join(f'{label}: {size}' for label, size in sizes.items())
+            self.stdout.write(f'Classements recalculés en {elapsed:.0f} ms ({summary})')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,205 @@
+# ========== apps/core/media.py ==========
+"""
+Service des fichiers de MEDIA_ROOT (vidéos de démo, images téléversées).
+
+Remplace `django.conf.urls.static.static()` : requêtes Range simples et
+multiples (206, multipart/byteranges, 416), If-Range, et GET
+conditionnels (ETag dérivé de la date et de la taille, Last-Modified).
+
+Avec MEDIA_SENDFILE_BACKEND, l'envoi est délégué au serveur frontal :
+'x-sendfile' (Apache mod_xsendfile, lighttpd) ou 'x-accel-redirect'
+(nginx, emplacement interne MEDIA_ACCEL_REDIRECT_PREFIX), qui gère alors
+lui-même les Range. Sinon la réponse expose le fichier via
+`file_to_stream` : gunicorn l'envoie par `os.sendfile` (wsgi.file_wrapper)
+depuis la position de la plage, limité à Content-Length, sans copie dans
+Python. Les autres serveurs lisent la plage par blocs.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import get_random_string
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+BLOCK_SIZE = 64 * 1024
+# Au-delà, l'en-tête Range est ignoré et le fichier servi en entier
+MAX_RANGES = 16
+MAX_AGE = 24 * 3600
+RANGE_RE = re.compile(r'^\s*(\d*)\s*-\s*(\d*)\s*$')
+
+
+def parse_range(header, size):
+    """
+    Plages (début, fin incluse) demandées par l'en-tête Range, fusionnées
+    si elles se chevauchent. None : en-tête ignoré (réponse complète) ;
+    liste vide : aucune plage satisfaisable (416).
+    """
+    unit, _, specs = (header or '').partition('=')
+    if unit.strip().lower() != 'bytes' or not specs:
+        return None
+    ranges = []
+    for spec in specs.split(','):
+        match = RANGE_RE.match(spec)
+        if not match or match.groups() == ('', ''):
+            return None
+        first, last = match.groups()
+        if not first:
+            # Suffixe : les N derniers octets
+            if not int(last):
+                continue
+            start, end = max(size - int(last), 0), size - 1
+        else:
+            start, end = int(first), min(int(last), size - 1) if last else size - 1
+            if last and int(last) < start:
+                return None
+        if start < size:
+            ranges.append((start, end))
+    if len(ranges) > MAX_RANGES:
+        return None
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class FileRange:
+    """Lecture de `length` octets d'un fichier ouvert, à partir de `start`"""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+
+    def fileno(self):
+        # Utilisé par wsgi.file_wrapper (os.sendfile depuis la position courante)
+        return self.file.fileno()
+
+    def read(self, size=-1):
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.file.read(size) if size else b''
+        self.remaining -= len(data)
+        return data
+
+    def __iter__(self):
+        while chunk := self.read(BLOCK_SIZE):
+            yield chunk
+
+    def close(self):
+        self.file.close()
+
+
+def file_response(file, start, length, status=200):
+    body = FileRange(file, start, length)
+    response = StreamingHttpResponse(body, status=status)
+    response.file_to_stream = body
+    response.block_size = BLOCK_SIZE
+    response['Content-Length'] = str(length)
+    return response
+
+
+def multipart_response(file, ranges, size, content_type):
+    boundary = get_random_string(24)
+    parts = [
+        (f'--{boundary}\r\nContent-Type: {content_type}\r\n'
+         f'Content-Range: bytes {start}-{end}/{size}\r\n\r\n').encode()
+        for start, end in ranges
+    ]
+    closing = f'--{boundary}--\r\n'.encode()
+
+    def stream():
+        try:
+            for header, (start, end) in zip(parts, ranges):
+                yield header
+                yield from FileRange(file, start, end - start + 1)
+                yield b'\r\n'
+            yield closing
+        finally:
+            file.close()
+
+    length = sum(len(header) + end - start + 3 for header, (start, end) in zip(parts, ranges)) + len(closing)
+    response = StreamingHttpResponse(stream(), status=206, content_type=f'multipart/byteranges; boundary={boundary}')
+    response['Content-Length'] = str(length)
+    return response
+
+
+def offloaded_response(path, name, content_type):
+    """Envoi délégué au serveur frontal, ou None si non configuré"""
+    backend = getattr(settings, 'MEDIA_SENDFILE_BACKEND', '')
+    if backend == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+    elif backend == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(name)
+    else:
+        return None
+    return response
+
+
+def if_range_matches(request, etag, mtime):
+    """Sans If-Range, ou s'il désigne la version courante, les plages s'appliquent"""
+    validator = request.META.get('HTTP_IF_RANGE')
+    if not validator:
+        return True
+    if validator.startswith(('"', 'W/')):
+        return validator == etag
+    return parse_http_date_safe(validator) == int(mtime)
+
+
+@require_safe
+def serve(request, path):
+    """Fichier de MEDIA_ROOT, avec plages et validation conditionnelle"""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    try:
+        stat = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    size, mtime = stat.st_size, stat.st_mtime
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    response = get_conditional_response(request, etag=etag, last_modified=int(mtime))
+    if response is None:
+        response = offloaded_response(full_path, path, content_type)
+    if response is None:
+        ranges = parse_range(request.META.get('HTTP_RANGE'), size)
+        if ranges is not None and not if_range_matches(request, etag, mtime):
+            ranges = None
+        if ranges == []:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+        elif ranges and len(ranges) > 1:
+            response = multipart_response(open(full_path, 'rb'), ranges, size, content_type)
+        elif ranges:
+            start, end = ranges[0]
+            response = file_response(open(full_path, 'rb'), start, end - start + 1, status=206)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Type'] = content_type
+        else:
+            response = file_response(open(full_path, 'rb'), 0, size)
+            response['Content-Type'] = content_type
+        if encoding:
+            response['Content-Encoding'] = encoding
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(mtime)
+    patch_cache_control(response, public=True, max_age=MAX_AGE)
+    return response
@@ -0,0 +1,24 @@
+# ========== apps/core/middleware.py ==========
+import logging
+
+from . import publishing
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledPublishingMiddleware:
+    """
+    Met en ligne les publications programmées échues avant de servir la
+    requête : la première réponse après l'échéance est déjà à jour. Hors
+    échéance, le coût est une lecture de cache.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            publishing.publish_if_due()
+        except Exception:
+            logger.exception("Échec de la mise en ligne des publications programmées")
+        return self.get_response(request)
@@ -0,0 +1,50 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('rank', models.PositiveIntegerField()),
+                ('score', models.FloatField()),
+                ('computed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Score de tendance',
+                'verbose_name_plural': 'Scores de tendance',
+                'ordering': ['model_label', 'rank'],
+                'indexes': [models.Index(fields=['model_label', 'rank'], name='core_trending_rank_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ViewBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('hour', models.DateTimeField()),
+                ('views', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Vues horaires',
+                'verbose_name_plural': 'Vues horaires',
+                'indexes': [models.Index(fields=['model_label', 'hour'], name='core_viewbucket_hour_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='viewbucket',
+            constraint=models.UniqueConstraint(fields=('model_label', 'object_id', 'hour'), name='core_viewbucket_unique'),
+        ),
+    ]
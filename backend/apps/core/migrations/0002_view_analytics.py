@@ -0,0 +1,47 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:17
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('views', models.PositiveIntegerField()),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Événement de vue',
+                'verbose_name_plural': 'Événements de vue',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyViews',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('day', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Vues quotidiennes',
+                'verbose_name_plural': 'Vues quotidiennes',
+                'indexes': [models.Index(fields=['model_label', 'day'], name='core_dailyviews_day_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailyviews',
+            constraint=models.UniqueConstraint(fields=('model_label', 'object_id', 'day'), name='core_dailyviews_unique'),
+        ),
+    ]
@@ -0,0 +1,190 @@
+# ========== apps/core/models.py ==========
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+from .slugs import allocate_slug
+
+
+class TrackedFieldsMixin:
+    """
+    Mémorise les valeurs de `tracked_fields` telles que chargées depuis la
+    base, pour savoir lors d'un save (ou dans un signal post_save) ce qui a
+    réellement changé sans relire la ligne.
+    """
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            name: value for name, value in zip(field_names, values)
+            if name in cls.tracked_fields
+        }
+        return instance
+
+    def previous_value(self, field):
+        """Valeur chargée depuis la base (None pour une nouvelle instance)"""
+        return getattr(self, '_loaded_values', {}).get(field)
+
+    def has_changed(self, field):
+        loaded = getattr(self, '_loaded_values', {})
+        if field not in loaded:
+            # Nouvelle instance ou champ différé : on ne peut pas savoir
+            return True
+        return loaded[field] != getattr(self, field)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = {name: getattr(self, name) for name in self.tracked_fields}
+
+
+class UniqueSlugMixin:
+    """
+    Slug unique généré depuis `slug_source` s'il est vide. Si une écriture
+    concurrente prend le même slug entre l'allocation et l'INSERT, l'erreur
+    d'intégrité est rattrapée et un nouveau slug alloué.
+    """
+    slug_source = 'name'
+    slug_retries = 3
+
+    def save(self, *args, **kwargs):
+        if self.slug:
+            return super().save(*args, **kwargs)
+        original = self.slug
+        for attempt in range(self.slug_retries):
+            self.slug = allocate_slug(type(self), getattr(self, self.slug_source), instance=self)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                conflict = type(self)._default_manager.filter(slug=self.slug).exclude(pk=self.pk).exists()
+                # Rendre l'instance telle que l'appelant l'a fournie
+                self.slug = original
+                if not conflict or attempt == self.slug_retries - 1:
+                    raise
+
+
+class CounterFieldsMixin:
+    """
+    Colonnes de compteurs maintenues par deltas atomiques (voir
+    apps.core.denorm). Un save complet d'une ligne existante ne les écrit
+    pas : une instance chargée avant un incrément ne l'écrase pas.
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and self.counter_fields:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class ScheduledPublicationMixin:
+    """
+    Publication programmée. Un contenu publié avec une date `published_at`
+    future prend le statut 'scheduled' et reste hors des requêtes publiques
+    (status='published') jusqu'à sa bascule par apps.core.publishing.
+    Publié sans date : publication immédiate. Un retour en brouillon ou aux
+    archives efface la date.
+    """
+
+    def publication_written(self, update_fields=None):
+        """Statut et date de publication sont écrits par ce save (et chargés)"""
+        fields = {'status', 'published_at'}
+        if update_fields is not None and not fields & set(update_fields):
+            return False
+        return not fields & self.get_deferred_fields()
+
+    def refresh_publication_state(self):
+        """Met statut et date de publication en cohérence ; renvoie les champs modifiés"""
+        now = timezone.now()
+        changed = set()
+        if self.status in ('published', 'scheduled'):
+            if self.published_at is None:
+                self.published_at = now
+                changed.add('published_at')
+            status = 'scheduled' if self.published_at > now else 'published'
+            if status != self.status:
+                self.status = status
+                changed.add('status')
+        elif self.published_at is not None:
+            self.published_at = None
+            changed.add('published_at')
+        return changed
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if self.status == 'scheduled':
+            # Nouvelle échéance possible : recalculée une fois la transaction validée
+            from .publishing import forget_next_due
+            transaction.on_commit(forget_next_due)
+
+
+class ViewBucket(models.Model):
+    """Vues d'un contenu pendant une heure (alimenté par view_counter)"""
+    model_label = models.CharField(max_length=100)
+    object_id = models.PositiveBigIntegerField()
+    hour = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Vues horaires'
+        verbose_name_plural = 'Vues horaires'
+        constraints = [
+            models.UniqueConstraint(fields=['model_label', 'object_id', 'hour'], name='core_viewbucket_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['model_label', 'hour'], name='core_viewbucket_hour_idx'),
+        ]
+
+
+class TrendingScore(models.Model):
+    """Classement précalculé des contenus tendance (voir apps.core.trending)"""
+    model_label = models.CharField(max_length=100)
+    object_id = models.PositiveBigIntegerField()
+    rank = models.PositiveIntegerField()
+    score = models.FloatField()
+    computed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['model_label', 'rank']
+        verbose_name = 'Score de tendance'
+        verbose_name_plural = 'Scores de tendance'
+        indexes = [
+            models.Index(fields=['model_label', 'rank'], name='core_trending_rank_idx'),
+        ]
+
+
+class ViewEvent(models.Model):
+    """
+    Flux de vues en ajout seul : une ligne par contenu et par flush de
+    view_counter. Agrégé puis supprimé par apps.core.analytics.rollup.
+    """
+    model_label = models.CharField(max_length=100)
+    object_id = models.PositiveBigIntegerField()
+    views = models.PositiveIntegerField()
+    recorded_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Événement de vue'
+        verbose_name_plural = 'Événements de vue'
+
+
+class DailyViews(models.Model):
+    """Vues d'un contenu par jour (agrégat lu par l'API de statistiques)"""
+    model_label = models.CharField(max_length=100)
+    object_id = models.PositiveBigIntegerField()
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Vues quotidiennes'
+        verbose_name_plural = 'Vues quotidiennes'
+        constraints = [
+            models.UniqueConstraint(fields=['model_label', 'object_id', 'day'], name='core_dailyviews_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['model_label', 'day'], name='core_dailyviews_day_idx'),
+        ]
@@ -1,11 +1,19 @@
-from rest_framework.pagination import PageNumberPagination
+import hashlib
+
+from django.core import signing
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 class CustomPagination(PageNumberPagination):
     page_size = 12
     page_size_query_param = 'page_size'
     max_page_size = 100
-    
+
     def get_paginated_response(self, data):
         return Response({
             'count': self.page.paginator.count,
@@ -15,3 +23,154 @@ class CustomPagination(PageNumberPagination):
             'current_page': self.page.number,
             'results': data
         })
+
+def approximate_count(queryset, timeout=300):
+    """
+    Total approximatif sans COUNT(*) à chaque page : estimation du
+    planificateur sur PostgreSQL, sinon COUNT exact mis en cache.
+    """
+    sql, params = queryset.query.sql_with_params()
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        return int(plan[0]['Plan']['Plan Rows'])
+    key = 'approx-count:' + hashlib.md5(f'{sql}|{params}'.encode()).hexdigest()
+    return cache.get_or_set(key, queryset.count, timeout)
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination par curseur (keyset) sur un tri composite, sans OFFSET ni
+    COUNT(*). Le curseur est opaque et signé : il encode les valeurs de tri
+    de la dernière (ou première) ligne et le sens de parcours.
+
+    Même forme de réponse que CustomPagination ; `count` n'est renseigné
+    (approximativement) qu'avec ?with_count=1.
+    """
+    page_size = 12
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    signing_salt = 'apps.core.pagination.keyset'
+
+    def __init__(self, ordering):
+        # L'id final garantit un ordre total, donc des curseurs stables
+        self.ordering = tuple(ordering) if ordering[-1].lstrip('-') in ('id', 'pk') else tuple(ordering) + ('-id',)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, obj, reverse):
+        values = [getattr(obj, field.lstrip('-')) for field in self.ordering]
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+        return signing.dumps({'v': values, 'r': reverse}, salt=self.signing_salt, compress=True)
+
+    def decode_cursor(self, model, token):
+        try:
+            payload = signing.loads(token, salt=self.signing_salt)
+            fields = [model._meta.get_field(name.lstrip('-')) for name in self.ordering]
+            values = [field.to_python(value) for field, value in zip(fields, payload['v'])]
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            raise NotFound('Curseur invalide.')
+        if len(values) != len(self.ordering):
+            raise NotFound('Curseur invalide.')
+        return values, bool(payload.get('r'))
+
+    def seek_filter(self, values, reverse):
+        """(a, b, c) après/avant le curseur, directions de tri mixtes comprises"""
+        condition = Q()
+        equal = Q()
+        for name, value in zip(self.ordering, values):
+            field = name.lstrip('-')
+            descending = name.startswith('-') != reverse
+            condition |= equal & Q(**{f'{field}__{"lt" if descending else "gt"}': value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        self.base_queryset = queryset
+        reverse = False
+        token = request.query_params.get(self.cursor_query_param)
+        ordering = self.ordering
+        if token:
+            values, reverse = self.decode_cursor(queryset.model, token)
+            queryset = queryset.filter(self.seek_filter(values, reverse))
+        if reverse:
+            ordering = tuple(f[1:] if f.startswith('-') else f'-{f}' for f in ordering)
+
+        rows = list(queryset.order_by(*ordering)[:self.page_size_value + 1])
+        has_more = len(rows) > self.page_size_value
+        rows = rows[:self.page_size_value]
+        if reverse:
+            rows.reverse()
+
+        # En arrière, "il en reste" concerne les pages précédentes
+        self.has_next = bool(token and reverse) or (has_more and not reverse)
+        self.has_previous = (has_more and reverse) or bool(token and not reverse)
+        self.first, self.last = (rows[0], rows[-1]) if rows else (None, None)
+        return rows
+
+    def cursor_link(self, url, obj, reverse=False):
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(obj, reverse))
+
+    def first_page(self, queryset, url):
+        """
+        Première page hors d'une requête paginée (ex. incluse dans une
+        réponse de détail) et lien vers la suite sur `url`.
+        """
+        rows = list(queryset.order_by(*self.ordering)[:self.page_size + 1])
+        if len(rows) <= self.page_size:
+            return rows, None
+        return rows[:self.page_size], self.cursor_link(url, rows[self.page_size - 1])
+
+    def get_next_link(self):
+        if not self.has_next or self.last is None:
+            return None
+        return self.cursor_link(self.request.build_absolute_uri(), self.last)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first is None:
+            return None
+        return self.cursor_link(self.request.build_absolute_uri(), self.first, reverse=True)
+
+    def get_paginated_response(self, data):
+        count = None
+        if self.request.query_params.get('with_count') in ('1', 'true'):
+            count = approximate_count(self.base_queryset)
+        return Response({
+            'count': count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'total_pages': None,
+            'current_page': None,
+            'results': data
+        })
+
+class KeysetPaginationMixin:
+    """
+    Active la pagination par curseur sur une vue de liste quand la requête
+    porte ?pagination=cursor ou un ?cursor=, la pagination par numéro de
+    page restant celle par défaut.
+    """
+    keyset_ordering = None
+
+    def get_keyset_ordering(self):
+        return self.keyset_ordering
+
+    def keyset_requested(self):
+        params = self.request.query_params
+        return params.get('pagination') == 'cursor' or 'cursor' in params
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator') and self.keyset_requested():
+            ordering = self.get_keyset_ordering()
+            if ordering:
+                self._paginator = KeysetPagination(ordering)
+        return super().paginator
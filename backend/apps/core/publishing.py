@@ -0,0 +1,91 @@
+# ========== apps/core/publishing.py ==========
+"""
+Bascule des publications programmées (voir ScheduledPublicationMixin).
+
+La prochaine échéance, tous modèles confondus, est gardée dans le cache :
+ScheduledPublishingMiddleware la compare à l'heure courante à chaque
+requête (une lecture de cache) et ne touche la base qu'une fois
+l'échéance atteinte. Les contenus échus sont alors lus par une requête
+sur l'index (status, published_at) et enregistrés un par un, ce qui
+déclenche les signaux habituels : versions de cache (listes, détails,
+flux et sitemap), index de recherche, articles similaires, statistiques.
+La commande publish_scheduled fait de même hors requêtes.
+
+Chaque contenu est revendiqué en base par un UPDATE conditionnel
+(status 'scheduled' → 'published') avant son save : si plusieurs workers
+atteignent l'échéance en même temps, un seul le publie et les signaux ne
+sont émis qu'une fois, sans verrou partagé entre processus.
+"""
+import logging
+import math
+import time
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SCHEDULED_MODELS = ('blog.BlogPost', 'portfolio.Project')
+NEXT_DUE_KEY = 'publishing:next-due'
+# Filet de sécurité : l'échéance mémorisée est relue périodiquement
+NEXT_DUE_TIMEOUT = 300
+NOTHING_DUE = math.inf
+
+
+def scheduled_models():
+    return [apps.get_model(label) for label in SCHEDULED_MODELS]
+
+
+def forget_next_due():
+    cache.delete(NEXT_DUE_KEY)
+
+
+def next_due():
+    """Timestamp de la prochaine publication programmée (inf si aucune)"""
+    due = cache.get(NEXT_DUE_KEY)
+    if due is None:
+        dates = [
+            model._base_manager.filter(status='scheduled').aggregate(next=Min('published_at'))['next']
+            for model in scheduled_models()
+        ]
+        due = min((date.timestamp() for date in dates if date is not None), default=NOTHING_DUE)
+        cache.set(NEXT_DUE_KEY, due, NEXT_DUE_TIMEOUT)
+    return due
+
+
+def publish(model, obj):
+    """
+    Publie un contenu chargé 'scheduled' ; False s'il a été publié
+    entre-temps par un autre worker
+    """
+    with transaction.atomic():
+        claimed = model._base_manager.filter(pk=obj.pk, status='scheduled').update(status='published')
+        if not claimed:
+            return False
+        # `obj` a été chargé 'scheduled' : les signaux voient la transition
+        obj.status = 'published'
+        obj.save(update_fields=['status', 'updated_at'])
+    return True
+
+
+def publish_due():
+    """Publie les contenus dont l'échéance est passée ; retourne leur nombre"""
+    published = 0
+    now = timezone.now()
+    for model in scheduled_models():
+        due = model._base_manager.filter(status='scheduled', published_at__lte=now).order_by('published_at')
+        published += sum(publish(model, obj) for obj in due)
+    forget_next_due()
+    if published:
+        logger.info("%d publication(s) programmée(s) mise(s) en ligne", published)
+    return published
+
+
+def publish_if_due():
+    """Publie les contenus échus si la prochaine échéance est atteinte"""
+    if time.time() < next_due():
+        return 0
+    return publish_due()
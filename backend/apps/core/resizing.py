@@ -0,0 +1,224 @@
+# ========== apps/core/resizing.py ==========
+"""
+Redimensionnement des médias à la demande.
+
+/media/resize/<l>x<h>/<chemin>?s=<signature> renvoie l'image du stockage
+réduite pour tenir dans l×h (0 : dimension libre, jamais d'agrandissement),
+en WebP. Seules les URL produites par `resized_url` (signées avec
+SECRET_KEY) sont servies : un tiers ne peut pas faire calculer des
+tailles arbitraires.
+
+Les dérivés sont conservés dans un cache disque (MEDIA_RESIZE_CACHE_DIR)
+borné à MEDIA_RESIZE_CACHE_MAX_BYTES : la date de modification d'un
+fichier sert d'horloge LRU (rafraîchie à chaque lecture), et les plus
+anciens sont évincés quand le total estimé dépasse la borne. Les requêtes
+simultanées pour un même dérivé attendent un seul redimensionnement ; la
+clé inclut la date de l'original, qui reste ainsi la référence.
+
+Les noms téléversés étant uniques (storage.get_available_name), une URL
+désigne un contenu fixe : la réponse est mise en cache un an (immutable).
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_safe
+from PIL import Image, ImageOps
+
+from .images import flatten
+
+logger = logging.getLogger(__name__)
+
+signer = signing.Signer(salt='apps.core.resizing')
+WEBP_QUALITY = 85
+MAX_AGE = 365 * 24 * 3600
+# Après éviction, le cache redescend à cette fraction de la borne
+LOW_WATER = 0.9
+
+_key_locks = {}
+_key_locks_guard = threading.Lock()
+_size_guard = threading.Lock()
+_stats_guard = threading.Lock()
+_cache_bytes = None
+_stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'evictions': 0}
+
+
+def _setting(name, default):
+    return getattr(settings, f'MEDIA_RESIZE_{name}', default)
+
+
+def cache_dir():
+    return _setting('CACHE_DIR', os.path.join(settings.BASE_DIR, 'media_cache'))
+
+
+def max_dimension():
+    return _setting('MAX_DIMENSION', 2400)
+
+
+def resized_url(name, width, height=0):
+    """URL signée du dérivé `width`×`height` du fichier `name` (0 : libre)"""
+    if not name:
+        return None
+    spec = f'{width}x{height}'
+    url = reverse('media-resize', kwargs={'spec': spec, 'path': name})
+    return f'{url}?s={signer.signature(f"{spec}/{name}")}'
+
+
+def stats():
+    with _stats_guard:
+        return dict(_stats, bytes=_cache_bytes)
+
+
+def _count(name, delta=1):
+    with _stats_guard:
+        _stats[name] += delta
+
+
+@contextmanager
+def _coalesced(key):
+    """Verrou propre à un dérivé : un seul thread le calcule, les autres attendent"""
+    with _key_locks_guard:
+        entry = _key_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _key_locks_guard:
+            entry[1] -= 1
+            if not entry[1]:
+                del _key_locks[key]
+
+
+def _cached_files():
+    root = cache_dir()
+    for directory, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            yield stat.st_mtime, stat.st_size, path
+
+
+def _account(delta):
+    """
+    Ajoute `delta` octets au total estimé et évince les dérivés les moins
+    récemment lus au-delà de la borne. Le total est recalculé depuis le
+    disque au premier appel et à chaque éviction (autres processus inclus).
+    """
+    global _cache_bytes
+    limit = _setting('CACHE_MAX_BYTES', 256 * 1024 * 1024)
+    with _size_guard:
+        if _cache_bytes is None:
+            _cache_bytes = sum(size for _, size, _ in _cached_files())
+        else:
+            _cache_bytes += delta
+        if _cache_bytes <= limit:
+            return
+        files = sorted(_cached_files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= limit * LOW_WATER:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            _count('evictions')
+        _cache_bytes = total
+
+
+def _render(name, width, height):
+    with default_storage.open(name, 'rb') as source:
+        image = flatten(Image.open(source))
+    bounds = (width or image.width, height or image.height)
+    if image.width > bounds[0] or image.height > bounds[1]:
+        image = ImageOps.contain(image, bounds, Image.Resampling.LANCZOS)
+    return image
+
+
+def cache_entry(name, width, height):
+    """Clé et fichier du cache disque ; la date de l'original fait partie de la clé"""
+    modified = default_storage.get_modified_time(name).timestamp()
+    key = hashlib.sha256(f'{width}x{height}/{name}/{modified}'.encode()).hexdigest()
+    return key, os.path.join(cache_dir(), key[:2], f'{key}.webp')
+
+
+def open_variant(name, width, height):
+    """
+    Fichier ouvert du dérivé, rendu au premier appel. Le fichier est ouvert
+    avant de rendre la main : une éviction concurrente peut le supprimer du
+    disque sans invalider la lecture en cours.
+    """
+    key, path = cache_entry(name, width, height)
+    try:
+        handle = open(path, 'rb')
+    except FileNotFoundError:
+        pass
+    else:
+        _count('hits')
+        os.utime(handle.fileno())
+        return handle
+
+    with _coalesced(key):
+        try:
+            handle = open(path, 'rb')
+        except FileNotFoundError:
+            pass
+        else:
+            # Calculé par une requête concurrente pendant l'attente
+            _count('coalesced')
+            return handle
+        _count('misses')
+        image = _render(name, width, height)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Écriture dans un fichier temporaire puis renommage atomique : un
+        # lecteur (ou un autre processus) ne voit jamais de fichier partiel
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as output:
+                image.save(output, 'WEBP', quality=WEBP_QUALITY, method=4)
+            handle = open(temporary, 'rb')
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+    _account(os.fstat(handle.fileno()).st_size)
+    return handle
+
+
+@require_safe
+def resize(request, spec, path):
+    """Dérivé redimensionné d'un média, servi depuis le cache disque"""
+    try:
+        width, height = (int(value) for value in spec.split('x'))
+    except ValueError:
+        raise Http404
+    if not constant_time_compare(signer.signature(f'{spec}/{path}'), request.GET.get('s', '')):
+        raise Http404
+    if not (0 <= width <= max_dimension() and 0 <= height <= max_dimension()) or not (width or height):
+        raise Http404
+    try:
+        cached = open_variant(path, width, height)
+    except (FileNotFoundError, SuspiciousFileOperation):
+        raise Http404
+    except (OSError, Image.DecompressionBombError):
+        logger.warning("Redimensionnement impossible pour %s", path, exc_info=True)
+        raise Http404
+    response = FileResponse(cached, content_type='image/webp')
+    patch_cache_control(response, public=True, max_age=MAX_AGE, immutable=True)
+    return response
@@ -0,0 +1,186 @@
+# ========== apps/core/response_cache.py ==========
+"""
+Cache des réponses des endpoints publics en lecture.
+
+La réponse JSON est rendue une fois, stockée en octets (et précompressée en
+gzip si RESPONSE_CACHE_GZIP), sous une clé dérivée du chemin, de la query
+string normalisée et des versions des espaces de noms de apps.core.cache.
+Les signaux de chaque app incrémentent ces versions, ce qui invalide
+exactement les réponses concernées.
+
+Les requêtes porteuses d'identifiants (en-tête Authorization ou cookie de
+session) contournent le cache : un éditeur voit toujours la base.
+
+Le cache doit être partagé par tous les workers (Redis, voir CACHES) : sur
+LocMemCache, bump_version n'atteint que le processus courant et les autres
+servent des réponses périmées jusqu'à RESPONSE_CACHE_TIMEOUT. Le check
+core.E001 (apps.core.checks) refuse cette configuration dès que
+WEB_CONCURRENCY dépasse 1.
+"""
+import gzip
+import hashlib
+from functools import wraps
+from urllib.parse import parse_qsl, urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .cache import get_version
+
+STATS_PREFIX = 'response-cache:stats'
+STATS_KEYS = ('hits', 'misses', 'bypass', 'stores')
+SIZE_PREFIX = 'response-cache:size'
+MIN_GZIP_SIZE = 1024
+
+# Espaces de noms fixes des vues décorées (volume rapporté par stats())
+_namespaces = set()
+
+
+def _incr(name, delta=1):
+    key = f'{STATS_PREFIX}:{name}'
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key, delta)
+
+
+def _timeout():
+    return getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 3600)
+
+
+def _size_key(namespace, field):
+    return f'{SIZE_PREFIX}:{namespace}:{get_version(namespace)}:{field}'
+
+
+def _record_size(namespaces, size):
+    """
+    Entrées et octets écrits sous la version courante de chaque espace de
+    noms ; les compteurs d'une version invalidée expirent avec ses entrées
+    """
+    for namespace in namespaces:
+        for field, delta in (('entries', 1), ('bytes', size)):
+            key = _size_key(namespace, field)
+            if cache.add(key, delta, _timeout()):
+                continue
+            try:
+                cache.incr(key, delta)
+                cache.touch(key, _timeout())
+            except ValueError:
+                cache.add(key, delta, _timeout())
+
+
+def stats():
+    """
+    Compteurs globaux (hits, misses, bypass, réponses écrites) et volume par
+    espace de noms : entrées et octets écrits depuis la dernière
+    invalidation. Les évictions du backend ne sont pas décomptées : c'est
+    un majorant du volume vivant.
+    """
+    values = cache.get_many([f'{STATS_PREFIX}:{name}' for name in STATS_KEYS])
+    data = {name: values.get(f'{STATS_PREFIX}:{name}', 0) for name in STATS_KEYS}
+    keys = {
+        (namespace, field): _size_key(namespace, field)
+        for namespace in sorted(_namespaces) for field in ('entries', 'bytes')
+    }
+    sizes = cache.get_many(list(keys.values()))
+    data['size'] = {
+        namespace: {field: sizes.get(keys[(namespace, field)], 0) for field in ('entries', 'bytes')}
+        for namespace in sorted(_namespaces)
+    }
+    return data
+
+
+def reset_stats():
+    cache.delete_many([f'{STATS_PREFIX}:{name}' for name in STATS_KEYS])
+
+
+def normalized_query_string(request):
+    params = sorted((k, v) for k, v in parse_qsl(request.META.get('QUERY_STRING', '')) if v != '')
+    return urlencode(params)
+
+
+def is_editor_request(request):
+    return 'HTTP_AUTHORIZATION' in request.META or settings.SESSION_COOKIE_NAME in request.COOKIES
+
+
+def build_key(request, namespaces):
+    versions = ','.join(f'{ns}={get_version(ns)}' for ns in namespaces)
+    raw = f'{versions}|{request.path}?{normalized_query_string(request)}'
+    return 'response-cache:' + hashlib.md5(raw.encode()).hexdigest()
+
+
+def _from_entry(request, entry):
+    accepts_gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+    if entry.get('gzip') and accepts_gzip:
+        response = HttpResponse(entry['gzip'], status=entry['status'], content_type=entry['content_type'])
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(entry['body'], status=entry['status'], content_type=entry['content_type'])
+    response['Content-Length'] = len(response.content)
+    return response
+
+
+def _to_entry(response):
+    body = response.content
+    data = getattr(response, 'data', None)
+    entry = {
+        'status': response.status_code,
+        'content_type': response['Content-Type'],
+        'body': body,
+        'gzip': None,
+        # Identifiant de l'objet d'une réponse de détail (pour on_hit)
+        'object_pk': data.get('id') if isinstance(data, dict) else None,
+    }
+    if getattr(settings, 'RESPONSE_CACHE_GZIP', True) and len(body) >= MIN_GZIP_SIZE:
+        entry['gzip'] = gzip.compress(body, compresslevel=6)
+    return entry
+
+
+def cache_response(*namespaces, on_hit=None):
+    """
+    Décorateur de vue (fonction DRF ou `dispatch` via method_decorator).
+
+    `namespaces` peut contenir des gabarits formatés avec les kwargs de
+    l'URL, ex. 'blog.post:{slug}'. `on_hit(request, entry)` est appelé
+    quand la réponse est servie depuis le cache (ex. compter une vue).
+    """
+    static = [namespace for namespace in namespaces if '{' not in namespace]
+    _namespaces.update(static)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            if is_editor_request(request):
+                _incr('bypass')
+                response = view(request, *args, **kwargs)
+                response['X-Cache'] = 'BYPASS'
+                return response
+
+            key = build_key(request, [ns.format(**kwargs) for ns in namespaces])
+            entry = cache.get(key)
+            if entry is not None:
+                _incr('hits')
+                if on_hit:
+                    on_hit(request, entry)
+                response = _from_entry(request, entry)
+                response['X-Cache'] = 'HIT'
+            else:
+                _incr('misses')
+                response = view(request, *args, **kwargs)
+                if hasattr(response, 'render'):
+                    response.render()
+                if response.status_code == 200:
+                    entry = _to_entry(response)
+                    cache.set(key, entry, _timeout())
+                    _incr('stores')
+                    _record_size(static, len(entry['body']) + len(entry['gzip'] or b''))
+                response['X-Cache'] = 'MISS'
+            patch_vary_headers(response, ('Accept-Encoding', 'Authorization', 'Cookie'))
+            return response
+        return wrapped
+    return decorator
@@ -0,0 +1,67 @@
+# ========== apps/core/serializers.py ==========
+"""
+Fieldsets clairsemés pour les serializers de lecture.
+
+`?fields=title,slug` restreint la réponse aux champs listés ; `?expand=`
+choisit les relations imbriquées (Meta.expandable) à rendre. Sans
+`?fields=`, tous les champs simples sont rendus ; sans `?expand=`, les
+relations le sont si elles figurent dans `?fields=` (ou toutes celles
+déclarées, en l'absence des deux paramètres : comportement historique).
+
+La sélection est calculée depuis la seule classe et la query string, ce
+qui permet aux vues d'élaguer le queryset (select_related, prefetch,
+annotations) avant de l'exécuter : une relation que le serializer ne
+déclare pas n'est jamais chargée.
+"""
+from rest_framework import serializers
+
+from .resizing import resized_url
+
+
+def parse_field_list(value):
+    return {name.strip() for name in value.split(',') if name.strip()} if value is not None else None
+
+
+def selected_fields(serializer_class, query_params):
+    """Champs à rendre pour cette requête, parmi ceux déclarés par le serializer"""
+    declared = serializer_class.Meta.fields
+    fields = parse_field_list(query_params.get('fields'))
+    expand = parse_field_list(query_params.get('expand'))
+    if fields is None and expand is None:
+        return set(declared)
+
+    expandable = set(getattr(serializer_class.Meta, 'expandable', ()))
+    relations = (fields or set()) | (expand or set())
+    return {
+        name for name in declared
+        if (name in relations if name in expandable else fields is None or name in fields)
+    }
+
+
+class SparseFieldsetMixin:
+    """Retire du serializer les champs non demandés par ?fields= / ?expand="""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return
+        keep = selected_fields(type(self), request.query_params)
+        for name in set(self.fields) - keep:
+            self.fields.pop(name)
+
+
+class ResizedImageField(serializers.ReadOnlyField):
+    """
+    URL signée d'une version réduite d'une image (apps.core.resizing),
+    absolue quand la requête est dans le contexte
+    """
+
+    def __init__(self, width, height=0, **kwargs):
+        self.width, self.height = width, height
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        url = resized_url(value.name if value else None, self.width, self.height)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if url and request is not None else url
@@ -0,0 +1,72 @@
+# ========== apps/core/slugs.py ==========
+"""
+Allocation de slugs uniques.
+
+Tous les slugs existants commençant par le slug de base sont lus en une
+seule requête préfixe ; le premier suffixe libre (`base`, `base-1`,
+`base-2`, ...) est choisi en mémoire. Le mode groupé (`assign_slugs`) fait
+de même pour des milliers de nouvelles lignes avant un bulk_create.
+"""
+from django.db.models import Q
+from django.utils.text import slugify
+
+# Place réservée au suffixe numérique dans la longueur maximale du champ
+SUFFIX_ROOM = 6
+PREFIX_BATCH_SIZE = 200
+
+
+def base_slug(model, source, field='slug'):
+    max_length = model._meta.get_field(field).max_length
+    return slugify(source)[:max_length - SUFFIX_ROOM].strip('-') or model._meta.model_name
+
+
+def next_free(base, taken, start=1):
+    if base not in taken:
+        return base
+    counter = start
+    while f'{base}-{counter}' in taken:
+        counter += 1
+    return f'{base}-{counter}'
+
+
+def taken_slugs(model, bases, field='slug', exclude_pk=None):
+    """Slugs existants commençant par l'une des bases (une requête par lot de bases)"""
+    bases = sorted(set(bases))
+    taken = set()
+    for start in range(0, len(bases), PREFIX_BATCH_SIZE):
+        condition = Q()
+        for base in bases[start:start + PREFIX_BATCH_SIZE]:
+            condition |= Q(**{f'{field}__startswith': base})
+        queryset = model._default_manager.filter(condition)
+        if exclude_pk is not None:
+            queryset = queryset.exclude(pk=exclude_pk)
+        taken.update(queryset.values_list(field, flat=True))
+    return taken
+
+
+def allocate_slug(model, source, field='slug', instance=None):
+    base = base_slug(model, source, field)
+    exclude_pk = instance.pk if instance is not None else None
+    return next_free(base, taken_slugs(model, [base], field, exclude_pk))
+
+
+def assign_slugs(objs, source, field='slug'):
+    """
+    Mode groupé : renseigne le slug des objets (non sauvegardés) qui n'en
+    ont pas, sans collision entre eux ni avec la base.
+    """
+    pending = [obj for obj in objs if not getattr(obj, field)]
+    if not pending:
+        return objs
+    model = type(pending[0])
+    bases = [base_slug(model, getattr(obj, source), field) for obj in pending]
+    taken = taken_slugs(model, bases, field)
+    # Dernier suffixe attribué par base : évite de reparcourir les suffixes
+    counters = {}
+    for obj, base in zip(pending, bases):
+        slug = next_free(base, taken, counters.get(base, 1))
+        if slug != base:
+            counters[base] = int(slug.rsplit('-', 1)[1]) + 1
+        taken.add(slug)
+        setattr(obj, field, slug)
+    return objs
@@ -0,0 +1,204 @@
+# ========== apps/core/syndication.py ==========
+"""
+sitemap.xml et flux RSS/Atom des articles et des projets.
+
+Le sitemap est produit en flux (StreamingHttpResponse) depuis des requêtes
+`values_list(...).iterator()` : seuls slug et date de modification sont lus,
+par paquets, sans charger toutes les lignes. Au-delà de SITEMAP_MAX_URLS
+adresses (50 000, limite du protocole), /sitemap.xml devient un index de
+fichiers /sitemap-<section>-<page>.xml.
+
+Les réponses portent Last-Modified (dernier `updated_at` publié) et un ETag
+dérivé des versions de cache : une revalidation coûte une requête
+d'agrégat, sans sérialisation.
+"""
+from itertools import chain
+from math import ceil
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Max
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import feedgenerator
+from django.utils.cache import patch_cache_control
+
+from apps.blog.models import BlogPost
+from apps.portfolio.models import Project
+
+from .conditional import conditional_get
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+CHUNK_SIZE = 2000
+FEED_ITEMS = 50
+STATIC_PAGES = ('/', '/about', '/projects', '/blog', '/contact')
+FEED_TYPES = {'rss': feedgenerator.Rss201rev2Feed, 'atom': feedgenerator.Atom1Feed}
+
+
+def max_urls():
+    return getattr(settings, 'SITEMAP_MAX_URLS', 50000)
+
+
+def frontend_url(path):
+    return settings.FRONTEND_URL.rstrip('/') + path
+
+
+def sections():
+    """Section du sitemap -> (queryset publié, chemin côté frontend)"""
+    return {
+        'posts': (BlogPost.objects.published(), '/blog/{slug}'),
+        'projects': (Project.objects.published(), '/projects/{slug}'),
+    }
+
+
+def newest_update(*querysets):
+    """Dernière modification ou publication (une publication programmée peut dater de l'avenir du save)"""
+    dates = []
+    for qs in querysets:
+        dates.extend(qs.aggregate(updated=Max('updated_at'), published=Max('published_at')).values())
+    dates = [date for date in dates if date is not None]
+    return max(dates) if dates else None
+
+
+def posts_last_modified(request, *args, **kwargs):
+    return newest_update(BlogPost.objects.published())
+
+
+def projects_last_modified(request, *args, **kwargs):
+    return newest_update(Project.objects.published())
+
+
+def content_last_modified(request, *args, **kwargs):
+    return newest_update(*[queryset for queryset, path in sections().values()])
+
+
+def url_entry(loc, lastmod=None):
+    lastmod = f'<lastmod>{lastmod.date().isoformat()}</lastmod>' if lastmod else ''
+    return f'<url><loc>{escape(loc)}</loc>{lastmod}</url>\n'
+
+
+def section_entries(queryset, path, start=None, stop=None):
+    rows = queryset.order_by('pk').values_list('slug', 'updated_at')
+    if start is not None:
+        rows = rows[start:stop]
+    for slug, updated_at in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield url_entry(frontend_url(path.format(slug=slug)), updated_at)
+
+
+def static_entries():
+    return (url_entry(frontend_url(path)) for path in STATIC_PAGES)
+
+
+def xml_stream(root, entries):
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<{root} xmlns="{SITEMAP_NS}">\n'
+    yield from entries
+    yield f'</{root}>\n'
+
+
+def xml_response(root, entries):
+    response = StreamingHttpResponse(xml_stream(root, entries), content_type='application/xml; charset=utf-8')
+    patch_cache_control(response, public=True, max_age=3600)
+    return response
+
+
+@conditional_get('blog.posts', 'portfolio.projects', last_modified=content_last_modified)
+def sitemap(request):
+    """Sitemap complet, ou index des fichiers au-delà de SITEMAP_MAX_URLS adresses"""
+    counts = {name: queryset.count() for name, (queryset, path) in sections().items()}
+    if sum(counts.values()) + len(STATIC_PAGES) <= max_urls():
+        entries = chain(static_entries(), *[
+            section_entries(queryset, path) for queryset, path in sections().values()
+        ])
+        return xml_response('urlset', entries)
+
+    def index_entries():
+        yield sitemap_entry(request, 'pages', 1)
+        for name, (queryset, path) in sections().items():
+            lastmod = newest_update(queryset)
+            for page in range(1, ceil(counts[name] / max_urls()) + 1):
+                yield sitemap_entry(request, name, page, lastmod)
+    return xml_response('sitemapindex', index_entries())
+
+
+def sitemap_entry(request, section, page, lastmod=None):
+    loc = request.build_absolute_uri(reverse('sitemap-section', kwargs={'section': section, 'page': page}))
+    lastmod = f'<lastmod>{lastmod.isoformat()}</lastmod>' if lastmod else ''
+    return f'<sitemap><loc>{escape(loc)}</loc>{lastmod}</sitemap>\n'
+
+
+@conditional_get('blog.posts', 'portfolio.projects', last_modified=content_last_modified)
+def sitemap_section(request, section, page):
+    """Une page (au plus SITEMAP_MAX_URLS adresses) d'une section du sitemap"""
+    if section == 'pages' and page == 1:
+        return xml_response('urlset', static_entries())
+    if section not in sections() or page < 1:
+        raise Http404
+    queryset, path = sections()[section]
+    start = (page - 1) * max_urls()
+    if page > 1 and not queryset.order_by('pk')[start:start + 1].exists():
+        raise Http404
+    return xml_response('urlset', section_entries(queryset, path, start, start + max_urls()))
+
+
+def feed_response(request, kind, title, link, description, items):
+    if kind not in FEED_TYPES:
+        raise Http404
+    feed = FEED_TYPES[kind](
+        title=title, link=link, description=description, language='fr',
+        feed_url=request.build_absolute_uri(),
+    )
+    for item in items:
+        feed.add_item(**item)
+    response = HttpResponse(content_type=feed.content_type)
+    feed.write(response, 'utf-8')
+    patch_cache_control(response, public=True, max_age=3600)
+    return response
+
+
+@conditional_get('blog.posts', last_modified=posts_last_modified)
+def posts_feed(request, kind):
+    """Derniers articles publiés (RSS 2.0 ou Atom)"""
+    posts = BlogPost.objects.published().select_related('author').prefetch_related('tags').only(
+        'title', 'slug', 'excerpt', 'published_at', 'updated_at', 'author__username'
+    ).order_by('-published_at')[:FEED_ITEMS]
+    items = (
+        {
+            'title': post.title,
+            'link': frontend_url(f'/blog/{post.slug}'),
+            'unique_id': frontend_url(f'/blog/{post.slug}'),
+            'description': post.excerpt,
+            'author_name': post.author.username,
+            'pubdate': post.published_at,
+            'updateddate': post.updated_at,
+            'categories': [tag.name for tag in post.tags.all()],
+        }
+        for post in posts
+    )
+    return feed_response(
+        request, kind, f'{settings.SITE_NAME} - Blog', frontend_url('/blog'),
+        'Derniers articles du blog', items,
+    )
+
+
+@conditional_get('portfolio.projects', last_modified=projects_last_modified)
+def projects_feed(request, kind):
+    """Derniers projets publiés (RSS 2.0 ou Atom)"""
+    projects = Project.objects.published().prefetch_related('technologies').only(
+        'title', 'slug', 'description', 'published_at', 'updated_at'
+    ).order_by('-published_at')[:FEED_ITEMS]
+    items = (
+        {
+            'title': project.title,
+            'link': frontend_url(f'/projects/{project.slug}'),
+            'unique_id': frontend_url(f'/projects/{project.slug}'),
+            'description': project.description,
+            'pubdate': project.published_at,
+            'updateddate': project.updated_at,
+            'categories': [technology.name for technology in project.technologies.all()],
+        }
+        for project in projects
+    )
+    return feed_response(
+        request, kind, f'{settings.SITE_NAME} - Projets', frontend_url('/projects'),
+        'Derniers projets du portfolio', items,
+    )
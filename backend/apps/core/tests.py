@@ -1,5 +1,32 @@
-from django.test import TestCase, Client
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.feedgenerator import rfc2822_date
+from PIL import Image
+
+from apps.blog.models import BlogPost, BlogStats, Tag
+from apps.portfolio.models import Project
+
+from . import analytics, publishing, resizing, trending
+from .checks import shared_cache_check
+from .counters import view_counter
+from .models import DailyViews, ViewBucket, ViewEvent
+from .slugs import assign_slugs
 
 class HealthCheckTests(TestCase):
     def setUp(self):
@@ -16,3 +43,446 @@ class HealthCheckTests(TestCase):
         response = self.client.get(reverse('api-root'))
         self.assertEqual(response.status_code, 200)
         self.assertIn('endpoints', response.json())
+
+
+class SlugAllocationTests(TestCase):
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(username='slugs', password='secret-pass')
+
+    def create_project(self, title):
+        return Project.objects.create(title=title, description='Projet de test.', owner=self.owner)
+
+    def test_duplicate_titles_get_suffixes_with_one_lookup_each(self):
+        self.assertEqual(self.create_project('Même titre').slug, 'meme-titre')
+        with CaptureQueriesContext(connection) as queries:
+            project = self.create_project('Même titre')
+        self.assertEqual(project.slug, 'meme-titre-1')
+        self.assertEqual(sum('LIKE' in query['sql'] for query in queries), 1)
+        self.assertEqual(self.create_project('Même titre !').slug, 'meme-titre-2')
+
+    def test_integrity_race_retries_with_a_new_slug(self):
+        Tag.objects.create(name='Course', slug='course')
+        with mock.patch('apps.core.models.allocate_slug', side_effect=['course', 'course-1']):
+            tag = Tag.objects.create(name='Course bis')
+        self.assertEqual(tag.slug, 'course-1')
+
+    def test_exhausted_retries_restore_the_callers_slug(self):
+        Tag.objects.create(name='Course', slug='course')
+        tag = Tag(name='Course ter', slug=None)
+        with mock.patch('apps.core.models.allocate_slug', return_value='course'):
+            with self.assertRaises(IntegrityError):
+                tag.save()
+        self.assertIsNone(tag.slug)
+
+    def test_bulk_mode_allocates_thousands_in_few_queries(self):
+        self.create_project('Import')
+        self.create_project('Import 3')
+        projects = [Project(title='Import', description='Projet importé.', owner=self.owner) for _ in range(2000)]
+        with CaptureQueriesContext(connection) as queries:
+            assign_slugs(projects, 'title')
+        self.assertEqual(len(queries), 1)
+        slugs = [project.slug for project in projects]
+        self.assertEqual(slugs[:3], ['import-1', 'import-2', 'import-4'])
+        self.assertEqual(len(set(slugs) | {'import', 'import-3'}), 2002)
+        Project.objects.bulk_create(projects)
+
+
+class SyndicationTests(TestCase):
+    def setUp(self):
+        self.author = get_user_model().objects.create_user(username='syndication', password='secret-pass')
+        self.post = BlogPost.objects.create(
+            title='Article syndiqué', excerpt='Résumé.', content='Contenu.',
+            author=self.author, status='published',
+        )
+        BlogPost.objects.create(title='Brouillon caché', content='Brouillon.', author=self.author)
+        self.project = Project.objects.create(
+            title='Projet syndiqué', description='Projet publié.', owner=self.author, status='published',
+        )
+
+    def get_xml(self, path, **headers):
+        response = self.client.get(path, **headers)
+        body = b''.join(response.streaming_content).decode() if response.streaming else response.content.decode()
+        return response, body
+
+    def test_sitemap_streams_published_urls_with_last_modified(self):
+        response, body = self.get_xml('/sitemap.xml')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('<urlset', body)
+        self.assertIn(f'/blog/{self.post.slug}</loc><lastmod>', body)
+        self.assertIn(f'/projects/{self.project.slug}</loc>', body)
+        self.assertNotIn('brouillon-cache', body)
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get('/sitemap.xml', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(SITEMAP_MAX_URLS=1)
+    def test_sitemap_becomes_an_index_past_the_url_limit(self):
+        response, body = self.get_xml('/sitemap.xml')
+        self.assertIn('<sitemapindex', body)
+        self.assertIn('/sitemap-posts-1.xml', body)
+        self.assertIn('/sitemap-projects-1.xml', body)
+
+        response, body = self.get_xml('/sitemap-posts-1.xml')
+        self.assertEqual(body.count('<url>'), 1)
+        self.assertEqual(self.client.get('/sitemap-posts-2.xml').status_code, 404)
+        self.assertEqual(self.client.get('/sitemap-unknown-1.xml').status_code, 404)
+
+    def test_feeds_list_latest_published_items(self):
+        response = self.client.get('/feeds/posts.rss')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('application/rss+xml'))
+        self.assertContains(response, 'Article syndiqué')
+        self.assertNotContains(response, 'Brouillon caché')
+
+        response = self.client.get('/feeds/projects.atom')
+        self.assertTrue(response['Content-Type'].startswith('application/atom+xml'))
+        self.assertContains(response, 'Projet syndiqué')
+        self.assertEqual(self.client.get('/feeds/posts.json').status_code, 404)
+
+
+class ScheduledPublishingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = get_user_model().objects.create_user(username='planning', password='secret-pass')
+
+    def schedule(self, delay=timedelta(minutes=1)):
+        publish_at = timezone.now() + delay
+        with self.captureOnCommitCallbacks(execute=True):
+            post = BlogPost.objects.create(
+                title='Article programmé', content='Bientôt.', author=self.author,
+                status='published', published_at=publish_at,
+            )
+            project = Project.objects.create(
+                title='Projet programmé', description='Bientôt.', owner=self.author,
+                status='published', published_at=publish_at,
+            )
+        return post, project
+
+    def listed_slugs(self, url):
+        return [item['slug'] for item in self.client.get(url).json()['results']]
+
+    def test_future_date_keeps_items_hidden(self):
+        post, project = self.schedule()
+        self.assertEqual((post.status, project.status), ('scheduled', 'scheduled'))
+        self.assertNotIn(post.slug, self.listed_slugs('/api/blog/posts/'))
+        self.assertNotIn(project.slug, self.listed_slugs('/api/portfolio/projects/'))
+        self.assertEqual(self.client.get(f'/api/blog/posts/{post.slug}/').status_code, 404)
+
+        # Tant que l'échéance n'est pas atteinte, une lecture de cache suffit
+        with self.assertNumQueries(0):
+            self.assertEqual(publishing.publish_if_due(), 0)
+
+    def test_a_due_item_is_published_by_one_worker_only(self):
+        post, project = self.schedule()
+        later = timezone.now() + timedelta(minutes=2)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            # Chargé 'scheduled' par un second worker avant la publication
+            stale = BlogPost._base_manager.get(pk=post.pk)
+            self.assertEqual(publishing.publish_due(), 2)
+            self.assertFalse(publishing.publish(BlogPost, stale))
+        self.assertEqual(BlogStats.objects.get().total_posts, 1)
+
+    def test_first_request_after_the_due_time_publishes_and_invalidates(self):
+        post, project = self.schedule()
+        self.assertNotIn(post.slug, self.listed_slugs('/api/blog/posts/'))
+
+        later = timezone.now() + timedelta(minutes=2)
+        with mock.patch('django.utils.timezone.now', return_value=later), \
+                mock.patch('time.time', return_value=later.timestamp()):
+            self.assertIn(post.slug, self.listed_slugs('/api/blog/posts/'))
+            self.assertIn(project.slug, self.listed_slugs('/api/portfolio/projects/'))
+            self.assertIn('Article programmé', self.client.get('/feeds/posts.rss').content.decode())
+
+        post.refresh_from_db()
+        self.assertEqual(post.status, 'published')
+        self.assertEqual(publishing.next_due(), publishing.NOTHING_DUE)
+
+    def test_projects_feed_dates_projects_by_publication(self):
+        post, project = self.schedule()
+        later = timezone.now() + timedelta(minutes=2)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            # Créé après le projet programmé, publié avant lui
+            Project.objects.create(
+                title='Projet immédiat', description='Déjà là.', owner=self.author, status='published',
+                published_at=later - timedelta(seconds=90),
+            )
+            publishing.publish_due()
+            feed = self.client.get('/feeds/projects.rss').content.decode()
+        project.refresh_from_db()
+        self.assertLess(feed.index('Projet programmé'), feed.index('Projet immédiat'))
+        self.assertIn(f'<pubDate>{rfc2822_date(project.published_at)}</pubDate>', feed)
+
+    def test_update_fields_saves_leave_publication_alone(self):
+        post, project = self.schedule()
+        # Échéance passée, mais un save limité au titre ne publie rien
+        Project.objects.filter(pk=project.pk).update(published_at=timezone.now() - timedelta(minutes=1))
+        project.refresh_from_db()
+        project.title = 'Projet renommé'
+        project.save(update_fields=['title'])
+        project.refresh_from_db()
+        self.assertEqual(project.status, 'scheduled')
+
+    def test_back_to_draft_clears_the_schedule(self):
+        post, project = self.schedule()
+        post.status = 'draft'
+        post.save()
+        self.assertIsNone(post.published_at)
+
+
+class TrendingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        view_counter.flush()
+        self.addCleanup(view_counter.flush)
+        self.author = get_user_model().objects.create_user(username='tendance', password='secret-pass')
+        self.old, self.fresh = [
+            BlogPost.objects.create(title=title, content='Contenu.', author=self.author, status='published')
+            for title in ('Ancien succès', 'Nouveauté')
+        ]
+
+    def add_views(self, post, hours_ago, views):
+        ViewBucket.objects.create(
+            model_label='blog.BlogPost', object_id=post.pk, views=views,
+            hour=trending.current_hour() - timedelta(hours=hours_ago),
+        )
+
+    def trending_slugs(self):
+        return [post['slug'] for post in self.client.get('/api/blog/posts/trending/').json()]
+
+    def test_flushed_views_land_in_the_current_hour_bucket(self):
+        for _ in range(3):
+            view_counter.increment(self.fresh)
+        view_counter.increment(self.old)
+        view_counter.flush()
+        view_counter.increment(self.fresh)
+        view_counter.flush()
+        buckets = dict(ViewBucket.objects.values_list('object_id', 'views'))
+        self.assertEqual(buckets, {self.fresh.pk: 4, self.old.pk: 1})
+
+    def test_old_views_decay_with_the_half_life(self):
+        self.add_views(self.old, 72, 100)
+        self.add_views(self.fresh, 0, 20)
+        trending.update_trending()
+        # 100 vues vieilles de trois demi-vies pèsent ~12,5 : la nouveauté passe devant
+        self.assertEqual(self.trending_slugs(), [self.fresh.slug, self.old.slug])
+
+        with override_settings(TRENDING_HALF_LIFE_HOURS=240):
+            trending.update_trending()
+        self.assertEqual(self.trending_slugs(), [self.old.slug, self.fresh.slug])
+
+    def test_ranking_skips_unpublished_and_prunes_stale_buckets(self):
+        self.add_views(self.fresh, 0, 5)
+        self.add_views(self.old, 24 * 30, 500)
+        self.fresh.status = 'draft'
+        self.fresh.save()
+        trending.update_trending()
+        self.assertEqual(self.trending_slugs(), [])
+        self.assertEqual(ViewBucket.objects.count(), 1)
+        self.assertEqual(self.client.get('/api/portfolio/projects/trending/').json(), [])
+
+
+class ViewAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        view_counter.flush()
+        self.addCleanup(view_counter.flush)
+        User = get_user_model()
+        self.staff = User.objects.create_user(username='analyste', password='secret-pass', is_staff=True)
+        self.post = BlogPost.objects.create(title='Article mesuré', content='Contenu.', author=self.staff, status='published')
+
+    def test_flushes_append_events_that_rollup_compacts(self):
+        for _ in range(3):
+            view_counter.increment(self.post)
+        with CaptureQueriesContext(connection) as queries:
+            view_counter.flush()
+        self.assertEqual(sum('INSERT INTO "core_viewevent"' in q['sql'] for q in queries), 1)
+        view_counter.increment(self.post)
+        view_counter.flush()
+        self.assertEqual(ViewEvent.objects.count(), 2)
+
+        self.assertEqual(analytics.rollup(), 2)
+        self.assertFalse(ViewEvent.objects.exists())
+        view_counter.increment(self.post)
+        view_counter.flush()
+        analytics.rollup()
+        daily = DailyViews.objects.get(object_id=self.post.pk)
+        self.assertEqual((daily.day, daily.views), (timezone.localdate(), 5))
+
+    def test_concurrent_rollups_count_each_view_once(self):
+        view_counter.increment(self.post, 3)
+        view_counter.flush()
+        # Lot lu par un autre worker avant que le premier rollup ne le supprime
+        with transaction.atomic():
+            stale = analytics._claim_batch()
+        analytics.rollup()
+        batches = iter([stale])
+        with mock.patch('apps.core.analytics._claim_batch', side_effect=lambda: next(batches, [])):
+            self.assertEqual(analytics.rollup(), 0)
+        self.assertEqual(DailyViews.objects.get(object_id=self.post.pk).views, 3)
+
+    def test_staff_time_series_reads_the_rollup(self):
+        today = timezone.localdate()
+        for days_ago, views in ((0, 4), (2, 6), (10, 1)):
+            DailyViews.objects.create(
+                model_label='blog.BlogPost', object_id=self.post.pk,
+                day=today - timedelta(days=days_ago), views=views,
+            )
+        url = reverse('core:view-stats')
+        self.assertIn(self.client.get(url).status_code, (401, 403))
+
+        self.client.force_login(self.staff)
+        start = (today - timedelta(days=6)).isoformat()
+        data = self.client.get(url, {'slug': self.post.slug, 'start': start}).json()
+        self.assertEqual(len(data['series']), 7)
+        self.assertEqual([point['views'] for point in data['series']][-3:], [6, 0, 4])
+        self.assertEqual(data['total'], 10)
+
+        data = self.client.get(url, {'type': 'posts', 'interval': 'week'}).json()
+        self.assertEqual(data['total'], 11)
+        self.assertEqual(data['top'][0]['slug'], self.post.slug)
+        self.assertEqual(self.client.get(url, {'type': 'pages'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start': 'hier'}).status_code, 400)
+
+
+class MediaResizeTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        media_root, cache_root = tempfile.mkdtemp(), tempfile.mkdtemp()
+        for directory in (media_root, cache_root):
+            self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        paths = override_settings(MEDIA_ROOT=media_root, MEDIA_RESIZE_CACHE_DIR=cache_root)
+        paths.enable()
+        self.addCleanup(paths.disable)
+        self.addCleanup(setattr, resizing, '_cache_bytes', None)
+        buffer = BytesIO()
+        Image.new('RGB', (1200, 600), '#aa3366').save(buffer, 'PNG')
+        self.name = default_storage.save('projects/featured/cover.png', ContentFile(buffer.getvalue()))
+
+    def test_signed_url_serves_cached_immutable_variant(self):
+        url = resizing.resized_url(self.name, 300, 300)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('immutable', response['Cache-Control'])
+        with Image.open(BytesIO(b''.join(response.streaming_content))) as variant:
+            self.assertEqual(variant.size, (300, 150))
+
+        with mock.patch.object(resizing, '_render') as render:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        render.assert_not_called()
+
+        tampered = resizing.resized_url(self.name, 300, 300).replace('300x300', '1200x1200')
+        self.assertEqual(self.client.get(tampered).status_code, 404)
+        self.assertEqual(self.client.get(url.split('?')[0]).status_code, 404)
+
+    def read_variant(self, width, height):
+        with resizing.open_variant(self.name, width, height) as handle:
+            return handle.read()
+
+    @override_settings(MEDIA_RESIZE_CACHE_MAX_BYTES=1)
+    def test_variant_evicted_right_after_rendering_is_still_served(self):
+        response = self.client.get(resizing.resized_url(self.name, 250, 0))
+        self.assertEqual(response.status_code, 200)
+        with Image.open(BytesIO(b''.join(response.streaming_content))) as variant:
+            self.assertEqual(variant.width, 250)
+        self.assertGreaterEqual(resizing.stats()['evictions'], 1)
+
+    def test_concurrent_requests_share_one_resize(self):
+        render = resizing._render
+        calls = []
+
+        def slow_render(*args):
+            calls.append(args)
+            time.sleep(0.2)
+            return render(*args)
+
+        with mock.patch.object(resizing, '_render', side_effect=slow_render):
+            threads = [threading.Thread(target=self.read_variant, args=(200, 0)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(calls), 1)
+
+    def test_least_recently_used_variants_are_evicted(self):
+        for width in (100, 110, 120):
+            self.read_variant(width, 0)
+        paths = [resizing.cache_entry(self.name, width, 0)[1] for width in (100, 110, 120)]
+        now = time.time()
+        for path, age in zip(paths, (50, 100, 0)):
+            os.utime(path, (now - age, now - age))
+        kept = os.path.getsize(paths[0]) + os.path.getsize(paths[2])
+        with override_settings(MEDIA_RESIZE_CACHE_MAX_BYTES=int(kept / resizing.LOW_WATER) + 1):
+            resizing._account(0)
+        self.assertEqual([os.path.exists(path) for path in paths], [True, False, True])
+
+
+class MediaServingTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        root = override_settings(MEDIA_ROOT=media_root)
+        root.enable()
+        self.addCleanup(root.disable)
+        self.content = bytes(range(256)) * 40
+        self.url = '/media/projects/videos/demo.mp4'
+        os.makedirs(os.path.join(media_root, 'projects', 'videos'))
+        with open(os.path.join(media_root, 'projects', 'videos', 'demo.mp4'), 'wb') as handle:
+            handle.write(self.content)
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_full_and_conditional_responses(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'video/mp4')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(self.body(response), self.content)
+
+        etag = response['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        modified = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(modified.status_code, 304)
+        self.assertEqual(self.client.get('/media/../settings.py').status_code, 404)
+
+    def test_single_and_multiple_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.content)}')
+        self.assertEqual(self.body(response), self.content[100:200])
+
+        suffix = self.client.get(self.url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(self.body(suffix), self.content[-10:])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9, 5-19, 1000-1009')
+        self.assertTrue(response['Content-Type'].startswith('multipart/byteranges; boundary='))
+        body = self.body(response)
+        self.assertEqual(int(response['Content-Length']), len(body))
+        self.assertIn(b'Content-Range: bytes 0-19/10240\r\n\r\n' + self.content[:20], body)
+        self.assertIn(b'Content-Range: bytes 1000-1009/10240\r\n\r\n' + self.content[1000:1010], body)
+
+        unsatisfiable = self.client.get(self.url, HTTP_RANGE='bytes=20000-')
+        self.assertEqual((unsatisfiable.status_code, unsatisfiable['Content-Range']), (416, 'bytes */10240'))
+        stale = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(stale.status_code, 200)
+
+    @override_settings(MEDIA_SENDFILE_BACKEND='x-accel-redirect', MEDIA_ACCEL_REDIRECT_PREFIX='/internal/')
+    def test_offload_to_front_server(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/internal/projects/videos/demo.mp4')
+        self.assertEqual(response.content, b'')
+
+
+class SharedCacheCheckTests(TestCase):
+    def test_local_cache_is_refused_with_several_workers(self):
+        self.assertEqual(shared_cache_check(None), [])
+        with override_settings(WEB_CONCURRENCY=4):
+            self.assertEqual([error.id for error in shared_cache_check(None)], ['core.E001'])
+        with override_settings(WEB_CONCURRENCY=4, CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost'},
+        }):
+            self.assertEqual(shared_cache_check(None), [])
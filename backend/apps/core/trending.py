@@ -0,0 +1,134 @@
+# ========== apps/core/trending.py ==========
+"""
+Classement des contenus tendance.
+
+Les vues écrites par view_counter sont aussi cumulées par heure dans
+`ViewBucket`. Une passe périodique (commande update_trending) lit les
+tranches récentes et calcule, de façon vectorisée avec NumPy, un score à
+décroissance exponentielle :
+
+    score = somme(vues * 2 ** (-âge / demi-vie))
+
+La demi-vie (TRENDING_HALF_LIFE_HOURS) règle la vitesse à laquelle une
+vue ancienne perd son poids. Les TRENDING_SIZE meilleurs contenus publiés
+sont stockés dans `TrendingScore` : les endpoints `trending/` les lisent
+avec une requête indexée. Les tranches plus vieilles que
+WINDOW_HALF_LIVES demi-vies (poids < 0,4 %) sont supprimées par la passe.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .cache import bump_version
+from .models import TrendingScore, ViewBucket
+
+# Modèle -> espace de cache invalidé après chaque passe
+TRENDING_MODELS = {
+    'blog.BlogPost': 'blog.trending',
+    'portfolio.Project': 'portfolio.trending',
+}
+WINDOW_HALF_LIVES = 8
+DEFAULT_LIMIT = 10
+
+
+def half_life():
+    """Demi-vie du score, en heures"""
+    return getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 24)
+
+
+def ranking_size():
+    return getattr(settings, 'TRENDING_SIZE', 50)
+
+
+def current_hour():
+    return timezone.now().replace(minute=0, second=0, microsecond=0)
+
+
+def record_views(pending):
+    """
+    Ajoute à la tranche de l'heure courante les vues `{(label, pk): delta}`
+    écrites par view_counter (appelé dans la transaction de son flush).
+    """
+    hour = current_hour()
+    # Crée les tranches manquantes, puis incrémente : sûr en concurrence
+    ViewBucket.objects.bulk_create(
+        [ViewBucket(model_label=label, object_id=pk, hour=hour) for label, pk in pending],
+        ignore_conflicts=True,
+    )
+    batches = defaultdict(lambda: defaultdict(list))
+    for (label, pk), delta in pending.items():
+        batches[label][delta].append(pk)
+    for label, deltas in batches.items():
+        for delta, pks in deltas.items():
+            ViewBucket.objects.filter(model_label=label, hour=hour, object_id__in=pks).update(
+                views=F('views') + delta
+            )
+
+
+def compute_scores(label, now=None):
+    """Identifiants et scores des contenus publiés, du plus tendance au moins"""
+    now = now or timezone.now()
+    model = apps.get_model(label)
+    since = now - timedelta(hours=half_life() * WINDOW_HALF_LIVES)
+    rows = list(
+        ViewBucket.objects.filter(
+            model_label=label, hour__gte=since,
+            object_id__in=model.objects.published().values('pk'),
+        ).values_list('object_id', 'hour', 'views')
+    )
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    stamps = np.array([row[1].timestamp() for row in rows])
+    views = np.array([row[2] for row in rows], dtype=np.float64)
+    # Âge mesuré depuis le milieu de la tranche horaire
+    ages = np.maximum(now.timestamp() - (stamps + 1800), 0) / 3600
+    weights = views * np.exp2(-ages / half_life())
+
+    unique_ids, inverse = np.unique(ids, return_inverse=True)
+    scores = np.bincount(inverse, weights=weights)
+    order = np.argsort(-scores, kind='stable')[:ranking_size()]
+    return unique_ids[order], scores[order]
+
+
+def update_trending():
+    """Recalcule les classements et purge les vieilles tranches ; retourne leur taille"""
+    now = timezone.now()
+    sizes = {}
+    for label, namespace in TRENDING_MODELS.items():
+        ids, scores = compute_scores(label, now)
+        with transaction.atomic():
+            TrendingScore.objects.filter(model_label=label).delete()
+            TrendingScore.objects.bulk_create([
+                TrendingScore(model_label=label, object_id=int(pk), rank=rank, score=float(score))
+                for rank, (pk, score) in enumerate(zip(ids, scores), start=1)
+            ])
+        bump_version(namespace)
+        sizes[label] = len(ids)
+    ViewBucket.objects.filter(hour__lt=now - timedelta(hours=half_life() * WINDOW_HALF_LIVES)).delete()
+    return sizes
+
+
+def requested_limit(request):
+    try:
+        limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        limit = DEFAULT_LIMIT
+    return max(1, min(limit, ranking_size()))
+
+
+def ranked(queryset, limit):
+    """Objets du classement précalculé, dans l'ordre, lus depuis `queryset`"""
+    ids = list(
+        TrendingScore.objects.filter(model_label=queryset.model._meta.label)
+        .order_by('rank').values_list('object_id', flat=True)[:limit]
+    )
+    objects = queryset.in_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
@@ -0,0 +1,10 @@
+# ========== apps/core/urls.py ==========
+from django.urls import path
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    # Statistiques de vues (équipe uniquement)
+    path('views/', views.view_stats, name='view-stats'),
+]
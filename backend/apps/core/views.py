@@ -0,0 +1,68 @@
+# ========== apps/core/views.py ==========
+from datetime import date, timedelta
+
+from django.apps import apps
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from . import analytics
+
+# Type de contenu (paramètre `type`) -> modèle
+CONTENT_TYPES = {
+    'posts': 'blog.BlogPost',
+    'projects': 'portfolio.Project',
+}
+DEFAULT_DAYS = 30
+MAX_DAYS = 731
+
+
+def error(message):
+    return Response({'error': message}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def view_stats(request):
+    """
+    Série temporelle des vues, lue dans l'agrégat quotidien.
+    Paramètres : type (posts|projects), slug (optionnel), start et end
+    (AAAA-MM-JJ, 30 derniers jours par défaut), interval (day|week).
+    """
+    params = request.query_params
+    label = CONTENT_TYPES.get(params.get('type', 'posts'))
+    if label is None:
+        return error("Type inconnu : 'posts' ou 'projects'.")
+    interval = params.get('interval', 'day')
+    if interval not in ('day', 'week'):
+        return error("Intervalle inconnu : 'day' ou 'week'.")
+    try:
+        end = date.fromisoformat(params['end']) if 'end' in params else timezone.localdate()
+        start = date.fromisoformat(params['start']) if 'start' in params else end - timedelta(days=DEFAULT_DAYS - 1)
+    except ValueError:
+        return error("Dates attendues au format AAAA-MM-JJ.")
+    if start > end or (end - start).days >= MAX_DAYS:
+        return error(f"La période doit être croissante et durer au plus {MAX_DAYS} jours.")
+
+    model = apps.get_model(label)
+    item = get_object_or_404(model, slug=params['slug']) if params.get('slug') else None
+    points = analytics.series(label, start, end, interval, object_id=item.pk if item else None)
+    data = {
+        'type': params.get('type', 'posts'),
+        'slug': item.slug if item else None,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'interval': interval,
+        'total': sum(point['views'] for point in points),
+        'series': points,
+    }
+    if item is None:
+        ranking = analytics.top_items(label, start, end)
+        titles = model._default_manager.in_bulk([pk for pk, _ in ranking])
+        data['top'] = [
+            {'id': pk, 'slug': titles[pk].slug, 'title': titles[pk].title, 'views': views}
+            for pk, views in ranking if pk in titles
+        ]
+    return Response(data)
@@ -21,7 +21,7 @@ class ProjectImageInline(admin.TabularInline):
 
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
-    list_display = ['title', 'category', 'status', 'featured', 'view_count', 'created_at']
+    list_display = ['title', 'category', 'status', 'featured', 'view_count', 'published_at', 'created_at']
     list_filter = ['status', 'category', 'featured', 'technologies', 'created_at']
     search_fields = ['title', 'description']
     prepopulated_fields = {'slug': ('title',)}
@@ -36,7 +36,7 @@ class ProjectAdmin(admin.ModelAdmin):
             'fields': ('featured_image',)
         }),
         ('Classification', {
-            'fields': ('category', 'technologies', 'status', 'featured')
+            'fields': ('category', 'technologies', 'status', 'published_at', 'featured')
         }),
         ('Liens', {
             'fields': ('demo_url', 'source_url')
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.2 on 2026-10-18 11:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0004_seed_amazoon'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='demo_video_file',
+            field=models.FileField(blank=True, help_text='Fichier vidéo local (MP4 recommandé)', null=True, upload_to='projects/videos/'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='demo_video_url',
+            field=models.URLField(blank=True, help_text='Lien YouTube ou Vimeo de la démo vidéo'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='video_thumbnail',
+            field=models.ImageField(blank=True, help_text='Miniature personnalisée pour la vidéo', null=True, upload_to='projects/video_thumbnails/'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='video_type',
+            field=models.CharField(choices=[('none', 'Aucune vidéo'), ('youtube', 'YouTube'), ('vimeo', 'Vimeo'), ('local', 'Vidéo locale')], default='none', help_text='Type de vidéo de démo', max_length=20),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:13
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def date_published_projects(apps, schema_editor):
+    Project = apps.get_model('portfolio', 'Project')
+    Project.objects.filter(status='published', published_at__isnull=True).update(published_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0005_project_demo_video_file_project_demo_video_url_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='published_at',
+            field=models.DateTimeField(blank=True, help_text='Une date future programme la publication', null=True),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Brouillon'), ('scheduled', 'Programmé'), ('published', 'Publié'), ('archived', 'Archivé')], default='draft', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['status', 'published_at'], name='portfolio_project_pub_idx'),
+        ),
+        migrations.RunPython(date_published_projects, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:21
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def fill_counters(apps, schema_editor):
+    Project = apps.get_model('portfolio', 'Project')
+    for name in ('ProjectCategory', 'Technology'):
+        model = apps.get_model('portfolio', name)
+        rows = model.objects.annotate(total=Count('project', filter=Q(project__status='published')))
+        for row in rows:
+            row.project_count = row.total
+        model.objects.bulk_update(rows, ['project_count'], batch_size=500)
+    projects = Project.objects.only('id').annotate(total=Count('technologies'))
+    for project in projects:
+        project.tech_count = project.total
+    Project.objects.bulk_update(projects, ['tech_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0006_scheduled_publishing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='tech_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='projectcategory',
+            name='project_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='technology',
+            name='project_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
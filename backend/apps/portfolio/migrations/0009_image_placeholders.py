@@ -0,0 +1,34 @@
+# Generated by Django 5.0.2 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0008_image_variants'),
+    ]
+
+    operations = [
+        # La source traitée couvre désormais dérivés et placeholder
+        migrations.RenameField(
+            model_name='project',
+            old_name='featured_image_variants_source',
+            new_name='featured_image_source',
+        ),
+        migrations.RenameField(
+            model_name='projectimage',
+            old_name='variants_source',
+            new_name='image_source',
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='featured_image_placeholder',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='projectimage',
+            name='placeholder',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
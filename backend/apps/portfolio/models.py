@@ -1,17 +1,41 @@
 # ========== apps/portfolio/models.py ==========
 from django.db import models
 from django.contrib.auth import get_user_model
-from django.utils.text import slugify
-from PIL import Image
-import os
+from apps.core.models import CounterFieldsMixin, ScheduledPublicationMixin, TrackedFieldsMixin, UniqueSlugMixin
 
 User = get_user_model()
 
-class Technology(models.Model):
+class ProjectQuerySet(models.QuerySet):
+    def published(self):
+        return self.filter(status='published')
+    
+    def for_listing(self, fields=None):
+        """
+        Catégorie jointe et technologies préchargées, limitées aux champs
+        rendus (voir apps.core.serializers.selected_fields) ; sans `fields`,
+        toutes les relations sont chargées.
+        """
+        wanted = lambda name: fields is None or name in fields
+        queryset = self
+        if wanted('category'):
+            queryset = queryset.select_related('category')
+        if wanted('owner'):
+            queryset = queryset.select_related('owner')
+        if wanted('technologies'):
+            queryset = queryset.prefetch_related('technologies')
+        if wanted('images'):
+            queryset = queryset.prefetch_related('images')
+        return queryset
+
+class Technology(CounterFieldsMixin, models.Model):
     """Technologies utilisées dans les projets"""
     name = models.CharField(max_length=50, unique=True)
     icon = models.ImageField(upload_to='technologies/', blank=True, null=True)
     color = models.CharField(max_length=7, default='#000000', help_text='Code couleur hex')
+    # Projets publiés, maintenu par signaux (apps/portfolio/signals.py)
+    project_count = models.PositiveIntegerField(default=0, editable=False)
+    
+    counter_fields = ('project_count',)
     
     class Meta:
         verbose_name = 'Technologie'
@@ -21,29 +45,29 @@ class Technology(models.Model):
     def __str__(self):
         return self.name
 
-class ProjectCategory(models.Model):
+class ProjectCategory(UniqueSlugMixin, CounterFieldsMixin, models.Model):
     """Catégories de projets"""
     name = models.CharField(max_length=50, unique=True)
     slug = models.SlugField(unique=True, blank=True)
     description = models.TextField(blank=True)
+    # Projets publiés, maintenu par signaux (apps/portfolio/signals.py)
+    project_count = models.PositiveIntegerField(default=0, editable=False)
+    
+    counter_fields = ('project_count',)
     
     class Meta:
         verbose_name = 'Catégorie'
         verbose_name_plural = 'Catégories'
         ordering = ['name']
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
-    
     def __str__(self):
         return self.name
 
-class Project(models.Model):
+class Project(UniqueSlugMixin, TrackedFieldsMixin, ScheduledPublicationMixin, CounterFieldsMixin, models.Model):
     """Modèle pour les projets du portfolio"""
     STATUS_CHOICES = [
         ('draft', 'Brouillon'),
+        ('scheduled', 'Programmé'),
         ('published', 'Publié'),
         ('archived', 'Archivé'),
     ]
@@ -55,6 +79,10 @@ class Project(models.Model):
     
     # Images
     featured_image = models.ImageField(upload_to='projects/featured/')
+    # Dérivés WebP responsives et placeholder, produits hors requête (apps.core.images)
+    featured_image_variants = models.JSONField(default=list, blank=True, editable=False)
+    featured_image_placeholder = models.JSONField(default=dict, blank=True, editable=False)
+    featured_image_source = models.CharField(max_length=255, blank=True, editable=False)
     
     # Links
     demo_url = models.URLField(blank=True, help_text='Lien vers la démo')
@@ -99,27 +127,35 @@ class Project(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
     featured = models.BooleanField(default=False, help_text='Projet mis en avant')
     view_count = models.PositiveIntegerField(default=0)
+    # Technologies associées, maintenu par signaux (apps/portfolio/signals.py)
+    tech_count = models.PositiveIntegerField(default=0, editable=False)
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    published_at = models.DateTimeField(null=True, blank=True, help_text='Une date future programme la publication')
+    
+    objects = ProjectQuerySet.as_manager()
+    tracked_fields = ('status', 'category_id')
+    counter_fields = ('tech_count', 'view_count')
+    slug_source = 'title'
     
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Projet'
         verbose_name_plural = 'Projets'
+        indexes = [
+            # Échéances des publications programmées (apps.core.publishing)
+            models.Index(fields=['status', 'published_at'], name='portfolio_project_pub_idx'),
+        ]
     
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.title)
+        # Comme BlogPost : un save limité à d'autres champs ne touche pas à la publication
+        update_fields = kwargs.get('update_fields')
+        changed = self.refresh_publication_state() if self.publication_written(update_fields) else set()
+        if update_fields is not None and changed:
+            kwargs['update_fields'] = set(update_fields) | changed
         super().save(*args, **kwargs)
-        
-        # Redimensionner l'image featured
-        if self.featured_image:
-            img = Image.open(self.featured_image.path)
-            if img.height > 600 or img.width > 800:
-                img.thumbnail((800, 600))
-                img.save(self.featured_image.path)
     
     def __str__(self):
         return self.title
@@ -130,18 +166,12 @@ class ProjectImage(models.Model):
     image = models.ImageField(upload_to='projects/gallery/')
     caption = models.CharField(max_length=200, blank=True)
     order = models.PositiveIntegerField(default=0)
+    # Dérivés WebP responsives et placeholder, produits hors requête (apps.core.images)
+    variants = models.JSONField(default=list, blank=True, editable=False)
+    placeholder = models.JSONField(default=dict, blank=True, editable=False)
+    image_source = models.CharField(max_length=255, blank=True, editable=False)
     
     class Meta:
         ordering = ['order']
         verbose_name = 'Image de projet'
         verbose_name_plural = 'Images de projet'
-    
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        
-        # Redimensionner l'image
-        if self.image:
-            img = Image.open(self.image.path)
-            if img.height > 800 or img.width > 1200:
-                img.thumbnail((1200, 800))
-                img.save(self.image.path)
\ No newline at end of file
@@ -1,58 +1,83 @@
 # ========== backend/apps/portfolio/serializers.py (Amélioré) ==========
 from rest_framework import serializers
+from apps.core import images
+from apps.core.serializers import ResizedImageField, SparseFieldsetMixin
 from .models import Project, ProjectCategory, Technology, ProjectImage
 
 class TechnologySerializer(serializers.ModelSerializer):
+    icon_thumbnail = ResizedImageField(96, 96, source='icon')
+    
     class Meta:
         model = Technology
-        fields = ('id', 'name', 'icon', 'color')
+        fields = ('id', 'name', 'icon', 'icon_thumbnail', 'color')
 
 class ProjectCategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = ProjectCategory
         fields = ('id', 'name', 'slug', 'description')
 
+class TechnologyCountSerializer(TechnologySerializer):
+    """Technologie avec nombre de projets publiés (colonne maintenue par signaux)"""
+    
+    class Meta(TechnologySerializer.Meta):
+        fields = TechnologySerializer.Meta.fields + ('project_count',)
+
+class ProjectCategoryCountSerializer(ProjectCategorySerializer):
+    """Catégorie avec nombre de projets publiés (colonne maintenue par signaux)"""
+    
+    class Meta(ProjectCategorySerializer.Meta):
+        fields = ProjectCategorySerializer.Meta.fields + ('project_count',)
+
+class VariantsField(serializers.ReadOnlyField):
+    """Dérivés WebP d'une image : chaîne `srcset` et détail par largeur"""
+    
+    def to_representation(self, value):
+        return images.srcset(value, self.context.get('request'))
+
 class ProjectImageSerializer(serializers.ModelSerializer):
+    variants = VariantsField()
+    
     class Meta:
         model = ProjectImage
-        fields = ('id', 'image', 'caption', 'order')
+        fields = ('id', 'image', 'variants', 'placeholder', 'caption', 'order')
 
-class ProjectListSerializer(serializers.ModelSerializer):
+class ProjectListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer optimisé pour la liste des projets"""
     category = ProjectCategorySerializer(read_only=True)
     technologies = TechnologySerializer(many=True, read_only=True)
+    featured_image_variants = VariantsField()
     
     class Meta:
         model = Project
         fields = (
             'id', 'title', 'slug', 'description', 'featured_image', 
-            'category', 'technologies', 'demo_url', 'source_url', 
-            'featured', 'view_count', 'created_at', 'status'
+            'featured_image_variants', 'featured_image_placeholder', 'category',
+            'technologies', 'demo_url', 'source_url', 'featured', 'view_count',
+            'created_at', 'status'
         )
+        expandable = ('category', 'technologies')
 
-class ProjectDetailSerializer(serializers.ModelSerializer):
+class ProjectDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer complet pour le détail d'un projet"""
     category = ProjectCategorySerializer(read_only=True)
     technologies = TechnologySerializer(many=True, read_only=True)
     images = ProjectImageSerializer(many=True, read_only=True)
     owner = serializers.StringRelatedField(read_only=True)
+    featured_image_variants = VariantsField()
     
     # Champs calculés
-    tech_count = serializers.SerializerMethodField()
     is_recent = serializers.SerializerMethodField()
     
     class Meta:
         model = Project
         fields = (
             'id', 'title', 'slug', 'description', 'detailed_description',
-            'featured_image', 'category', 'technologies', 'images',
-            'demo_url', 'source_url', 'owner', 'featured', 'view_count',
-            'created_at', 'updated_at', 'status', 'tech_count', 'is_recent'
+            'featured_image', 'featured_image_variants', 'featured_image_placeholder',
+            'category', 'technologies', 'images', 'demo_url', 'source_url',
+            'owner', 'featured', 'view_count', 'created_at', 'updated_at',
+            'status', 'tech_count', 'is_recent'
         )
-    
-    def get_tech_count(self, obj):
-        """Nombre de technologies utilisées"""
-        return obj.technologies.count()
+        expandable = ('category', 'technologies', 'images', 'owner')
     
     def get_is_recent(self, obj):
         """Vérifie si le projet est récent (moins de 6 mois)"""
@@ -69,7 +94,7 @@ class ProjectCreateSerializer(serializers.ModelSerializer):
         fields = (
             'title', 'description', 'detailed_description', 
             'featured_image', 'category', 'technologies',
-            'demo_url', 'source_url', 'featured', 'status'
+            'demo_url', 'source_url', 'featured', 'status', 'published_at'
         )
     
     def validate_title(self, value):
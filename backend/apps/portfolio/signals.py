@@ -0,0 +1,135 @@
+# ========== backend/apps/portfolio/signals.py ==========
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.core import denorm, images
+from apps.core.cache import bump_version
+
+from .models import Project, ProjectCategory, ProjectImage, Technology
+
+
+@receiver([post_save, post_delete], sender=Project)
+@receiver([post_save, post_delete], sender=ProjectCategory)
+@receiver([post_save, post_delete], sender=Technology)
+@receiver(m2m_changed, sender=Project.technologies.through)
+def invalidate_read_caches(sender, **kwargs):
+    """
+    Listes, détails (catégorie et technologies imbriquées) et comptages par
+    catégorie/technologie dépendent des projets et des taxonomies
+    """
+    bump_version('portfolio.projects', 'portfolio.details', 'portfolio.taxonomy')
+
+
+@receiver([post_save, post_delete], sender=ProjectImage)
+def invalidate_project_detail_cache(sender, instance, **kwargs):
+    """La galerie n'apparaît que dans le détail de son projet"""
+    bump_version(f'portfolio.project:{instance.project.slug}')
+
+
+@receiver(post_save, sender=Project)
+def schedule_featured_image_variants(sender, instance, **kwargs):
+    images.schedule(
+        instance, 'featured_image', 'featured_image_source',
+        variants_field='featured_image_variants', placeholder_field='featured_image_placeholder',
+        namespaces=('portfolio.projects', 'portfolio.details'),
+    )
+
+
+@receiver(post_save, sender=ProjectImage)
+def schedule_gallery_image_variants(sender, instance, **kwargs):
+    images.schedule(
+        instance, 'image', 'image_source', variants_field='variants', placeholder_field='placeholder',
+        namespaces=(f'portfolio.project:{instance.project.slug}',),
+    )
+
+
+@receiver(post_delete, sender=Project)
+def delete_featured_image_variants(sender, instance, **kwargs):
+    images.delete_variants(instance.featured_image_variants)
+
+
+@receiver(post_delete, sender=ProjectImage)
+def delete_gallery_image_variants(sender, instance, **kwargs):
+    images.delete_variants(instance.variants)
+
+
+# Compteurs dénormalisés : projets publiés par catégorie et par
+# technologie, technologies par projet
+
+NAMESPACES = ('portfolio.taxonomy', 'portfolio.projects', 'portfolio.details')
+
+denorm.register(
+    ProjectCategory, 'project_count',
+    lambda: denorm.count_of(Project.objects.published(), 'category'),
+    namespaces=NAMESPACES,
+)
+denorm.register(
+    Technology, 'project_count',
+    lambda: denorm.count_of(Project.technologies.through.objects.filter(project__status='published'), 'technology'),
+    namespaces=NAMESPACES,
+)
+denorm.register(
+    Project, 'tech_count',
+    lambda: denorm.count_of(Project.technologies.through.objects.all(), 'project'),
+    namespaces=NAMESPACES,
+)
+
+
+@receiver(post_save, sender=Project)
+def count_project_in_taxonomies(sender, instance, created, **kwargs):
+    was_published = not created and instance.previous_value('status') == 'published'
+    is_published = instance.status == 'published'
+    old_category = None if created else instance.previous_value('category_id')
+    if was_published and is_published and old_category == instance.category_id:
+        return
+    if was_published:
+        denorm.adjust(ProjectCategory, [old_category], 'project_count', -1)
+    if is_published:
+        denorm.adjust(ProjectCategory, [instance.category_id], 'project_count', 1)
+    if was_published != is_published and not created:
+        technology_ids = Project.technologies.through.objects.filter(
+            project_id=instance.pk
+        ).values_list('technology_id', flat=True)
+        denorm.adjust(Technology, list(technology_ids), 'project_count', 1 if is_published else -1)
+
+
+@receiver(pre_delete, sender=Project)
+def remember_counted_technologies(sender, instance, **kwargs):
+    instance._counted_technology_ids = list(instance.technologies.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Project)
+def uncount_project_in_taxonomies(sender, instance, **kwargs):
+    if instance.previous_value('status') == 'published':
+        denorm.adjust(ProjectCategory, [instance.category_id], 'project_count', -1)
+        denorm.adjust(Technology, getattr(instance, '_counted_technology_ids', []), 'project_count', -1)
+
+
+@receiver(m2m_changed, sender=Project.technologies.through)
+def count_project_technologies(sender, instance, action, reverse, pk_set, **kwargs):
+    sign = {'post_add': 1, 'post_remove': -1}.get(action)
+    if not reverse:
+        # Côté projet : pk_set contient des technologies
+        if action == 'pre_clear':
+            instance._cleared_technology_ids = list(instance.technologies.values_list('pk', flat=True))
+            return
+        if action == 'post_clear':
+            pk_set, sign = getattr(instance, '_cleared_technology_ids', []), -1
+        if not sign:
+            return
+        denorm.adjust(Project, [instance.pk], 'tech_count', sign * len(pk_set))
+        if instance.status == 'published':
+            denorm.adjust(Technology, pk_set, 'project_count', sign)
+        return
+
+    # Côté technologie : pk_set contient des projets
+    if action == 'pre_clear':
+        instance._cleared_project_ids = list(instance.project_set.values_list('pk', flat=True))
+        return
+    if action == 'post_clear':
+        pk_set, sign = getattr(instance, '_cleared_project_ids', []), -1
+    if not sign:
+        return
+    denorm.adjust(Project, pk_set, 'tech_count', sign)
+    published = Project.objects.published().filter(pk__in=pk_set).count()
+    denorm.adjust(Technology, [instance.pk], 'project_count', sign * published)
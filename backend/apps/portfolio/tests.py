@@ -0,0 +1,217 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from apps.core import publishing
+from apps.core.counters import view_counter
+
+from .models import Project, ProjectCategory, ProjectImage, Technology
+
+User = get_user_model()
+
+
+class PortfolioTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Échéance des publications programmées mémorisée hors des budgets de requêtes
+        publishing.next_due()
+        view_counter.flush()
+        self.addCleanup(view_counter.flush)
+        self.client = Client()
+        self.owner = User.objects.create_user(
+            username='owner', email='owner@example.com', password='secret-pass'
+        )
+        # Les migrations de seed créent déjà des projets et technologies
+        self.category = ProjectCategory.objects.create(name='Catégorie de test')
+        self.technologies = [
+            Technology.objects.create(name='Techno de test A'),
+            Technology.objects.create(name='Techno de test B'),
+        ]
+
+    def create_project(self, title, status='published', **extra):
+        project = Project.objects.create(
+            title=title, description='Un projet de test.', owner=self.owner,
+            category=self.category, status=status, **extra
+        )
+        project.technologies.set(self.technologies)
+        return project
+
+
+def find(data, pk):
+    return next(item for item in data if item['id'] == pk)
+
+
+class TaxonomyEndpointTests(PortfolioTestCase):
+    def test_categories_and_technologies_cost_one_query(self):
+        self.create_project('Projet publié')
+        self.create_project('Projet brouillon', status='draft')
+
+        for name, pk in (
+            ('portfolio:categories', self.category.pk),
+            ('portfolio:technologies', self.technologies[0].pk),
+        ):
+            with self.assertNumQueries(1):
+                data = self.client.get(reverse(name)).json()
+            self.assertEqual(find(data, pk)['project_count'], 1)
+            with self.assertNumQueries(0):
+                self.client.get(reverse(name))
+
+    def test_cache_is_invalidated_by_project_changes(self):
+        url = reverse('portfolio:technologies')
+        pk = self.technologies[0].pk
+        self.assertEqual(find(self.client.get(url).json(), pk)['project_count'], 0)
+        self.create_project('Nouveau projet')
+        self.assertEqual(find(self.client.get(url).json(), pk)['project_count'], 1)
+
+
+class DenormalizedCounterTests(PortfolioTestCase):
+    def test_counters_follow_m2m_changes_from_both_sides(self):
+        first, second = self.technologies
+        project = self.create_project('Projet compté')
+        project.refresh_from_db()
+        self.assertEqual(project.tech_count, 2)
+
+        second.project_set.remove(project)
+        project.technologies.clear()
+        project.refresh_from_db()
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((project.tech_count, first.project_count, second.project_count), (0, 0, 0))
+
+        first.project_set.add(project)
+        project.status = 'archived'
+        project.save()
+        first.refresh_from_db()
+        self.category.refresh_from_db()
+        self.assertEqual((first.project_count, self.category.project_count), (0, 0))
+
+
+class SparseFieldsetTests(PortfolioTestCase):
+    def test_list_and_detail_honour_fields(self):
+        project = self.create_project('Projet clairsemé')
+        data = self.client.get(reverse('portfolio:project-list'), {'fields': 'id,title,slug'}).json()
+        self.assertEqual(set(find(data['results'], project.pk)), {'id', 'title', 'slug'})
+
+        url = reverse('portfolio:project-detail', kwargs={'slug': project.slug})
+        data = self.client.get(url, {'fields': 'title', 'expand': 'technologies'}).json()
+        self.assertEqual(set(data), {'title', 'technologies'})
+        self.assertEqual(len(data['technologies']), 2)
+
+    def test_plain_list_loads_only_rendered_relations(self):
+        for i in range(3):
+            self.create_project(f'Projet listé {i}')
+        # Comptage, page (catégorie jointe) et technologies ; ni propriétaire ni images
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('portfolio:project-list'))
+        self.assertEqual(len(queries), 3)
+        self.assertFalse(any('portfolio_projectimage' in query['sql'] for query in queries))
+        self.assertFalse(any('auth_user' in query['sql'] for query in queries))
+
+
+@override_settings(IMAGE_VARIANTS_MODE='inline')
+class ImageVariantTests(PortfolioTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        storage_settings = override_settings(MEDIA_ROOT=media_root)
+        storage_settings.enable()
+        self.addCleanup(storage_settings.disable)
+
+    def upload(self, name, size=(1000, 500)):
+        buffer = BytesIO()
+        Image.new('RGB', size, '#336699').save(buffer, 'JPEG')
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+    def test_variants_are_generated_after_commit_and_original_is_kept(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            project = self.create_project('Projet illustré', featured_image=self.upload('cover.jpg'))
+        project.refresh_from_db()
+
+        self.assertEqual(
+            [(v['width'], v['height']) for v in project.featured_image_variants], [(400, 200), (800, 400)]
+        )
+        self.assertEqual(project.featured_image_source, project.featured_image.name)
+        with Image.open(project.featured_image.path) as original:
+            self.assertEqual(original.size, (1000, 500))
+        for variant in project.featured_image_variants:
+            self.assertEqual(default_storage.size(variant['name']), variant['bytes'])
+
+        data = self.client.get(reverse('portfolio:project-list')).json()
+        srcset = find(data['results'], project.pk)['featured_image_variants']['srcset']
+        self.assertRegex(srcset, r'^http://testserver/media/\S+-400w\.webp 400w, \S+-800w\.webp 800w$')
+
+    def test_unchanged_image_is_not_reprocessed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            project = self.create_project('Projet stable', featured_image=self.upload('stable.jpg'))
+        project.refresh_from_db()
+        with self.captureOnCommitCallbacks() as callbacks:
+            project.title = 'Projet stable renommé'
+            project.save()
+        self.assertEqual(callbacks, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image = ProjectImage.objects.create(project=project, image=self.upload('small.jpg', (300, 200)))
+        image.refresh_from_db()
+        self.assertEqual((image.variants, image.image_source), ([], image.image.name))
+
+    def test_same_stem_images_keep_their_own_variants(self):
+        # cover.jpg et cover.png dans le même répertoire d'upload
+        with self.captureOnCommitCallbacks(execute=True):
+            jpeg = self.create_project('Projet JPEG', featured_image=self.upload('cover.jpg'))
+            png = self.create_project('Projet PNG', featured_image=self.upload('cover.png'))
+        jpeg.refresh_from_db()
+        png.refresh_from_db()
+        jpeg_names = {v['name'] for v in jpeg.featured_image_variants}
+        png_names = {v['name'] for v in png.featured_image_variants}
+        self.assertEqual((len(jpeg_names), len(png_names)), (2, 2))
+        self.assertTrue(jpeg_names.isdisjoint(png_names))
+        self.assertTrue(all(default_storage.exists(name) for name in jpeg_names | png_names))
+
+    def test_replaced_and_deleted_images_drop_their_variants(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            project = self.create_project('Projet remplacé', featured_image=self.upload('first.jpg'))
+            image = ProjectImage.objects.create(project=project, image=self.upload('gallery.jpg'))
+        project.refresh_from_db()
+        image.refresh_from_db()
+        first = [v['name'] for v in project.featured_image_variants]
+        gallery = [v['name'] for v in image.variants]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            project.featured_image = self.upload('second.jpg')
+            project.save()
+        project.refresh_from_db()
+        self.assertFalse(any(default_storage.exists(name) for name in first))
+        second = [v['name'] for v in project.featured_image_variants]
+        self.assertTrue(second and all(default_storage.exists(name) for name in second))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            project.delete()
+        self.assertFalse(any(default_storage.exists(name) for name in second + gallery))
+
+    def test_placeholder_is_stored_and_served_inline(self):
+        buffer = BytesIO()
+        image = Image.new('RGB', (600, 300), '#ffffff')
+        image.paste((200, 30, 30), (0, 0, 400, 300))
+        image.save(buffer, 'PNG')
+        with self.captureOnCommitCallbacks(execute=True):
+            project = self.create_project(
+                'Projet coloré', featured_image=SimpleUploadedFile('colors.png', buffer.getvalue())
+            )
+
+        url = reverse('portfolio:project-detail', kwargs={'slug': project.slug})
+        placeholder = self.client.get(url).json()['featured_image_placeholder']
+        self.assertEqual((placeholder['width'], placeholder['height']), (600, 300))
+        self.assertEqual(placeholder['color'], '#c81e1e')
+        self.assertTrue(placeholder['lqip'].startswith('data:image/webp;base64,'))
+        self.assertLess(len(placeholder['lqip']), 1000)
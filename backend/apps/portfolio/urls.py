@@ -7,6 +7,7 @@ app_name = 'portfolio'
 urlpatterns = [
     # IMPORTANT: L'ordre compte ! Featured AVANT le slug générique
     path('projects/featured/', views.featured_projects, name='featured-projects'),
+    path('projects/trending/', views.trending_projects, name='trending-projects'),
     
     # Liste et création de projets
     path('projects/', views.ProjectListCreateView.as_view(), name='project-list'),
@@ -3,17 +3,41 @@ from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from django.db.models import F
+from django.utils.decorators import method_decorator
+from apps.core import trending
+from apps.core.cache import cached
+from apps.core.conditional import conditional_get
+from apps.core.counters import view_counter
+from apps.core.pagination import KeysetPaginationMixin
+from apps.core.response_cache import cache_response
+from apps.core.serializers import selected_fields
 from .models import Project, ProjectCategory, Technology
 from .serializers import (ProjectListSerializer, ProjectDetailSerializer, 
-                         ProjectCreateSerializer, ProjectCategorySerializer, 
-                         TechnologySerializer)
+                         ProjectCreateSerializer, ProjectCategoryCountSerializer, 
+                         TechnologyCountSerializer)
 
-class ProjectListCreateView(generics.ListCreateAPIView):
+def count_cached_view(request, entry):
+    """Une vue servie depuis le cache compte quand même"""
+    if entry.get('object_pk'):
+        view_counter.increment(Project(pk=entry['object_pk']))
+
+def count_revalidated_view(request, slug):
+    """Un 304 (copie du client revalidée) compte aussi comme une vue"""
+    pk = Project.objects.filter(status='published', slug=slug).values_list('pk', flat=True).first()
+    if pk:
+        view_counter.increment(Project(pk=pk))
+
+def project_last_modified(request, slug):
+    return Project.objects.filter(status='published', slug=slug).values_list('updated_at', flat=True).first()
+
+@method_decorator([conditional_get('portfolio.projects'), cache_response('portfolio.projects')], name='dispatch')
+class ProjectListCreateView(KeysetPaginationMixin, generics.ListCreateAPIView):
     """Liste et création de projets avec filtrage"""
+    keyset_ordering = ('-featured', '-created_at', '-id')
     
     def get_queryset(self):
-        queryset = Project.objects.filter(status='published').order_by('-featured', '-created_at')
+        fields = selected_fields(ProjectListSerializer, self.request.query_params)
+        queryset = Project.objects.published().for_listing(fields).order_by('-featured', '-created_at')
         
         # Filtrage par catégorie
         category = self.request.query_params.get('category')
@@ -23,7 +47,7 @@ class ProjectListCreateView(generics.ListCreateAPIView):
         # Filtrage par technologie
         tech = self.request.query_params.get('technology')
         if tech:
-            queryset = queryset.filter(technologies__name__icontains=tech)
+            queryset = queryset.filter(technologies__name__icontains=tech).distinct()
             
         return queryset
     
@@ -42,11 +66,23 @@ class ProjectListCreateView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
+@method_decorator([
+    conditional_get(
+        'portfolio.details', 'portfolio.project:{slug}',
+        last_modified=project_last_modified, on_not_modified=count_revalidated_view,
+    ),
+    cache_response('portfolio.details', 'portfolio.project:{slug}', on_hit=count_cached_view),
+], name='dispatch')
 class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Détail, modification et suppression d'un projet"""
-    queryset = Project.objects.filter(status='published')
     lookup_field = 'slug'
     
+    def get_queryset(self):
+        queryset = Project.objects.published()
+        if self.request.method == 'GET':
+            queryset = queryset.for_listing(selected_fields(ProjectDetailSerializer, self.request.query_params))
+        return queryset
+    
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
             return ProjectCreateSerializer
@@ -61,24 +97,25 @@ class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        # Incrémenter le compteur de vues de façon atomique
-        Project.objects.filter(id=instance.id).update(view_count=F('view_count') + 1)
-        # Recharger l'instance avec la nouvelle valeur
-        instance.refresh_from_db()
+        # Incrément différé : écrit en base par lots, la valeur servie
+        # inclut les vues pas encore persistées
+        instance.view_count += view_counter.increment(instance)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
+@conditional_get('portfolio.projects')
+@cache_response('portfolio.projects')
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def featured_projects(request):
     """Projets mis en avant"""
     try:
-        projects = Project.objects.filter(
-            status='published', 
+        fields = selected_fields(ProjectListSerializer, request.query_params)
+        projects = Project.objects.published().filter(
             featured=True
-        ).order_by('-created_at')[:6]  # Limite à 6 projets
+        ).for_listing(fields).order_by('-created_at')[:6]  # Limite à 6 projets
         
-        serializer = ProjectListSerializer(projects, many=True)
+        serializer = ProjectListSerializer(projects, many=True, context={'request': request})
         return Response(serializer.data)
     except Exception as e:
         return Response(
@@ -86,22 +123,30 @@ def featured_projects(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@conditional_get('portfolio.projects', 'portfolio.trending')
+@cache_response('portfolio.projects', 'portfolio.trending')
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def trending_projects(request):
+    """Projets tendance (classement précalculé, voir apps.core.trending)"""
+    fields = selected_fields(ProjectListSerializer, request.query_params)
+    projects = trending.ranked(
+        Project.objects.published().for_listing(fields), trending.requested_limit(request)
+    )
+    serializer = ProjectListSerializer(projects, many=True, context={'request': request})
+    return Response(serializer.data)
+
+@conditional_get('portfolio.taxonomy')
+@cache_response('portfolio.taxonomy')
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def project_categories(request):
     """Liste des catégories avec comptage"""
     try:
-        categories = ProjectCategory.objects.all()
-        # Ajouter le count de projets pour chaque catégorie
-        data = []
-        for category in categories:
-            category_data = ProjectCategorySerializer(category).data
-            category_data['project_count'] = Project.objects.filter(
-                category=category, 
-                status='published'
-            ).count()
-            data.append(category_data)
-        
+        # Une requête (compteurs maintenus en colonne), mise en cache jusqu'au prochain changement
+        data = cached('portfolio.taxonomy', 'categories', lambda: ProjectCategoryCountSerializer(
+            ProjectCategory.objects.all(), many=True
+        ).data)
         return Response(data)
     except Exception as e:
         return Response(
@@ -109,22 +154,17 @@ def project_categories(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@conditional_get('portfolio.taxonomy')
+@cache_response('portfolio.taxonomy')
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def technologies(request):
     """Liste des technologies avec comptage"""
     try:
-        techs = Technology.objects.all()
-        # Ajouter le count de projets pour chaque technologie
-        data = []
-        for tech in techs:
-            tech_data = TechnologySerializer(tech).data
-            tech_data['project_count'] = Project.objects.filter(
-                technologies=tech, 
-                status='published'
-            ).count()
-            data.append(tech_data)
-        
+        # Une requête (compteurs maintenus en colonne), mise en cache jusqu'au prochain changement
+        data = cached('portfolio.taxonomy', 'technologies', lambda: TechnologyCountSerializer(
+            Technology.objects.all(), many=True
+        ).data)
         return Response(data)
     except Exception as e:
         return Response(
@@ -68,6 +68,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.core.middleware.ScheduledPublishingMiddleware',
 ]
 
 ROOT_URLCONF = 'portfolio_backend.urls'
@@ -109,6 +110,33 @@ else:
         }
     }
 
+# Cache - Redis si REDIS_URL est défini (paquet redis requis), sinon mémoire locale.
+# La mémoire locale est propre à chaque processus : les invalidations du cache
+# de réponses n'atteindraient pas les autres workers. Avec plusieurs workers
+# (WEB_CONCURRENCY, lu aussi par gunicorn), REDIS_URL est obligatoire (check core.E001).
+REDIS_URL = config('REDIS_URL', default=None)
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=1, cast=int)
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'portfolio-backend',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
+# Cache des réponses publiques (apps.core.response_cache)
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=3600, cast=int)
+RESPONSE_CACHE_GZIP = config('RESPONSE_CACHE_GZIP', default=True, cast=bool)
+
 # Logging - IMPORTANT pour debug Railway
 LOGGING = {
     'version': 1,
@@ -258,6 +286,49 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default=EMAIL_HOST_USER)
 
+# Compteur de vues à écriture différée (apps.core.counters)
+VIEW_COUNTER_FLUSH_INTERVAL = config('VIEW_COUNTER_FLUSH_INTERVAL', default=30, cast=int)  # secondes
+VIEW_COUNTER_FLUSH_THRESHOLD = config('VIEW_COUNTER_FLUSH_THRESHOLD', default=100, cast=int)
+
+# File d'ingestion des commentaires (apps.blog.ingestion)
+COMMENT_QUEUE_DRAIN = config('COMMENT_QUEUE_DRAIN', default='thread')  # thread, inline ou worker
+COMMENT_QUEUE_BATCH_SIZE = config('COMMENT_QUEUE_BATCH_SIZE', default=200, cast=int)
+COMMENT_QUEUE_FLUSH_INTERVAL = config('COMMENT_QUEUE_FLUSH_INTERVAL', default=5, cast=int)  # secondes
+COMMENT_QUEUE_FLUSH_THRESHOLD = config('COMMENT_QUEUE_FLUSH_THRESHOLD', default=50, cast=int)
+
+# Sitemap (apps.core.syndication) : au-delà, /sitemap.xml devient un index
+SITEMAP_MAX_URLS = config('SITEMAP_MAX_URLS', default=50000, cast=int)
+
+# Classement tendance (apps.core.trending)
+TRENDING_HALF_LIFE_HOURS = config('TRENDING_HALF_LIFE_HOURS', default=24, cast=float)
+TRENDING_SIZE = config('TRENDING_SIZE', default=50, cast=int)
+
+# Statistiques de vues quotidiennes (apps.core.analytics)
+ANALYTICS_ROLLUP_INTERVAL = config('ANALYTICS_ROLLUP_INTERVAL', default=3600, cast=int)  # secondes
+
+# Dérivés WebP des images téléversées (apps.core.images)
+IMAGE_VARIANTS_MODE = config('IMAGE_VARIANTS_MODE', default='thread')  # thread, inline ou off
+IMAGE_VARIANTS_WORKERS = config('IMAGE_VARIANTS_WORKERS', default=2, cast=int)
+
+# Redimensionnement des médias à la demande (apps.core.resizing)
+MEDIA_RESIZE_CACHE_DIR = config('MEDIA_RESIZE_CACHE_DIR', default=os.path.join(BASE_DIR, 'media_cache'))
+MEDIA_RESIZE_CACHE_MAX_BYTES = config('MEDIA_RESIZE_CACHE_MAX_BYTES', default=256 * 1024 * 1024, cast=int)
+MEDIA_RESIZE_MAX_DIMENSION = config('MEDIA_RESIZE_MAX_DIMENSION', default=2400, cast=int)
+
+# Service des médias (apps.core.media) : '' (os.sendfile via gunicorn),
+# 'x-sendfile' ou 'x-accel-redirect' pour déléguer l'envoi au serveur frontal
+MEDIA_SENDFILE_BACKEND = config('MEDIA_SENDFILE_BACKEND', default='')
+MEDIA_ACCEL_REDIRECT_PREFIX = config('MEDIA_ACCEL_REDIRECT_PREFIX', default='/protected-media/')
+
+# Recherche plein texte du blog (apps.blog.search)
+BLOG_SEARCH_MAX_RESULTS = config('BLOG_SEARCH_MAX_RESULTS', default=200, cast=int)
+
+# Nombre de voisins conservés par article (apps.blog.similarity)
+RELATED_POSTS_TOP_K = config('RELATED_POSTS_TOP_K', default=10, cast=int)
+# Mises à jour regroupées hors de la requête, au plus tard après ce délai
+RELATED_POSTS_MODE = config('RELATED_POSTS_MODE', default='thread')  # thread, inline ou off
+RELATED_POSTS_DEBOUNCE = config('RELATED_POSTS_DEBOUNCE', default=2, cast=float)  # secondes
+
 # Configuration de l'application
 SITE_NAME = config('SITE_NAME', default='Souleymane Yeo Portfolio')
 FRONTEND_URL = config('FRONTEND_URL', default='https://portfolio-souleymaneyeo.vercel.app')
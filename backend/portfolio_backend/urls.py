@@ -1,10 +1,14 @@
 # ========== backend/portfolio_backend/urls.py (CORRIGÉ CRITIQUE) ==========
+import re
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
+from apps.core.counters import view_counter
+from apps.core import media, resizing, response_cache, syndication
+from apps.blog import ingestion as comment_ingestion
 
 # Health check pour Railway
 def health_check(request):
@@ -12,7 +16,11 @@ def health_check(request):
         'status': 'healthy', 
         'message': 'Portfolio Backend API is running',
         'debug': settings.DEBUG,
-        'allowed_hosts': settings.ALLOWED_HOSTS
+        'allowed_hosts': settings.ALLOWED_HOSTS,
+        'pending_view_increments': view_counter.pending_count(),
+        'response_cache': response_cache.stats(),
+        'comment_queue': comment_ingestion.stats(),
+        'media_resize': resizing.stats(),
     })
 
 # API Root endpoint
@@ -24,8 +32,11 @@ def api_root(request):
             'auth': '/api/auth/',
             'portfolio': '/api/portfolio/',
             'blog': '/api/blog/',
+            'analytics': '/api/analytics/views/',
             'admin': '/admin/',
-            'health': '/health/'
+            'health': '/health/',
+            'sitemap': '/sitemap.xml',
+            'feeds': '/feeds/posts.rss'
         },
         'cors_origins': getattr(settings, 'CORS_ALLOWED_ORIGINS', []),
         'debug': settings.DEBUG
@@ -41,16 +52,25 @@ urlpatterns = [
     # Admin
     path('admin/', admin.site.urls),
     
+    # Sitemap et flux pour les robots et agrégateurs
+    path('sitemap.xml', syndication.sitemap, name='sitemap'),
+    path('sitemap-<str:section>-<int:page>.xml', syndication.sitemap_section, name='sitemap-section'),
+    path('feeds/posts.<str:kind>', syndication.posts_feed, name='posts-feed'),
+    path('feeds/projects.<str:kind>', syndication.projects_feed, name='projects-feed'),
+    
+    # Médias redimensionnés à la demande (URL signées), avant la route static()
+    path(f'{settings.MEDIA_URL.strip("/")}/resize/<str:spec>/<path:path>', resizing.resize, name='media-resize'),
+    
     # API endpoints
     path('api/auth/', include('apps.authentication.urls')),
     path('api/portfolio/', include('apps.portfolio.urls')),
     path('api/blog/', include('apps.blog.urls')),
+    path('api/analytics/', include('apps.core.urls')),
 ]
 
-# Servir les fichiers media et static
+# Servir les fichiers media (plages, GET conditionnels, X-Sendfile) et static
+urlpatterns += [
+    re_path(rf'^{re.escape(settings.MEDIA_URL.lstrip("/"))}(?P<path>.*)$', media.serve, name='media'),
+]
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
-else:
-    # En production, servir les media files via Django (pas optimal mais nécessaire pour Railway)
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
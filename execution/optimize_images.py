@@ -3,16 +3,25 @@
 Image optimization script for portfolio project.
 Converts images to WebP, compresses, and generates responsive sizes.
 
+The input directory is walked recursively and its layout is mirrored in the
+output directory. A manifest (.optimize-manifest.json in the output directory)
+records the content hash of every processed image, so unchanged images are
+skipped on the next run. With --jobs N, images are encoded in N processes.
+
 Usage:
-    python optimize_images.py --input <input_dir> --output <output_dir>
-    
+    python optimize_images.py --input <input_dir> --output <output_dir> [--jobs N] [--report report.json] [--force]
+
 Example:
-    python optimize_images.py --input frontend/public/images --output frontend/public/images/optimized
+    python optimize_images.py --input frontend/public/images --output frontend/public/images/optimized --jobs 4
 """
 
 import argparse
+import hashlib
+import json
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from PIL import Image
 
@@ -26,102 +35,254 @@ SIZES = {
 # WebP quality (0-100, 80-85 is good balance)
 WEBP_QUALITY = 85
 
-def optimize_image(input_path: Path, output_dir: Path):
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+MANIFEST_NAME = '.optimize-manifest.json'
+# Changing the sizes or the quality invalidates every manifest entry
+SETTINGS_KEY = json.dumps({'sizes': SIZES, 'quality': WEBP_QUALITY}, sort_keys=True)
+
+def file_hash(path: Path) -> str:
+    """SHA-256 of a file, read in 1 MB chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def optimize_image(input_path: Path, output_dir: Path) -> dict:
     """
     Optimize a single image: convert to WebP and generate multiple sizes.
-    
+
     Args:
         input_path: Path to source image
         output_dir: Directory to save optimized images
+
+    Returns:
+        Report entry: status, timing, input size and the files created
     """
+    started = time.perf_counter()
+    result = {'input': str(input_path), 'input_bytes': input_path.stat().st_size, 'outputs': []}
     try:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
         # Open image
         img = Image.open(input_path)
-        
+
         # Convert RGBA to RGB if needed (for JPEG compatibility)
         if img.mode in ('RGBA', 'LA', 'P'):
             background = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+            img = img.convert('RGBA')
+            background.paste(img, mask=img.split()[-1])
             img = background
-        
+
         # Get base filename without extension
         base_name = input_path.stem
-        
+
         # Generate responsive sizes
         for size_name, width in SIZES.items():
             # Skip if image is smaller than target size
             if img.width < width:
                 continue
-                
+
             # Calculate height maintaining aspect ratio
             aspect_ratio = img.height / img.width
             height = int(width * aspect_ratio)
-            
+
             # Resize image
             resized = img.resize((width, height), Image.Resampling.LANCZOS)
-            
+
             # Save as WebP
             output_path = output_dir / f"{base_name}-{width}w.webp"
             resized.save(output_path, 'WEBP', quality=WEBP_QUALITY, method=6)
-            
-            print(f"  ✅ Created {output_path.name} ({width}x{height})")
-        
+            result['outputs'].append(output_entry(output_path, width, height))
+
         # Also save original size as WebP
         original_output = output_dir / f"{base_name}.webp"
         img.save(original_output, 'WEBP', quality=WEBP_QUALITY, method=6)
-        print(f"  ✅ Created {original_output.name} (original size)")
-        
+        result['outputs'].append(output_entry(original_output, img.width, img.height))
+        result['status'] = 'optimized'
+
     except Exception as e:
-        print(f"  ❌ Error processing {input_path.name}: {str(e)}")
+        result['status'] = 'error'
+        result['error'] = str(e)
+
+    result['output_bytes'] = sum(output['bytes'] for output in result['outputs'])
+    result['seconds'] = round(time.perf_counter() - started, 3)
+    return result
+
+def output_entry(path: Path, width: int, height: int) -> dict:
+    return {'path': str(path), 'width': width, 'height': height, 'bytes': path.stat().st_size}
+
+def find_images(input_dir: Path, output_dir: Path) -> list:
+    """Images under input_dir, recursively, ignoring the output directory."""
+    output_dir = output_dir.resolve()
+    images = []
+    for root, dirs, files in os.walk(input_dir):
+        # Do not walk into the output directory when it sits inside the input
+        dirs[:] = sorted(d for d in dirs if (Path(root) / d).resolve() != output_dir)
+        images.extend(
+            Path(root) / name for name in sorted(files)
+            if Path(name).suffix.lower() in IMAGE_EXTENSIONS
+        )
+    return images
+
+def load_manifest(path: Path) -> dict:
+    try:
+        manifest = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('settings') != SETTINGS_KEY:
+        return {}
+    return manifest.get('images', {})
+
+def save_manifest(path: Path, entries: dict):
+    """Write the manifest atomically, so an interrupted run leaves it intact."""
+    temporary = path.with_suffix('.tmp')
+    temporary.write_text(json.dumps({'settings': SETTINGS_KEY, 'images': entries}, indent=2, sort_keys=True))
+    os.replace(temporary, path)
+
+def is_up_to_date(entry: dict, path: Path, stat: os.stat_result) -> bool:
+    """
+    Unchanged since the last run: same size and mtime (no read needed) or,
+    failing that, same content hash. Every output must still exist.
+    """
+    if not entry or not all(Path(output['path']).exists() for output in entry['outputs']):
+        return False
+    if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return True
+    return entry['size'] == stat.st_size and entry['sha256'] == file_hash(path)
+
+def find_collisions(images: list, input_dir: Path) -> dict:
+    """Sources that would write the same outputs (foo.jpg and foo.png in one directory)."""
+    by_output = {}
+    for img_path in images:
+        key = img_path.relative_to(input_dir)
+        by_output.setdefault((key.parent / key.stem).as_posix(), []).append(key.as_posix())
+    return {stem: keys for stem, keys in by_output.items() if len(keys) > 1}
+
+def remove_stale_outputs(previous: dict, entries: dict) -> int:
+    """
+    Delete outputs listed in the previous manifest that no current entry
+    claims: sources that were removed, or widths no longer generated.
+    """
+    claimed = {output['path'] for entry in entries.values() for output in entry['outputs']}
+    removed = 0
+    for entry in previous.values():
+        for output in entry['outputs']:
+            path = Path(output['path'])
+            if output['path'] not in claimed and path.exists():
+                path.unlink()
+                removed += 1
+    return removed
 
 def main():
     parser = argparse.ArgumentParser(description='Optimize images for web delivery')
     parser.add_argument('--input', required=True, help='Input directory containing images')
     parser.add_argument('--output', required=True, help='Output directory for optimized images')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Number of worker processes')
+    parser.add_argument('--report', help='Write a per-image JSON report to this file')
+    parser.add_argument('--force', action='store_true', help='Ignore the manifest and reprocess every image')
     args = parser.parse_args()
-    
+
     input_dir = Path(args.input)
     output_dir = Path(args.output)
-    
+
     # Validate input directory
     if not input_dir.exists():
         print(f"❌ Input directory does not exist: {input_dir}")
         sys.exit(1)
-    
+
     # Create output directory
     output_dir.mkdir(parents=True, exist_ok=True)
-    
+
     # Find all images
-    image_extensions = {'.jpg', '.jpeg', '.png'}
-    images = [
-        f for f in input_dir.iterdir() 
-        if f.is_file() and f.suffix.lower() in image_extensions
-    ]
-    
+    images = find_images(input_dir, output_dir)
+
     if not images:
         print(f"⚠️  No images found in {input_dir}")
         sys.exit(0)
-    
-    print(f"🖼️  Found {len(images)} images to optimize\n")
-    
-    # Process each image
+
+    # Outputs are named after the source stem: two sources must not share one
+    collisions = find_collisions(images, input_dir)
+    if collisions:
+        for stem, keys in sorted(collisions.items()):
+            print(f"❌ {', '.join(keys)} would all write {stem}.webp")
+        print("Rename one of each pair and run again.")
+        sys.exit(1)
+
+    manifest_path = output_dir / MANIFEST_NAME
+    previous = load_manifest(manifest_path)
+    manifest = {} if args.force else previous
+    entries, pending, skipped = {}, [], []
     for img_path in images:
-        print(f"Processing {img_path.name}...")
-        optimize_image(img_path, output_dir)
-        print()
-    
-    print(f"✨ Optimization complete! Check {output_dir}")
-    
-    # Show size comparison
-    input_size = sum(f.stat().st_size for f in images)
-    output_size = sum(f.stat().st_size for f in output_dir.iterdir() if f.is_file())
-    reduction = ((input_size - output_size) / input_size) * 100
-    
-    print(f"\n📊 Size reduction: {reduction:.1f}%")
-    print(f"   Before: {input_size / 1024 / 1024:.2f} MB")
-    print(f"   After:  {output_size / 1024 / 1024:.2f} MB")
+        key = img_path.relative_to(input_dir).as_posix()
+        stat = img_path.stat()
+        if is_up_to_date(manifest.get(key), img_path, stat):
+            entries[key] = dict(manifest[key], mtime_ns=stat.st_mtime_ns)
+            skipped.append({'input': str(img_path), 'status': 'skipped', 'input_bytes': stat.st_size,
+                            'output_bytes': sum(o['bytes'] for o in manifest[key]['outputs']), 'seconds': 0.0})
+        else:
+            pending.append((key, img_path, output_dir / Path(key).parent))
+
+    print(f"🖼️  Found {len(images)} images: {len(pending)} to optimize, {len(skipped)} unchanged\n")
+
+    started = time.perf_counter()
+    results = []
+
+    def record(key, img_path, result):
+        results.append(result)
+        if result['status'] == 'optimized':
+            stat = img_path.stat()
+            entries[key] = {
+                'sha256': file_hash(img_path), 'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns, 'outputs': result['outputs'],
+            }
+            print(f"  ✅ {key}: {len(result['outputs'])} files in {result['seconds']:.2f}s")
+        else:
+            print(f"  ❌ Error processing {key}: {result['error']}")
+
+    # Process each image, in worker processes when --jobs > 1
+    if args.jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            futures = {pool.submit(optimize_image, path, target): (key, path) for key, path, target in pending}
+            for future in as_completed(futures):
+                record(*futures[future], future.result())
+    else:
+        for key, img_path, target in pending:
+            record(key, img_path, optimize_image(img_path, target))
+
+    save_manifest(manifest_path, entries)
+    removed = remove_stale_outputs(previous, entries)
+    if removed:
+        print(f"\n🧹 Removed {removed} stale output files")
+    elapsed = time.perf_counter() - started
+    print(f"\n✨ Optimization complete in {elapsed:.1f}s! Check {output_dir}")
+
+    # Show size comparison for the images processed in this run
+    optimized = [result for result in results if result['status'] == 'optimized']
+    input_size = sum(result['input_bytes'] for result in optimized)
+    output_size = sum(result['output_bytes'] for result in optimized)
+    if input_size:
+        reduction = ((input_size - output_size) / input_size) * 100
+        print(f"\n📊 Size reduction: {reduction:.1f}%")
+        print(f"   Before: {input_size / 1024 / 1024:.2f} MB")
+        print(f"   After:  {output_size / 1024 / 1024:.2f} MB")
+
+    if args.report:
+        report = {
+            'seconds': round(elapsed, 3),
+            'jobs': args.jobs,
+            'optimized': len(optimized),
+            'skipped': len(skipped),
+            'errors': len(results) - len(optimized),
+            'input_bytes': input_size,
+            'output_bytes': output_size,
+            'images': sorted(results + skipped, key=lambda result: result['input']),
+        }
+        Path(args.report).write_text(json.dumps(report, indent=2))
+        print(f"\n📝 Report written to {args.report}")
+
+    if len(results) != len(optimized):
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -5,12 +5,23 @@ import { Calendar, Clock, User } from 'lucide-react'
 import { formatRelativeDate, getMediaUrl } from '../../utils/helpers'
 
 const BlogCard = ({ post, index }) => {
+  // Placeholder calculé côté backend : couleur dominante et miniature floue (LQIP)
+  const placeholder = post.featured_image_placeholder || {}
+  const placeholderStyle = placeholder.lqip ? {
+    backgroundColor: placeholder.color,
+    backgroundImage: `url(${placeholder.lqip})`,
+    backgroundSize: 'cover',
+    backgroundPosition: 'center',
+  } : undefined
+
   return (
     <div className="card hover-lift group h-full flex flex-col">
       {post.featured_image && (
-        <div className="relative overflow-hidden rounded-t-lg">
+        <div className="relative overflow-hidden rounded-t-lg" style={placeholderStyle}>
           <img
             src={getMediaUrl(post.featured_image)}
+            width={placeholder.width}
+            height={placeholder.height}
             alt={post.title}
             className="w-full h-48 object-cover group-hover:scale-105 transition-transform duration-300"
           />
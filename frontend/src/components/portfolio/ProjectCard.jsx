@@ -59,6 +59,18 @@ const ProjectCard = ({ project, index = 0, variant = 'default' }) => {
     ? `https://via.placeholder.com/600x400/3b82f6/ffffff?text=${encodeURIComponent(normalizedProject.title)}`
     : getMediaUrl(normalizedProject.featured_image);
 
+  // Dérivés WebP responsives générés par le backend (absents tant qu'ils sont en cours)
+  const imageSrcSet = imageError ? undefined : project.featured_image_variants?.srcset || undefined;
+
+  // Placeholder calculé côté backend : couleur dominante et miniature floue (LQIP)
+  const placeholder = project.featured_image_placeholder || {};
+  const placeholderStyle = placeholder.lqip ? {
+    backgroundColor: placeholder.color,
+    backgroundImage: `url(${placeholder.lqip})`,
+    backgroundSize: 'cover',
+    backgroundPosition: 'center',
+  } : undefined;
+
   if (variant === 'featured') {
     return (
       <div className="group bg-white dark:bg-gray-800 rounded-2xl shadow-xl hover:shadow-2xl transition-all duration-700 overflow-hidden border border-gray-200/50 dark:border-gray-700/50 transform hover:scale-105">
@@ -66,6 +78,10 @@ const ProjectCard = ({ project, index = 0, variant = 'default' }) => {
         <div className="relative h-64 overflow-hidden">
           <img
             src={imageUrl}
+            srcSet={imageSrcSet}
+            sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw"
+            width={placeholder.width}
+            height={placeholder.height}
             alt={normalizedProject.title}
             className={`w-full h-full object-cover transition-all duration-700 group-hover:scale-110 ${
               imageLoaded ? 'opacity-100' : 'opacity-0'
@@ -74,9 +90,11 @@ const ProjectCard = ({ project, index = 0, variant = 'default' }) => {
             onError={handleImageError}
           />
           
-          {!imageLoaded && (
+          {!imageLoaded && (placeholderStyle ? (
+            <div className="absolute inset-0 blur-lg scale-110" style={placeholderStyle} />
+          ) : (
             <div className="absolute inset-0 bg-gray-200 dark:bg-gray-700 animate-pulse" />
-          )}
+          ))}
           
           {/* Overlay gradient */}
           <div className="absolute inset-0 bg-gradient-to-t from-black/80 via-black/20 to-transparent opacity-60 group-hover:opacity-100 transition-opacity duration-300" />
@@ -182,9 +200,13 @@ const ProjectCard = ({ project, index = 0, variant = 'default' }) => {
   // Version compacte par défaut
   return (
     <div className="group bg-white dark:bg-gray-800 rounded-xl shadow-soft hover:shadow-large transition-all duration-500 overflow-hidden border border-gray-200/50 dark:border-gray-700/50 transform hover:scale-102">
-      <div className="relative h-48 overflow-hidden">
+      <div className="relative h-48 overflow-hidden" style={placeholderStyle}>
         <img
           src={imageUrl}
+          srcSet={imageSrcSet}
+          sizes="(min-width: 768px) 33vw, 100vw"
+          width={placeholder.width}
+          height={placeholder.height}
           alt={normalizedProject.title}
           className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-300"
           onLoad={handleImageLoad}
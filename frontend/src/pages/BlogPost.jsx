@@ -116,7 +116,7 @@ const BlogPost = () => {
                                 prose-blockquote:border-l-primary-500 prose-blockquote:bg-bg-elevated/50 prose-blockquote:py-2 prose-blockquote:px-6 prose-blockquote:rounded-r-lg
                                 prose-code:text-primary-400 prose-code:bg-primary-500/10 prose-code:px-1.5 prose-code:py-0.5 prose-code:rounded prose-code:before:content-none prose-code:after:content-none
                                 prose-pre:bg-bg-card prose-pre:border prose-pre:border-border-default prose-pre:rounded-xl prose-pre:p-6"
-                dangerouslySetInnerHTML={{ __html: post.content }}
+                dangerouslySetInnerHTML={{ __html: post.content_html || post.content }}
               />
 
               <div className="mt-24 pt-12 border-t border-white/5 flex flex-col md:flex-row items-center justify-between gap-8">